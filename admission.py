@@ -0,0 +1,134 @@
+"""
+Admission control for the Flask frontend.
+
+RateLimiter         per-client token buckets; a client over its rate gets
+                    HTTP 429 with a Retry-After hint.
+ConcurrencyLimiter  caps how many requests use the LLM at once. Requests
+                    beyond the cap wait in a bounded queue; if the queue is
+                    full they are rejected at once (429), and if no slot
+                    frees up within the queue timeout they continue without
+                    the LLM (keyword extraction, template/bullet explanation).
+
+Both are per process; with gunicorn each worker enforces its own limits.
+Current load is published through metrics.py.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+
+class Overloaded(Exception):
+    """The request cannot be admitted now; retry after `retry_after` seconds."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """Take one token; return 0 on success, else seconds until one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    One token bucket per client key (`rate` requests/s, bursts of `burst`).
+    The least recently seen clients are forgotten beyond `max_clients`.
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate=1.0, burst=10, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client):
+        """Raise Overloaded if `client` is over its rate."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(client, None) or TokenBucket(self.rate, self.burst)
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            wait = bucket.take(now)
+        if wait:
+            metrics.increment('admission.rate_limited')
+            raise Overloaded("Too many requests, please slow down", retry_after=max(1, round(wait)))
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` holders at a time, at most `queue_size` waiters.
+    limit <= 0 disables limiting.
+    """
+
+    def __init__(self, name, limit=8, queue_size=16, queue_timeout=2.0):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def _publish(self):
+        metrics.set_gauge(f"{self.name}.in_flight", self.in_flight)
+        metrics.set_gauge(f"{self.name}.queued", self.waiting)
+
+    def acquire(self):
+        """
+        Return True once a slot is held, or False if none freed up within the
+        queue timeout (the caller should degrade). Raises Overloaded if the
+        queue is already full.
+        """
+        if self.limit <= 0:
+            return True
+        with self._condition:
+            if self.in_flight >= self.limit:
+                if self.waiting >= self.queue_size:
+                    metrics.increment(f"{self.name}.rejected")
+                    raise Overloaded("Server is busy, please retry shortly")
+                self.waiting += 1
+                self._publish()
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            metrics.increment(f"{self.name}.degraded")
+                            return False
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                    self._publish()
+            self.in_flight += 1
+            self._publish()
+            return True
+
+    def release(self):
+        if self.limit <= 0:
+            return
+        with self._condition:
+            self.in_flight -= 1
+            self._publish()
+            self._condition.notify()
@@ -1,10 +1,111 @@
 """
 Appliance Fault Diagnostic Expert System - Streamlit UI
+
+Streamlit re-runs this script on every interaction, so the compiled engines
+and the LLM modules are cached as resources (built once per process) and
+extraction, diagnosis and explanation results are cached as data, keyed on
+their inputs. A sidebar panel shows how long each stage took and whether
+it was served from the cache.
 """
+import time
+
 import streamlit as st
-from engine import DiagnosticEngine
 from experta import Fact
 
+import metrics
+from engine import EnginePool
+from symbols import CaseFacts
+
+
+@st.cache_resource
+def get_engine_pool():
+    """Compiled engines, shared by all sessions and reruns."""
+    return EnginePool(size=1)
+
+
+@st.cache_resource
+def get_llm_stack():
+    """LLM extractor and explainer, imported once (the Groq client is created on first call)."""
+    from llm_extractor import extract_facts_from_text
+    from explanation_generator import explain_why_recommendation
+    return extract_facts_from_text, explain_why_recommendation
+
+
+class FallbackResult(Exception):
+    """A stage fell back because the LLM failed; carries its result past the cache."""
+
+    def __init__(self, value):
+        super().__init__("LLM unavailable")
+        self.value = value
+
+
+def uncached_fallback(fn, *args):
+    """fn(*args), with a FallbackResult's value returned (uncached) instead of raised."""
+    try:
+        return fn(*args)
+    except FallbackResult as e:
+        return e.value
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def extract_case(text, hint):
+    """
+    Facts the LLM extracted from a description, as plain dicts ([] if nothing
+    was found). Raises FallbackResult instead of returning keyword-fallback
+    facts, so a transient LLM failure is not cached as the answer.
+    """
+    extract_facts_from_text, _ = get_llm_stack()
+    facts = [fact.as_dict() for fact in extract_facts_from_text(text, hint) or []]
+    if metrics.outcome('extraction') != 'llm':
+        raise FallbackResult(facts)
+    return facts
+
+
+
+@st.cache_data(show_spinner=False, max_entries=1024)
+def diagnose_case(fact_dicts):
+    """Engine report for a case given as a tuple of fact dicts."""
+    case = CaseFacts.from_facts([Fact(**fact) for fact in fact_dicts])
+    with get_engine_pool().engine() as engine:
+        report = engine.diagnose(case)
+        metrics.record('diagnosis', 'engine')
+        return report
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def explain(diagnosis, confidence, explanations):
+    """
+    "Why this recommendation?" text, from the templates or the LLM. Raises
+    FallbackResult instead of returning the bullet-point text used when the
+    LLM call fails, so an outage is not cached as the answer.
+    """
+    _, explain_why_recommendation = get_llm_stack()
+    friendly = explain_why_recommendation(
+        diagnosis=diagnosis,
+        confidence=confidence,
+        explanations_list=list(explanations)
+    )
+    if metrics.outcome('explanation') not in ('llm', 'template'):
+        raise FallbackResult(friendly)
+    return friendly
+
+
+def timed(timings, stage, fn, *args):
+    """Call fn(*args), noting its duration and the path it took ('cached' if it did not run)."""
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        timings.append((stage, time.perf_counter() - start))
+
+
+def show_timings(timings, trace):
+    st.sidebar.markdown("### ⏱️ Stage timings")
+    for stage, seconds in timings:
+        st.sidebar.markdown(f"**{stage.capitalize()}:** {seconds * 1000:.0f} ms ({trace.get(stage, 'cached')})")
+    st.sidebar.caption(f"Total: {sum(seconds for _, seconds in timings) * 1000:.0f} ms")
+
+
 st.set_page_config(page_title="🔧 Virtual Technician", layout="centered")
 st.title("🔧 Appliance Fault Diagnostic Expert System")
 
@@ -134,6 +235,9 @@ if appliance:
             observations['power'] = power_checked
 
 if st.button("Get Diagnosis", type="primary"):
+    trace = metrics.start_trace()
+    timings = []
+    
     # Handle Natural Language Mode
     if input_mode == "🤖 Natural Language (AI-powered)":
         if not natural_language_text.strip():
@@ -143,11 +247,9 @@ if st.button("Get Diagnosis", type="primary"):
         # Extract facts using LLM
         with st.spinner("🤖 AI is analyzing your description..."):
             try:
-                from llm_extractor import extract_facts_from_text
-                
                 # Use appliance hint if not auto-detect
                 hint = None if appliance_hint == "Auto-detect" else appliance_hint
-                extracted_facts = extract_facts_from_text(natural_language_text, hint)
+                extracted_facts = timed(timings, 'extraction', uncached_fallback, extract_case, natural_language_text, hint)
                 
                 if not extracted_facts:
                     st.error("❌ Could not extract facts from your description. Please try again or use Manual Selection mode.")
@@ -157,7 +259,8 @@ if st.button("Get Diagnosis", type="primary"):
                 with st.expander("🔍 What the AI understood from your description", expanded=True):
                     st.success("✅ Successfully extracted facts!")
                     for fact in extracted_facts:
-                        st.write(f"• {fact}")
+                        for key, value in fact.items():
+                            st.write(f"• {key.replace('_', ' ').capitalize()}: {value}")
             
             except Exception as e:
                 st.error(f"❌ AI extraction failed: {e}")
@@ -173,32 +276,17 @@ if st.button("Get Diagnosis", type="primary"):
             st.warning("⚠️ Please select at least one symptom")
             st.stop()
     
-    # Run diagnosis engine
-    engine = DiagnosticEngine()
-    engine.reset()
-    
-    # Declare facts based on input mode
+    # Run diagnosis engine on the LLM-extracted or manually selected facts
     if input_mode == "🤖 Natural Language (AI-powered)":
-        # Use LLM-extracted facts
-        for fact in extracted_facts:
-            engine.declare(fact)
+        fact_dicts = tuple(extracted_facts)
     else:
-        # Use manual facts
-        if appliance:
-            engine.declare(Fact(appliance=appliance))
-        for symptom in symptoms:
-            engine.declare(Fact(symptom=symptom))
-        for key, value in observations.items():
-            engine.declare(Fact(**{key: value}))
-    
-    engine.run()
-    report = engine.report
+        fact_dicts = tuple(fact.as_dict() for fact in CaseFacts(appliance, symptoms, observations).to_facts())
+    report = timed(timings, 'diagnosis', diagnose_case, fact_dicts)
     st.markdown("---")
     
     if report['best_fit']:
         best = report['best_fit']
         confidence = best['score']
-        symptom_count = len(symptoms) if symptoms else sum(1 for f in extracted_facts if 'symptom' in str(f).lower())
         
         # Show diagnosis
         st.markdown(f"#### Reason for ")
@@ -233,14 +321,9 @@ if st.button("Get Diagnosis", type="primary"):
             st.markdown(f"#### 📖 Why this recommendation?")
             
             try:
-                from explanation_generator import explain_why_recommendation
-                
                 with st.spinner("🤖 Generating explanation..."):
-                    friendly_why = explain_why_recommendation(
-                        diagnosis=best['diagnosis'],
-                        confidence=confidence,
-                        explanations_list=report['explanations']
-                    )
+                    friendly_why = timed(timings, 'explanation', uncached_fallback, explain,
+                                         best['diagnosis'], confidence, tuple(report['explanations']))
                 
                 # Show LLM-generated friendly explanation
                 st.markdown(friendly_why)
@@ -261,3 +344,5 @@ if st.button("Get Diagnosis", type="primary"):
         st.caption("⚠️ Always unplug appliances before repair. Consult a professional for electrical issues.")
     else:
         st.warning("No diagnosis generated. Please select an appliance and symptoms.")
+    
+    show_timings(timings, trace)
@@ -2,126 +2,552 @@
 Flask Frontend for Appliance Fault Diagnostic Expert System
 Professional, Simple, Light Theme
 """
-from flask import Flask, render_template, request, jsonify
-from engine import DiagnosticEngine
-from experta import Fact
-from llm_extractor import extract_facts_from_text
+import os
+from flask import Flask, render_template, request, jsonify, g
+import metrics
+from engine import EnginePool
+from symbols import CaseFacts
+from llm_extractor import extract_facts_from_text, extract_facts_by_keywords
+from explanation_generator import (explain_why_recommendation, explanation_uses_llm,
+                                   speculation_enabled, speculate_explanation)
+from admission import RateLimiter, ConcurrencyLimiter, Overloaded
+import sessions
+from static_assets import Asset, AssetManifest, asset_response
+from response_shaping import FieldError, parse_fields, select_fields, manual_request, shape_response
+from groq_client import load_env
+from lookup_table import load_table
+from rule_export import export_rules, artifact_bytes
+
+# Static files are served from memory by the asset pipeline (see static_assets.py)
+app = Flask(__name__, static_folder=None)
+
+# Compiled engines reused across requests
+engine_pool = EnginePool()
+
+# Precomputed manual-mode diagnoses, loaded on first use (None if no current table)
+_diagnosis_table = None
+_diagnosis_table_loaded = False
+
+
+def get_diagnosis_table():
+    global _diagnosis_table, _diagnosis_table_loaded
+    if not _diagnosis_table_loaded:
+        _diagnosis_table = load_table()
+        _diagnosis_table_loaded = True
+    return _diagnosis_table
+
+
+# Naive-Bayes scoring (bayes.py), built from the rules and the feedback log on first use
+_bayes_model = None
+
+
+def scoring_mode(data=None):
+    """'rules' (default) or 'bayes': the request's "scoring" field, else SCORING_MODE."""
+    load_env()
+    mode = (data or {}).get('scoring') or os.getenv('SCORING_MODE', 'rules')
+    return 'bayes' if mode == 'bayes' else 'rules'
+
+
+# Rule tables and vocabulary that feedback is validated against, built on first use
+_knowledge_base = None
+
+
+def get_knowledge_base():
+    """(rule_export artifact, knowledge_base_vocabulary) of the live rules."""
+    global _knowledge_base
+    if _knowledge_base is None:
+        from engine import knowledge_base_vocabulary
+        with engine_pool.engine() as engine:
+            _knowledge_base = (export_rules(engine), knowledge_base_vocabulary(engine))
+    return _knowledge_base
+
+
+def get_bayes_model():
+    global _bayes_model
+    if _bayes_model is None:
+        from bayes import build_model
+        with engine_pool.engine() as engine:
+            _bayes_model = build_model(engine)
+    return _bayes_model
+
+
+# Admission control, created on first use so .env settings apply
+_rate_limiter = None
+_llm_limiter = None
+
+
+def get_limiters():
+    """Return (per-client rate limiter, LLM concurrency limiter)."""
+    global _rate_limiter, _llm_limiter
+    if _llm_limiter is None:
+        load_env()
+        # Per-client limiting is opt-in: behind a proxy every client shares
+        # remote_addr unless RATE_LIMIT_KEY_HEADER names the forwarded header
+        _rate_limiter = RateLimiter(
+            rate=float(os.getenv('RATE_LIMIT_RPS', '0')),
+            burst=int(os.getenv('RATE_LIMIT_BURST', '10'))
+        )
+        _llm_limiter = ConcurrencyLimiter(
+            'llm',
+            limit=int(os.getenv('LLM_CONCURRENCY', '8')),
+            queue_size=int(os.getenv('LLM_QUEUE_SIZE', '16')),
+            queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', '2'))
+        )
+    return _rate_limiter, _llm_limiter
+
+
+# Server-side sessions (last natural-language request per browser)
+_session_store = None
+
+
+def get_session_store():
+    global _session_store
+    if _session_store is None:
+        load_env()
+        _session_store = sessions.create_store()
+    return _session_store
+
+
+def facts_key(case):
+    """Comparable, JSON-friendly form of a case's facts (lists only, so it survives a JSON round trip)."""
+    interned = CaseFacts.from_facts(case.to_facts())
+    return [interned.appliance, sorted(interned.symptoms),
+            [[key, value] for key, value in sorted(interned.observations.items())]]
+
+
+# Fingerprinted static assets, the exported rule tables and the pre-rendered page
+_assets = None
+_rules = None
+_page = None
+
+
+def get_assets():
+    global _assets
+    if _assets is None:
+        _assets = AssetManifest()
+    return _assets
+
+
+def get_rules():
+    """Rule tables for client-side manual-mode diagnosis (static/js/diagnose.js)."""
+    global _rules
+    if _rules is None:
+        mode = 'llm' if explanation_uses_llm() else 'template'
+        with engine_pool.engine() as engine:
+            _rules = Asset('rules.json', artifact_bytes(export_rules(engine, mode)), 'application/json')
+    return _rules
+
+
+def get_page():
+    """The index page, rendered once with the current asset and rule table URLs."""
+    global _page
+    if _page is None:
+        assets = get_assets()
+        # Client-side diagnosis mirrors the rule path only
+        rules_url = f"/rules?v={get_rules().digest}" if scoring_mode() == 'rules' else ''
+        with app.app_context():
+            html = render_template('index.html', asset_url=assets.url, catalogue_url=assets.catalogue_url(),
+                                   rules_url=rules_url)
+        _page = Asset('index.html', html.encode(), 'text/html')
+    return _page
+
+
+def client_key():
+    """Identify the client for rate limiting (a proxy header if RATE_LIMIT_KEY_HEADER is set)."""
+    header = os.getenv('RATE_LIMIT_KEY_HEADER')
+    if header and request.headers.get(header):
+        return request.headers[header].split(',')[0].strip()
+    return request.remote_addr
+
+
+def warm_up(engines=2, llm=True):
+    """
+    Prepare the worker before it accepts traffic: pre-build engines, load the
+    lookup table and (optionally) create the Groq client and its circuit breaker.
+    """
+    load_env()  # before anything below reads the environment (SCORING_MODE, table and feedback paths)
+    engine_pool.warm_up(engines)
+    get_diagnosis_table()
+    if scoring_mode() == 'bayes':
+        get_bayes_model()
+    get_limiters()
+    get_session_store()
+    get_page()
+    if llm:
+        from groq_client import get_client, get_breaker
+        get_breaker()
+        try:
+            get_client()
+        except ValueError as e:
+            print(f"⚠️ {e}")
+
+
+def run_engine(case):
+    """Diagnose one case on a pooled engine and return its report."""
+    with engine_pool.engine() as engine:
+        return engine.diagnose(case)
 
-app = Flask(__name__)
 
 @app.route('/')
 def index():
     """Main page"""
-    return render_template('index.html')
+    return asset_response(app.response_class, get_page(), request, immutable=False)
+
+
+@app.route('/static/<path:filename>')
+def static_asset(filename):
+    """Static files; fingerprinted names are cached by the browser for a year"""
+    asset, immutable = get_assets().lookup(filename)
+    if asset is None:
+        return jsonify({'error': 'Not found'}), 404
+    return asset_response(app.response_class, asset, request, immutable)
+
+
+@app.route('/rules')
+def rules():
+    """Exported rule tables; the page asks for them by version hash"""
+    rules_asset = get_rules()
+    immutable = request.args.get('v') == rules_asset.digest
+    return asset_response(app.response_class, rules_asset, request, immutable)
+
+
+@app.route('/catalogue')
+def catalogue():
+    """Symptoms offered per appliance in manual mode"""
+    assets = get_assets()
+    immutable = request.args.get('v') == assets.catalogue.digest
+    return asset_response(app.response_class, assets.catalogue, request, immutable)
+
+def overloaded_response(error):
+    http_response = jsonify({'error': str(error)})
+    http_response.headers['Retry-After'] = str(error.retry_after)
+    return http_response, 429
 
-@app.route('/diagnose', methods=['POST'])
+
+def stages_response(response, status, trace):
+    """JSON response reporting which path each stage took (llm/fallback/degraded/session, table/engine)."""
+    http_response = jsonify(response)
+    http_response.status_code = status
+    http_response.headers['X-Diagnosis-Stages'] = ', '.join(f"{k}={v}" for k, v in trace.items())
+    return http_response
+
+
+@app.after_request
+def finish_response(response):
+    """Caching headers for deterministic responses, then compression"""
+    return shape_response(response, request, cacheable=g.get('cacheable', False))
+
+
+@app.route('/diagnose', methods=['GET', 'POST'])
 def diagnose():
-    """Process diagnosis request"""
+    """
+    Process diagnosis request. POST takes a JSON body (either mode); GET takes
+    a manual-mode case as query parameters and is cacheable. `?fields=a,b`
+    limits the response to those fields.
+    """
+    trace = metrics.start_trace()
     try:
-        data = request.get_json()
-        input_mode = data.get('input_mode', 'manual')
+        data = request.get_json() if request.method == 'POST' else manual_request(request.args)
+        fields = parse_fields(request.args.get('fields'))
+        rate_limiter, llm_limiter = get_limiters()
         
-        # Initialize engine
-        engine = DiagnosticEngine()
-        engine.reset()
+        # Per-client rate limit, then a slot for the LLM-backed stages. If no
+        # slot frees up in time the request is answered without the LLM.
+        granted = False
+        uses_llm = data.get('input_mode', 'manual') == 'natural' or explanation_uses_llm()
+        try:
+            rate_limiter.check(client_key())
+        except Overloaded as e:
+            return overloaded_response(e)
         
-        if input_mode == 'natural':
-            # Natural language mode
-            text = data.get('text', '')
-            appliance_hint = data.get('appliance_hint')
-            
-            if not text.strip():
-                return jsonify({'error': 'Please describe your problem'}), 400
-            
-            # Extract facts using LLM
-            try:
-                hint = None if appliance_hint == 'auto' else appliance_hint
+        # A re-submitted description that did not meaningfully change is
+        # answered from the session without touching the LLM
+        store = get_session_store()
+        session_id = request.cookies.get(sessions.COOKIE_NAME)
+        previous = store.get(session_id) if session_id else None
+        if (previous is not None and data.get('input_mode') == 'natural'
+                and data.get('appliance_hint') == previous['hint']
+                and not sessions.text_changed(previous['text'], data.get('text', ''))):
+            metrics.record('extraction', 'session')
+            metrics.record('diagnosis', 'session')
+            return stages_response(select_fields(previous['response'], fields), 200, trace)
+        
+        try:
+            if uses_llm:
+                granted = llm_limiter.acquire()
+        except Overloaded as e:
+            return overloaded_response(e)
+        
+        try:
+            response, status, facts = handle_diagnosis(data, use_llm=granted or not uses_llm, previous=previous)
+        finally:
+            if granted:
+                llm_limiter.release()
+        
+        # Manual-mode answers depend only on the case unless explanations come from the LLM
+        g.cacheable = request.method == 'GET' and status == 200 and not uses_llm
+        http_response = stages_response(select_fields(response, fields), status, trace)
+        if status == 200 and facts is not None:
+            if not session_id:
+                session_id = sessions.new_session_id()
+                http_response.set_cookie(sessions.COOKIE_NAME, session_id, max_age=int(os.getenv('SESSION_TTL', '1800')),
+                                         httponly=True, samesite='Lax')
+            store.set(session_id, {'text': data.get('text', ''), 'hint': data.get('appliance_hint'),
+                                   'facts': facts, 'response': response})
+        return http_response
+    
+    except FieldError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def handle_diagnosis(data, use_llm=True, previous=None):
+    """
+    Diagnose one request body; returns (response dict, HTTP status, facts key).
+    The facts key is set for natural-language requests whose facts the LLM
+    extracted (for the session); if it matches the previous request's facts,
+    that response is reused. Keyword-extracted answers are never stored or reused.
+    """
+    input_mode = data.get('input_mode', 'manual')
+    report = None
+    case = None
+    speculation = None
+    
+    if input_mode == 'natural':
+        # Natural language mode
+        text = data.get('text', '')
+        appliance_hint = data.get('appliance_hint')
+        
+        if not text.strip():
+            return {'error': 'Please describe your problem'}, 400, None
+        
+        hint = None if appliance_hint == 'auto' else appliance_hint
+        
+        # Optionally start the LLM explanation for the diagnosis the keyword
+        # extractor predicts, overlapping it with the LLM extraction below
+        if use_llm and speculation_enabled():
+            predicted = run_engine(CaseFacts.from_facts(extract_facts_by_keywords(text, hint)))
+            speculation = speculate_explanation(predicted)
+        
+        # Extract facts using LLM (keywords only when the server is under pressure)
+        try:
+            if use_llm:
                 extracted_facts = extract_facts_from_text(text, hint)
-                
-                if not extracted_facts:
-                    return jsonify({'error': 'Could not extract facts from your description'}), 400
-                
-                # Declare extracted facts
-                for fact in extracted_facts:
-                    engine.declare(fact)
-                
-                # Store extracted facts for display in readable format
-                extracted_facts_display = []
-                for fact in extracted_facts:
-                    fact_dict = fact.as_dict() if hasattr(fact, 'as_dict') else {}
-                    if 'appliance' in fact_dict:
-                        extracted_facts_display.append(f"Appliance: {fact_dict['appliance']}")
-                    elif 'symptom' in fact_dict:
-                        extracted_facts_display.append(f"Symptom: {fact_dict['symptom']}")
-                    elif 'noise_type' in fact_dict:
-                        extracted_facts_display.append(f"Noise Type: {fact_dict['noise_type']}")
-                    elif 'power' in fact_dict:
-                        extracted_facts_display.append(f"Power: {fact_dict['power']}")
-                    elif 'fuel' in fact_dict:
-                        extracted_facts_display.append(f"Fuel: {fact_dict['fuel']}")
-                    else:
-                        # Fallback to string representation
-                        extracted_facts_display.append(str(fact))
-            except Exception as e:
-                return jsonify({'error': f'AI extraction failed: {str(e)}'}), 500
-        else:
-            # Manual mode
-            appliance = data.get('appliance')
-            symptoms = data.get('symptoms', [])
-            observations = data.get('observations', {})
+            else:
+                metrics.record('extraction', 'degraded')
+                extracted_facts = extract_facts_by_keywords(text, hint)
             
-            if not appliance:
-                return jsonify({'error': 'Please select an appliance'}), 400
-            if not symptoms:
-                return jsonify({'error': 'Please select at least one symptom'}), 400
+            if not extracted_facts:
+                if speculation is not None:
+                    speculation.cancel()
+                return {'error': 'Could not extract facts from your description'}, 400, None
             
-            # Declare facts
-            engine.declare(Fact(appliance=appliance))
-            for symptom in symptoms:
-                engine.declare(Fact(symptom=symptom))
-            for key, value in observations.items():
-                if value:
-                    engine.declare(Fact(**{key: value}))
+            case = CaseFacts.from_facts(extracted_facts)
+            facts = facts_key(case) if metrics.outcome('extraction') == 'llm' else None
             
-            extracted_facts_display = None
-        
-        # Run diagnosis
-        engine.run()
-        report = engine.report
+            # Same facts as last time (e.g. a rephrased description): reuse that answer
+            if facts is not None and previous is not None and previous['facts'] == facts:
+                if speculation is not None:
+                    speculation.cancel()
+                metrics.record('diagnosis', 'session')
+                return previous['response'], 200, facts
+            
+            # Store extracted facts for display in readable format
+            extracted_facts_display = []
+            for fact in extracted_facts:
+                fact_dict = fact.as_dict() if hasattr(fact, 'as_dict') else {}
+                if 'appliance' in fact_dict:
+                    extracted_facts_display.append(f"Appliance: {fact_dict['appliance']}")
+                elif 'symptom' in fact_dict:
+                    extracted_facts_display.append(f"Symptom: {fact_dict['symptom']}")
+                elif 'noise_type' in fact_dict:
+                    extracted_facts_display.append(f"Noise Type: {fact_dict['noise_type']}")
+                elif 'power' in fact_dict:
+                    extracted_facts_display.append(f"Power: {fact_dict['power']}")
+                elif 'fuel' in fact_dict:
+                    extracted_facts_display.append(f"Fuel: {fact_dict['fuel']}")
+                else:
+                    # Fallback to string representation
+                    extracted_facts_display.append(str(fact))
+        except Exception as e:
+            if speculation is not None:
+                speculation.cancel()
+            return {'error': f'AI extraction failed: {str(e)}'}, 500, None
+    else:
+        # Manual mode
+        appliance = data.get('appliance')
+        symptoms = data.get('symptoms', [])
+        observations = data.get('observations', {})
         
-        if not report['best_fit']:
-            return jsonify({'error': 'Unable to generate diagnosis'}), 400
+        if not appliance:
+            return {'error': 'Please select an appliance'}, 400, None
+        if not symptoms:
+            return {'error': 'Please select at least one symptom'}, 400, None
         
-        # Generate LLM explanation for "Why this recommendation?"
-        friendly_explanation = None
-        if report['explanations']:
-            try:
-                from explanation_generator import explain_why_recommendation
-                friendly_explanation = explain_why_recommendation(
-                    diagnosis=report['best_fit']['diagnosis'],
-                    confidence=report['best_fit']['score'],
-                    explanations_list=report['explanations']
-                )
-            except Exception as e:
-                print(f"LLM explanation failed: {e}")
-                friendly_explanation = None
+        # Answer from the precomputed table when possible
+        diagnosis_table = get_diagnosis_table() if scoring_mode(data) == 'rules' else None
+        if diagnosis_table is not None:
+            report = diagnosis_table.lookup(appliance, symptoms, observations)
+            if report is not None:
+                metrics.record('diagnosis', 'table')
         
-        # Prepare response
-        response = {
-            'success': True,
+        case = CaseFacts(appliance, symptoms, observations)
+        extracted_facts_display = None
+        facts = None
+    
+    # Run diagnosis
+    if report is None and scoring_mode(data) == 'bayes':
+        report = get_bayes_model().diagnose(case)
+        if report is not None:
+            metrics.record('diagnosis', 'bayes')
+    if report is None:
+        report = run_engine(case)
+        metrics.record('diagnosis', 'engine')
+    
+    if not report['best_fit']:
+        if speculation is not None:
+            speculation.cancel()
+        return {'error': 'Unable to generate diagnosis'}, 400, None
+    
+    # Generate LLM explanation for "Why this recommendation?"
+    friendly_explanation = None
+    if speculation is not None:
+        friendly_explanation = speculation.resolve(report)
+    if report['explanations'] and friendly_explanation is None:
+        try:
+            friendly_explanation = explain_why_recommendation(
+                diagnosis=report['best_fit']['diagnosis'],
+                confidence=report['best_fit']['score'],
+                explanations_list=report['explanations'],
+                use_llm=use_llm
+            )
+        except Exception as e:
+            print(f"LLM explanation failed: {e}")
+            friendly_explanation = None
+    
+    # Prepare response
+    return {
+        'success': True,
+        'diagnosis': report['best_fit']['diagnosis'],
+        'confidence': report['best_fit']['score'],
+        'recommendation': report['best_fit']['recommendation'],
+        'alternatives': report['alternatives'],
+        'explanations': report['explanations'],
+        'friendly_explanation': friendly_explanation,
+        'extracted_facts': extracted_facts_display
+    }, 200, facts
+
+@app.route('/diagnose/next-question', methods=['POST'])
+def next_question():
+    """
+    Rank the questions worth asking next for a case (symptoms, observations
+    and the symptoms already answered "no") by expected information gain
+    """
+    from questions import next_questions
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    if not data.get('appliance') or not isinstance(data['appliance'], str):
+        return jsonify({'error': 'Please select an appliance'}), 400
+    limit = data.get('limit', 3)
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+        return jsonify({'error': "'limit' must be a positive integer"}), 400
+    try:
+        result = next_questions(get_bayes_model(), data['appliance'], data.get('symptoms', []),
+                                data.get('observations', {}), data.get('ruled_out', []), limit=limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(result, success=True))
+
+@app.route('/feedback', methods=['POST'])
+def feedback():
+    """Record a confirmed diagnosis for a case; the Bayes scoring mode learns from these"""
+    from bayes import feedback_entry, append_feedback
+    try:
+        entry = feedback_entry(request.get_json(silent=True) or {}, *get_knowledge_base())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    append_feedback(entry)
+    # This worker learns right away; other workers when they next build the model
+    if _bayes_model is not None:
+        _bayes_model.observe(entry)
+    metrics.record('feedback', 'recorded')
+    return jsonify({'success': True})
+
+@app.route('/metrics')
+def metrics_snapshot():
+    """Counters and gauges of this worker process"""
+    return jsonify(metrics.snapshot())
+
+@app.route('/diagnose/batch', methods=['POST'])
+def diagnose_batch():
+    """Diagnose several manual-mode cases (e.g. one visit ticket) in a single engine run"""
+    try:
+        response, status = handle_batch(request.get_json(silent=True), parse_fields(request.args.get('fields')))
+        return jsonify(response), status
+    
+    except FieldError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def handle_batch(data, fields=None):
+    """Diagnose a batch request body; returns (response dict, HTTP status)."""
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    cases = data.get('cases', [])
+    
+    if not isinstance(cases, list):
+        return {'error': "'cases' must be a list of cases"}, 400
+    if not cases:
+        return {'error': 'Please provide at least one case'}, 400
+    
+    case_facts = []
+    for i, case in enumerate(cases, 1):
+        if not isinstance(case, dict):
+            return {'error': f'Case {i}: expected an object'}, 400
+        if not case.get('appliance') or not isinstance(case['appliance'], str):
+            return {'error': f'Case {i}: please select an appliance'}, 400
+        if not case.get('symptoms'):
+            return {'error': f'Case {i}: please select at least one symptom'}, 400
+        symptoms = case['symptoms']
+        if not isinstance(symptoms, list) or not all(isinstance(symptom, str) for symptom in symptoms):
+            return {'error': f"Case {i}: 'symptoms' must be a list of symptom names"}, 400
+        observations = case.get('observations') or {}
+        if not isinstance(observations, dict):
+            return {'error': f"Case {i}: 'observations' must be an object"}, 400
+        case_facts.append(CaseFacts(case['appliance'], symptoms, observations))
+    
+    reports = [None] * len(case_facts)
+    if scoring_mode(data) == 'bayes':
+        reports = get_bayes_model().diagnose_many(case_facts)
+    elif get_diagnosis_table() is not None:
+        # Answer from the precomputed table when possible, like a single case
+        diagnosis_table = get_diagnosis_table()
+        reports = [diagnosis_table.lookup(case['appliance'], case['symptoms'], case.get('observations') or {})
+                   for case in cases]
+        metrics.increment('diagnosis.table', sum(report is not None for report in reports))
+    remaining = [i for i, report in enumerate(reports) if report is None]
+    if remaining:
+        with engine_pool.engine() as engine:
+            for i, report in zip(remaining, engine.run_cases([case_facts[i] for i in remaining])):
+                reports[i] = report
+    
+    results = []
+    for report in reports:
+        results.append(select_fields({
             'diagnosis': report['best_fit']['diagnosis'],
             'confidence': report['best_fit']['score'],
             'recommendation': report['best_fit']['recommendation'],
             'alternatives': report['alternatives'],
-            'explanations': report['explanations'],
-            'friendly_explanation': friendly_explanation,
-            'extracted_facts': extracted_facts_display
-        }
-        
-        return jsonify(response)
+            'explanations': report['explanations']
+        }, fields))
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return {'success': True, 'results': results}, 200
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # Development server only; see gunicorn.conf.py for production serving
+    warm_up()
+    app.run(debug=True, port=int(os.getenv('PORT', '5000')))
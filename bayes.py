@@ -0,0 +1,422 @@
+"""
+Naive-Bayes scoring mode.
+
+The rule path adds fixed points per matching rule and maps the total to a
+confidence with a hand-tuned curve (DiagnosticEngine.make_decision). This
+mode scores every diagnosis of an appliance at once as log-probabilities:
+
+    log P(d | facts) = log P(d) + sum of log P(f | d) over reported facts f - log Z
+
+Priors and likelihoods are counts. The rule points are read as pseudo-counts
+(a rule giving 30 points to a diagnosis counts as 3 cases of it showing the
+rule's facts), so the mode works before any feedback exists; confirmed
+diagnoses from the feedback log (FEEDBACK_LOG, appended to by POST /feedback)
+are added on top and soon outweigh them. Facts the user did not report are
+treated as unknown rather than absent.
+
+The result has the same shape as the engine's report, with posterior
+percentages as scores. Enable it with SCORING_MODE=bayes, or per request
+with "scoring": "bayes".
+
+Usage:
+    python bayes.py benchmark [--feedback feedback.jsonl]   # vs the rule path
+    python bayes.py evaluate --feedback feedback.jsonl      # held-out accuracy and calibration
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+
+
+def default_feedback_path():
+    """FEEDBACK_LOG (from the environment or .env), read when needed rather than at import."""
+    from groq_client import load_env
+    load_env()
+    return os.getenv('FEEDBACK_LOG', 'feedback.jsonl')
+
+# Pseudo-cases per rule point, and additive smoothing of every count
+PSEUDO_COUNTS_PER_POINT = 0.1
+SMOOTHING = 0.5
+
+_feedback_lock = threading.Lock()
+
+
+def _name(table, value):
+    return table.name(value) if isinstance(value, int) else value
+
+
+def case_features(case):
+    """(appliance name, feature names) of a CaseFacts; observations become 'key=value'."""
+    appliance = _name(APPLIANCES, case.appliance)
+    features = [_name(SYMPTOMS, symptom) for symptom in case.symptoms]
+    features += [f"{key}={_name(OBSERVATIONS, value)}" for key, value in case.observations.items()]
+    return appliance, features
+
+
+def _entry_features(entry):
+    features = list(dict.fromkeys(entry.get('symptoms') or []))
+    features += [f"{key}={value}" for key, value in (entry.get('observations') or {}).items() if value]
+    return features
+
+
+# =====================================================================
+# FEEDBACK LOG
+# =====================================================================
+
+def rule_diagnoses(artifact, appliance):
+    """Diagnoses an appliance's rules can score, from the exported rule tables."""
+    return {diagnosis for rule in artifact['rules'].get(appliance, ()) for diagnosis, _ in rule[2]}
+
+
+def feedback_entry(data, artifact, vocabulary):
+    """
+    Validate a feedback request body against the knowledge base and return the
+    log entry, or raise ValueError. The appliance must be known, the diagnosis
+    one its rules can give (rule_export.export_rules artifact), and symptoms and
+    observations in its rule vocabulary (engine.knowledge_base_vocabulary), so
+    feedback cannot add diagnoses or grow the model with made-up names.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    appliance, symptoms = data.get('appliance'), data.get('symptoms') or []
+    observations, diagnosis = data.get('observations') or {}, data.get('diagnosis')
+    if not appliance:
+        raise ValueError('Please select an appliance')
+    if not isinstance(appliance, str) or appliance not in APPLIANCES or appliance not in vocabulary:
+        raise ValueError(f"Unknown appliance: {appliance}")
+    if not isinstance(symptoms, list) or not all(isinstance(symptom, str) for symptom in symptoms):
+        raise ValueError("'symptoms' must be a list of symptom names")
+    if not symptoms:
+        raise ValueError('Please select at least one symptom')
+    unknown = [symptom for symptom in symptoms if symptom not in vocabulary[appliance]['symptoms']]
+    if unknown:
+        raise ValueError(f"Unknown symptoms for {appliance}: {', '.join(unknown)}")
+    if not isinstance(observations, dict):
+        raise ValueError("'observations' must be an object")
+    observations = {key: value for key, value in observations.items() if value}
+    for key, value in observations.items():
+        if value not in vocabulary[appliance]['observations'].get(key, ()):
+            raise ValueError(f"Unknown observation for {appliance}: {key}={value}")
+    if not diagnosis:
+        raise ValueError('Please give the confirmed diagnosis')
+    if diagnosis not in rule_diagnoses(artifact, appliance):
+        raise ValueError(f"Unknown diagnosis for {appliance}: {diagnosis}")
+    return {'appliance': appliance, 'symptoms': list(dict.fromkeys(symptoms)),
+            'observations': observations, 'diagnosis': diagnosis}
+
+
+def append_feedback(entry, path=None):
+    path = path or default_feedback_path()
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with _feedback_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+def load_feedback(path=None):
+    """Yield the entries of a feedback log (nothing if it does not exist); bad lines are skipped."""
+    path = path or default_feedback_path()
+    if not os.path.exists(path):
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and entry.get('appliance') and entry.get('diagnosis'):
+                yield entry
+
+
+# =====================================================================
+# MODEL
+# =====================================================================
+
+class _ApplianceModel:
+    """Log-prior vector and log-likelihood matrix (diagnoses x features) of one appliance."""
+
+    def __init__(self, diagnosis_counts, feature_counts, smoothing):
+        self.diagnoses = sorted(diagnosis_counts)
+        self.features = sorted({feature for _, feature in feature_counts})
+        self.feature_index = {feature: i for i, feature in enumerate(self.features)}
+
+        # Negative rule points (evidence against a diagnosis) can only take a count down to zero
+        totals = np.maximum([diagnosis_counts[d] for d in self.diagnoses], 0.0)
+        present = np.zeros((len(self.diagnoses), len(self.features)))
+        for i, diagnosis in enumerate(self.diagnoses):
+            for j, feature in enumerate(self.features):
+                present[i, j] = feature_counts.get((diagnosis, feature), 0.0)
+        present = np.clip(present, 0.0, totals[:, None])
+
+        self.log_prior = np.log(totals + smoothing) - np.log(totals.sum() + smoothing * len(totals))
+        self.log_likelihood = np.log(present + smoothing) - np.log(totals + 2 * smoothing)[:, None]
+        self.likelihood = np.exp(self.log_likelihood)
+
+    def posteriors(self, feature_matrix):
+        """Posterior probabilities for each row of a (cases x features) 0/1 matrix."""
+        logits = feature_matrix @ self.log_likelihood.T + self.log_prior
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def posterior(self, indexes):
+        """Posterior probabilities of one case, given its known feature indexes."""
+        logits = self.log_likelihood[:, indexes].sum(axis=1) + self.log_prior
+        probabilities = np.exp(logits - logits.max())
+        return probabilities / probabilities.sum()
+
+
+class BayesModel:
+    """
+    Naive-Bayes diagnoser built from the exported rule tables (rule_export.export_rules)
+    and an iterable of feedback entries.
+    """
+
+    def __init__(self, artifact, feedback=(), pseudo_counts_per_point=PSEUDO_COUNTS_PER_POINT,
+                 smoothing=SMOOTHING):
+        self.artifact = artifact
+        self.smoothing = smoothing
+        self.feedback_cases = 0
+        self._diagnosis_counts = {}   # appliance -> {diagnosis: count}
+        self._feature_counts = {}     # appliance -> {(diagnosis, feature): count}
+        self._rule_messages = {}      # appliance -> [(features, messages)]
+        self._models = {}
+        self._lock = threading.Lock()
+
+        for appliance, rules in artifact['rules'].items():
+            messages = self._rule_messages.setdefault(appliance, [])
+            for symptoms, observations, scores, message_ids, _ in rules:
+                features = list(symptoms) + [f"{key}={value}" for key, value in observations.items()]
+                messages.append((frozenset(features), [artifact['messages'][i][0] for i in message_ids]))
+                for diagnosis, points in scores:
+                    self._count(appliance, diagnosis, features, points * pseudo_counts_per_point)
+
+        for entry in feedback:
+            self._count(entry['appliance'], entry['diagnosis'], _entry_features(entry), 1.0)
+            self.feedback_cases += 1
+
+        for appliance in self._diagnosis_counts:
+            self._compile(appliance)
+
+    def _count(self, appliance, diagnosis, features, weight):
+        diagnoses = self._diagnosis_counts.setdefault(appliance, {})
+        diagnoses[diagnosis] = diagnoses.get(diagnosis, 0.0) + weight
+        counts = self._feature_counts.setdefault(appliance, {})
+        for feature in features:
+            counts[(diagnosis, feature)] = counts.get((diagnosis, feature), 0.0) + weight
+
+    def _compile(self, appliance):
+        self._models[appliance] = _ApplianceModel(self._diagnosis_counts[appliance],
+                                                  self._feature_counts[appliance], self.smoothing)
+
+    def observe(self, entry):
+        """Learn from one confirmed diagnosis (a feedback entry) in this process."""
+        with self._lock:
+            self._count(entry['appliance'], entry['diagnosis'], _entry_features(entry), 1.0)
+            self.feedback_cases += 1
+            self._compile(entry['appliance'])
+
+    def appliance_model(self, appliance):
+        """The compiled prior and likelihoods of an appliance (None if unknown), e.g. for questions.py."""
+        return self._models.get(appliance)
+
+    def _recommendation(self, diagnosis, score):
+        known = self.artifact['recommendations'].get(diagnosis)
+        if known is None:
+            default = self.artifact['default_recommendation']
+            known = default['high'] if score > 30 else default['low']
+        return known
+
+    def _report(self, appliance, features, probabilities, model):
+        scores = {d: round(float(p) * 100, 1) for d, p in zip(model.diagnoses, probabilities)}
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_diagnosis, best_score = ranked[0]
+        text, action = self._recommendation(best_diagnosis, best_score)
+        alternatives = []
+        for diagnosis, score in ranked[1:4]:
+            if score > 5:
+                alt_text, alt_action = self._recommendation(diagnosis, score)
+                alternatives.append({'diagnosis': diagnosis, 'score': score,
+                                     'recommendation': alt_text, 'action': alt_action})
+
+        reported = set(features)
+        explanations = []
+        for rule_features, messages in self._rule_messages.get(appliance, []):
+            if rule_features <= reported:
+                explanations += [m for m in messages if m not in explanations]
+        return {
+            'best_fit': {'diagnosis': best_diagnosis, 'score': best_score,
+                         'recommendation': text, 'action': action},
+            'alternatives': alternatives,
+            'explanations': explanations,
+            'scores': scores
+        }
+
+    def diagnose(self, case):
+        """
+        Report for a CaseFacts, or None if none of its facts are known for the
+        appliance (the rule path then gives its "insufficient information" answer).
+        """
+        appliance, features = case_features(case)
+        model = self._models.get(appliance)
+        if model is None:
+            return None
+        indexes = [model.feature_index[f] for f in dict.fromkeys(features) if f in model.feature_index]
+        if not indexes:
+            return None
+        return self._report(appliance, features, model.posterior(indexes), model)
+
+    def diagnose_many(self, cases):
+        """Reports for several cases; cases of one appliance are scored in a single matrix product."""
+        reports = [None] * len(cases)
+        by_appliance = {}
+        for position, case in enumerate(cases):
+            appliance, features = case_features(case)
+            model = self._models.get(appliance)
+            if model is None:
+                continue
+            indexes = [model.feature_index[f] for f in features if f in model.feature_index]
+            if indexes:
+                by_appliance.setdefault(appliance, []).append((position, features, indexes))
+
+        for appliance, members in by_appliance.items():
+            model = self._models[appliance]
+            matrix = np.zeros((len(members), len(model.features)))
+            for row, (_, _, indexes) in enumerate(members):
+                matrix[row, indexes] = 1.0
+            for (position, features, _), probabilities in zip(members, model.posteriors(matrix)):
+                reports[position] = self._report(appliance, features, probabilities, model)
+        return reports
+
+
+def build_model(engine=None, feedback_path=None):
+    """BayesModel from the live rules and the feedback log (entries the rules no longer know are skipped)."""
+    from engine import DiagnosticEngine, knowledge_base_vocabulary
+    from rule_export import export_rules
+    engine = engine or DiagnosticEngine()
+    artifact, vocabulary = export_rules(engine), knowledge_base_vocabulary(engine)
+    return BayesModel(artifact, valid_feedback(load_feedback(feedback_path), artifact, vocabulary))
+
+
+def valid_feedback(entries, artifact, vocabulary):
+    """The entries that pass feedback_entry() against the current rules."""
+    for entry in entries:
+        try:
+            yield feedback_entry(entry, artifact, vocabulary)
+        except ValueError:
+            continue
+
+
+# =====================================================================
+# BENCHMARK AND EVALUATION
+# =====================================================================
+
+def benchmark(feedback_path=None, repeats=5):
+    """Time per case of the rule path (engine, lookup table) and the Bayes path (single, batched)."""
+    from engine import DiagnosticEngine
+    from lookup_table import load_table
+    from rule_export import export_rules, _manual_cases
+    from symbols import CaseFacts
+
+    engine = DiagnosticEngine()
+    model = BayesModel(export_rules(engine), load_feedback(feedback_path))
+    cases = [CaseFacts(appliance, symptoms, observations)
+             for appliance, symptoms, observations in _manual_cases(engine)]
+    table = load_table()
+
+    def timed(label, fn):
+        best = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{label:<34} {best / len(cases) * 1e6:9.1f} µs/case")
+        return best
+
+    print(f"📊 {len(cases)} manual-mode cases, {model.feedback_cases} feedback cases, best of {repeats}")
+    rules_time = timed("Rules: engine, one run per case", lambda: [engine.run_cases([case]) for case in cases])
+    if table is not None:
+        def table_path():
+            for case in cases:
+                appliance, features = case_features(case)
+                symptoms = [f for f in features if '=' not in f]
+                observations = dict(f.split('=', 1) for f in features if '=' in f)
+                table.lookup(appliance, symptoms, observations)
+        timed("Rules: lookup table", table_path)
+    bayes_time = timed("Bayes: one case at a time", lambda: [model.diagnose(case) for case in cases])
+    timed("Bayes: batched per appliance", lambda: model.diagnose_many(cases))
+    verdict = "✅" if bayes_time <= rules_time else "❌"
+    print(f"{verdict} Bayes scoring is {rules_time / bayes_time:.0f}x the speed of the rule engine")
+
+
+def _calibration_error(confidences, correct, bins=10):
+    """Expected calibration error of top-1 confidences (0-1) against correctness."""
+    confidences, correct = np.asarray(confidences), np.asarray(correct, dtype=float)
+    edges = np.minimum((confidences * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        members = edges == b
+        if members.any():
+            error += members.mean() * abs(confidences[members].mean() - correct[members].mean())
+    return error
+
+
+def evaluate(feedback_path=None, holdout_every=5):
+    """
+    Fit on the feedback log minus every `holdout_every`-th entry and report
+    top-1 accuracy and calibration on the held-out entries, for both paths.
+    """
+    from engine import DiagnosticEngine
+    from rule_export import export_rules
+    from symbols import CaseFacts
+    feedback_path = feedback_path or default_feedback_path()
+
+    entries = list(load_feedback(feedback_path))
+    held_out = entries[::holdout_every]
+    if not held_out:
+        print(f"⚠️ No feedback in {feedback_path}; record confirmed diagnoses with POST /feedback first")
+        return None
+    training = [entry for i, entry in enumerate(entries) if i % holdout_every]
+    engine = DiagnosticEngine()
+    model = BayesModel(export_rules(engine), training)
+
+    results = {}
+    for label in ('rules', 'bayes'):
+        confidences, correct = [], []
+        for entry in held_out:
+            case = CaseFacts(entry['appliance'], entry['symptoms'], entry.get('observations'))
+            report = model.diagnose(case) if label == 'bayes' else None
+            if report is None:
+                report = engine.run_cases([case])[0]
+            confidences.append(report['best_fit']['score'] / 100)
+            correct.append(report['best_fit']['diagnosis'] == entry['diagnosis'])
+        results[label] = {'accuracy': float(np.mean(correct)),
+                          'mean_confidence': float(np.mean(confidences)),
+                          'calibration_error': _calibration_error(confidences, correct)}
+
+    print(f"📊 {len(training)} training / {len(held_out)} held-out feedback cases")
+    print(f"{'Path':<8} {'Accuracy':>9} {'Mean confidence':>16} {'Calibration error':>18}")
+    for label, result in results.items():
+        print(f"{label:<8} {result['accuracy']:9.1%} {result['mean_confidence']:16.1%} "
+              f"{result['calibration_error']:18.3f}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Naive-Bayes scoring mode: benchmark and evaluation")
+    parser.add_argument('command', choices=['benchmark', 'evaluate'])
+    parser.add_argument('--feedback', help="Default: FEEDBACK_LOG or feedback.jsonl")
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        benchmark(args.feedback, args.repeats)
+    else:
+        evaluate(args.feedback)
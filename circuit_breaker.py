@@ -0,0 +1,115 @@
+"""
+Circuit breaker for calls to a slow or failing dependency (the Groq API).
+
+closed     calls go through; the last `window` outcomes are tracked. When at
+           least `min_calls` were seen and the failure rate or the slow-call
+           rate reaches its threshold, the breaker opens.
+open       calls are rejected immediately with CircuitOpenError so callers
+           use their fallback instead of waiting for the SDK timeout.
+half_open  after `open_seconds`, up to `probes` trial calls are let through.
+           If they all succeed the breaker closes; any failure reopens it.
+
+State and transitions are published through metrics.py under `<name>.*`.
+"""
+import threading
+import time
+from collections import deque
+
+import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_rate=0.5, slow_call_seconds=5.0, slow_call_rate=0.8,
+                 window=20, min_calls=5, open_seconds=30.0, probes=1):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self._outcomes = deque(maxlen=window)  # (failed, slow) per finished call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        metrics.set_gauge(f"{name}.state", CLOSED)
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _set_state(self, state):
+        self._state = state
+        metrics.set_gauge(f"{self.name}.state", state)
+        metrics.increment(f"{self.name}.{state}")
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != CLOSED:
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+
+    def allow(self):
+        """Return True if a call may proceed now (reserving a probe slot when half-open)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.probes:
+                self._probes_in_flight += 1
+                return True
+            metrics.increment(f"{self.name}.short_circuited")
+            return False
+
+    def record(self, duration, failed):
+        """Record the outcome of a call that allow() let through."""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._set_state(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.probes:
+                        self._outcomes.clear()
+                        self._set_state(CLOSED)
+                return
+            if self._state == OPEN:
+                return  # A call that started before the breaker opened
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._set_state(OPEN)
+
+    def call(self, function, *args, **kwargs):
+        """Run function through the breaker; raises CircuitOpenError while open."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open; using fallback")
+        started = time.monotonic()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self.record(time.monotonic() - started, failed=True)
+            raise
+        self.record(time.monotonic() - started, failed=False)
+        return result
@@ -2,19 +2,18 @@
 LLM-based explanation generator using Groq
 Converts technical diagnostic reports into user-friendly explanations
 """
-from groq import Groq
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from explanation_templates import render_explanation
+from groq_client import get_client, create_completion, load_env
 
 class ExplanationGenerator:
     def __init__(self):
-        """Initialize Groq client for generating natural language explanations"""
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found")
-        self.client = Groq(api_key=api_key)
+        """Use the shared Groq client for generating natural language explanations"""
+        self.client = get_client()
     
     def generate_friendly_explanation(self, report):
         """
@@ -81,7 +80,8 @@ RULES:
 Remember: Be friendly, clear, and practical. Help them understand what's wrong and what to do next."""
 
         try:
-            response = self.client.chat.completions.create(
+            response = create_completion(
+                self.client,
                 model="llama-3.1-8b-instant",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -92,10 +92,12 @@ Remember: Be friendly, clear, and practical. Help them understand what's wrong a
             )
             
             friendly_explanation = response.choices[0].message.content.strip()
+            metrics.record('explanation', 'llm')
             return friendly_explanation
             
         except Exception as e:
             print(f"⚠️ LLM explanation generation failed: {e}")
+            metrics.record('explanation', 'fallback')
             # Fallback to basic explanation
             return self._fallback_explanation(best, report)
     
@@ -162,7 +164,8 @@ Technical Recommendation: {recommendation}
 
 Explain this alternative possibility in friendly, simple language (2-3 sentences):"""
 
-        response = generator.client.chat.completions.create(
+        response = create_completion(
+            generator.client,
             model="llama-3.1-8b-instant",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -180,7 +183,7 @@ Explain this alternative possibility in friendly, simple language (2-3 sentences
         return recommendation
 
 
-def explain_why_recommendation(diagnosis, confidence, explanations_list):
+def explain_why_recommendation(diagnosis, confidence, explanations_list, use_llm=True):
     """
     Generate natural language explanation for "Why this recommendation?" section.
     Converts technical expert system explanations (bullet points) into friendly narrative.
@@ -189,10 +192,25 @@ def explain_why_recommendation(diagnosis, confidence, explanations_list):
         diagnosis: The primary diagnosis name
         confidence: Confidence percentage
         explanations_list: List of technical explanation strings from expert system
+        use_llm: False when the server is under pressure; never calls the LLM
     
     Returns:
         String with friendly explanation of the reasoning
+    
+    Rendered locally from templates unless EXPLANATION_MODE=llm is set or a
+    fired rule has no template.
     """
+    load_env()
+    if os.getenv("EXPLANATION_MODE", "template") != "llm" or not use_llm:
+        friendly = render_explanation(diagnosis, confidence, explanations_list)
+        if friendly is not None:
+            metrics.record('explanation', 'template')
+            return friendly
+    
+    if not use_llm:
+        metrics.record('explanation', 'degraded')
+        return _bullet_explanation(explanations_list)
+    
     try:
         generator = ExplanationGenerator()
         
@@ -222,7 +240,8 @@ Technical Reasoning (from expert system):
 
 Explain WHY these symptoms point to this diagnosis in friendly, natural language (2-3 sentences):"""
 
-        response = generator.client.chat.completions.create(
+        response = create_completion(
+            generator.client,
             model="llama-3.1-8b-instant",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -232,12 +251,120 @@ Explain WHY these symptoms point to this diagnosis in friendly, natural language
             max_tokens=200
         )
         
+        metrics.record('explanation', 'llm')
         return response.choices[0].message.content.strip()
         
     except Exception as e:
         print(f"⚠️ LLM explanation for 'why recommendation' failed: {e}")
-        # Fallback to bullet points
-        return "Based on the following factors:\n" + "\n".join([f"✓ {exp}" for exp in explanations_list])
+        metrics.record('explanation', 'fallback')
+        return _bullet_explanation(explanations_list)
+
+
+def _bullet_explanation(explanations_list):
+    """Fallback: the expert system's reasoning as bullet points"""
+    return "Based on the following factors:\n" + "\n".join([f"✓ {exp}" for exp in explanations_list])
+
+
+# =====================================================================
+# SPECULATIVE EXPLANATIONS
+# =====================================================================
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def explanation_uses_llm():
+    """True when "Why this recommendation?" is written by the LLM (EXPLANATION_MODE=llm)."""
+    load_env()
+    return os.getenv("EXPLANATION_MODE", "template") == "llm"
+
+
+def speculation_enabled():
+    """True when SPECULATIVE_EXPLANATIONS=1 (only useful when explanations come from the LLM)."""
+    load_env()
+    return os.getenv("SPECULATIVE_EXPLANATIONS", "0") == "1"
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("SPECULATION_WORKERS", "8")),
+                    thread_name_prefix="speculation"
+                )
+    return _executor
+
+
+class SpeculativeExplanation:
+    """
+    An explain_why_recommendation() call started for a predicted report
+    before the real diagnosis is known. resolve() keeps the result only if
+    the real report has the predicted best-fit diagnosis, score and
+    explanations (the inputs of the call), otherwise discards it.
+    """
+
+    def __init__(self, report):
+        self.diagnosis = report['best_fit']['diagnosis']
+        self.confidence = report['best_fit']['score']
+        self.explanations = list(report['explanations'])
+        self.started = time.perf_counter()
+        self.finished = None
+        self.future = _get_executor().submit(
+            self._run, self.diagnosis, self.confidence, self.explanations
+        )
+
+    def _run(self, diagnosis, confidence, explanations_list):
+        # Own trace: the request's trace only reports the outcome if the guess is used
+        trace = metrics.start_trace()
+        try:
+            return explain_why_recommendation(diagnosis, confidence, explanations_list), trace.get('explanation')
+        finally:
+            self.finished = time.perf_counter()
+
+    def matches(self, report):
+        """Whether the explanation was started for the same inputs as `report`'s."""
+        best = report['best_fit']
+        return ((best['diagnosis'], best['score'], list(report['explanations']))
+                == (self.diagnosis, self.confidence, self.explanations))
+
+    def cancel(self):
+        """Drop the speculation (the request ended without needing it)."""
+        self.future.cancel()  # Only stops it if it has not started yet
+
+    def resolve(self, report):
+        """Return the speculated explanation if it was made for `report`'s inputs, else None."""
+        if not self.matches(report):
+            self.cancel()
+            metrics.record('speculation', 'miss')
+            return None
+        try:
+            friendly, outcome = self.future.result()
+        except Exception as e:
+            print(f"⚠️ Speculative explanation failed: {e}")
+            return None
+        metrics.record('speculation', 'hit')
+        metrics.annotate('explanation', outcome)
+        # Time the request did not have to wait: how far the call had already got
+        saved = min(self.finished, time.perf_counter()) - self.started
+        metrics.increment('speculation.saved_ms', int(saved * 1000))
+        return friendly
+
+
+def speculate_explanation(report):
+    """
+    Start the "Why this recommendation?" explanation for a predicted report
+    in the background. Returns a SpeculativeExplanation, or None when there is
+    nothing to explain or the explanation would come from a template anyway.
+    """
+    if not report.get('best_fit') or not report.get('explanations'):
+        return None
+    best = report['best_fit']
+    if (os.getenv("EXPLANATION_MODE", "template") != "llm"
+            and render_explanation(best['diagnosis'], best['score'], report['explanations']) is not None):
+        return None
+    return SpeculativeExplanation(report)
 
 
 def generate_explanation(report):
@@ -245,7 +372,7 @@ def generate_explanation(report):
     Convenience function to generate friendly explanation from report
     
     Usage:
-        friendly_text = generate_explanation(engine.report)
+        friendly_text = generate_explanation(engine.diagnose(case))
     """
     try:
         generator = ExplanationGenerator()
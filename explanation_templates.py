@@ -0,0 +1,253 @@
+"""
+Template-based "Why this recommendation?" explanations.
+
+Every rule (knowledge_base/, engine.py) explains itself with a fixed sentence. TEMPLATES maps
+each of those sentences to a plain-language version, so the explanation for a
+report can be assembled locally in microseconds instead of asking the LLM to
+paraphrase it. The opening line is filled in with the diagnosis and
+confidence.
+
+render_explanation() returns None when a report contains a sentence with no
+template (e.g. a newly added rule); the caller then uses the LLM.
+
+Usage:
+    python explanation_templates.py     # template coverage of the rules
+"""
+import re
+
+# Opening line by confidence (minimum confidence, template)
+OPENINGS = [
+    (75, "Everything you described fits {diagnosis} well, so we're {confidence}% confident in it."),
+    (50, "{diagnosis} is the most likely cause ({confidence}% confidence), though the other possibilities are worth keeping in mind."),
+    (0, "{diagnosis} is our best guess at {confidence}% confidence; more details would help narrow it down."),
+]
+
+# Placeholder diagnoses that get no opening line
+NO_OPENING = ('Insufficient Information', 'Unable to Diagnose - Insufficient Information')
+
+# Rule explanation -> plain-language sentence
+TEMPLATES = {
+    # Washing machine
+    "Symptom 'Won't Start' suggests a power, door latch, or control issue.":
+        "A washer that won't start usually has a power, door latch or control problem.",
+    "Please verify the washing machine is plugged in and the outlet is working.":
+        "First make sure the machine is plugged in and the outlet actually has power.",
+    "Since power is confirmed, the door latch or control board is likely faulty.":
+        "Because the power checks out, the door latch or the control board is the likely culprit.",
+    "Symptom 'Won't Drain' points to a blockage or pump failure.":
+        "Water that won't drain usually means something is blocking the way out or the pump has failed.",
+    "'Gurgling' noise strongly suggests a drainage blockage.":
+        "A gurgling sound is a classic sign of water struggling past a blockage.",
+    "'Grinding' noise strongly suggests a motor, pump, or bearing failure.":
+        "A grinding noise usually comes from a worn motor, pump or bearing.",
+    "'Banging' noise often indicates an unbalanced load or worn drum bearings.":
+        "Banging is most often an unbalanced load, or drum bearings that have worn out.",
+    "Water leaking could be from the door seal, hose connections, or drain pump.":
+        "Leaks usually come from the door seal, a hose connection or the drain pump.",
+    "'Not Spinning' suggests a drive belt, motor coupler, or control issue.":
+        "When the drum won't spin, the drive belt, motor coupler or controls are the usual suspects.",
+    "Won't drain AND won't spin together indicates a severely clogged filter or failed pump.":
+        "Not draining and not spinning together usually means the filter is badly clogged or the pump has failed.",
+    "Leaking with spinning failure strongly suggests worn drum bearings or tub seal damage.":
+        "Leaking combined with a drum that won't spin points strongly to worn drum bearings or a damaged tub seal.",
+    "Won't drain with leaking indicates damaged pump or severely blocked hose.":
+        "Leaking while the water won't drain suggests a damaged pump or a badly blocked hose.",
+    "Noise with spinning failure points to worn bearings or broken drive belt.":
+        "Noise together with a drum that won't spin points to worn bearings or a broken drive belt.",
+    "Excessive vibration suggests unbalanced load, worn shock absorbers, or machine not level.":
+        "Heavy vibration usually comes from an unbalanced load, worn shock absorbers or a machine that isn't level.",
+    "Burning smell indicates motor overheating, worn belt friction, or electrical issue.":
+        "A burning smell means the motor is overheating, a worn belt is rubbing, or there is an electrical fault.",
+    "Water not filling suggests faulty inlet valve, clogged screen, or low pressure.":
+        "If water isn't coming in, the inlet valve may be faulty, its screen clogged, or the water pressure too low.",
+    "Door won't lock indicates faulty latch mechanism or control board issue.":
+        "A door that won't lock usually has a faulty latch or a control board problem.",
+    # Fan
+    "A fan that won't start may have a power, fuse, or switch problem.":
+        "A fan that won't start usually has a power, fuse or switch problem.",
+    "With power confirmed, a blown thermal fuse or failed motor is most likely.":
+        "Since the power is fine, a blown thermal fuse or a failed motor is the most likely cause.",
+    "Please check if the fan is plugged in and the outlet has power.":
+        "First check that the fan is plugged in and the outlet has power.",
+    "Wobbling is typically caused by unbalanced or damaged blades.":
+        "Wobbling almost always comes from blades that are unbalanced or damaged.",
+    "Slow speed suggests dust buildup, worn bearings, or capacitor issues.":
+        "Running slowly is typically caused by dust buildup, worn bearings or a weak capacitor.",
+    "Unusual noise indicates worn bearings, loose parts, or obstructions.":
+        "Unusual noises come from worn bearings, loose parts or something getting in the way.",
+    "Overheating may result from motor overload or dust restricting airflow.":
+        "Overheating can come from an overloaded motor or dust blocking the airflow.",
+    "Noise with wobbling indicates worn motor bearings combined with unbalanced blades.":
+        "Noise together with wobbling suggests worn motor bearings on top of unbalanced blades.",
+    "Slow speed with overheating indicates severe dust buildup restricting airflow.":
+        "Running slowly while getting hot points to heavy dust buildup choking the airflow.",
+    "Noise with slow speed points to worn bearings or failing capacitor.":
+        "Noise combined with slow speed points to worn bearings or a failing capacitor.",
+    "Wobbling with overheating suggests loose mounting causing motor strain.":
+        "Wobbling plus overheating suggests loose mounting that is straining the motor.",
+    "No oscillation indicates broken gear or dry mechanism needing lubrication.":
+        "If the fan no longer turns side to side, the oscillation gear may be broken or simply needs lubricating.",
+    "Sparks indicate serious electrical issue requiring immediate attention.":
+        "Sparks are a sign of a serious electrical fault and need attention right away.",
+    "Intermittent operation suggests loose connection or failing capacitor.":
+        "A fan that keeps cutting in and out usually has a loose connection or a failing capacitor.",
+    # Power generator
+    "A generator that won't start often has fuel, battery, or ignition issues.":
+        "A generator that won't start usually has a fuel, battery or ignition problem.",
+    "The fuel tank is empty or the fuel line may be clogged.":
+        "The fuel tank is empty, or the fuel line may be clogged.",
+    "With fuel present, check the battery, spark plug, or carburetor.":
+        "Since there is fuel, the battery, spark plug or carburetor is the next thing to check.",
+    "Low power output suggests overload, air filter issues, or voltage regulation problems.":
+        "Weak power output usually means an overload, a dirty air filter or a voltage regulation problem.",
+    "Generator runs but produces no power indicates AVR or breaker failure.":
+        "An engine that runs without producing electricity points to a failed voltage regulator (AVR) or breaker.",
+    "Excessive smoke indicates oil issues, clogged air filter, or fuel mixture problems.":
+        "Heavy smoke comes from oil problems, a clogged air filter or the wrong fuel mixture.",
+    "Overheating is often caused by low oil, blocked vents, or overload.":
+        "Overheating is usually caused by low oil, blocked vents or running too much load.",
+    "Backfiring suggests carburetor timing, exhaust, or fuel quality issues.":
+        "Backfiring suggests a carburetor timing, exhaust or fuel quality problem.",
+    "Oil leaking indicates worn seal, cracked gasket, or overfilled oil reservoir.":
+        "Oil leaks come from a worn seal, a cracked gasket or an overfilled oil reservoir.",
+    "Engine surging suggests restricted air intake or fuel flow irregularities.":
+        "An engine that surges is usually starved of air or getting an uneven fuel flow.",
+    "High fuel consumption suggests carburetor needs adjustment or air filter is clogged.":
+        "Burning through fuel quickly suggests the carburetor needs adjusting or the air filter is clogged.",
+    "Battery not charging indicates faulty alternator or charging circuit issue.":
+        "A battery that doesn't charge points to a faulty alternator or charging circuit.",
+    "Smoke with overheating is a CRITICAL sign of oil level problems - check immediately!":
+        "⚠️ Smoke together with overheating is a critical sign of low oil - check the oil level immediately.",
+    "Low power with smoke indicates severely clogged air filter or fuel mixture issues.":
+        "Weak power together with smoke points to a badly clogged air filter or a fuel mixture problem.",
+    "Backfiring with smoke strongly suggests bad fuel or serious carburetor problems.":
+        "Backfiring with smoke strongly suggests bad fuel or a serious carburetor problem.",
+    "Low power with overheating indicates generator overload or voltage regulator failure.":
+        "Weak power while overheating suggests the generator is overloaded or its voltage regulator is failing.",
+    "No electricity output with low power conclusively points to AVR failure.":
+        "No electricity together with weak output clearly points to a failed voltage regulator (AVR).",
+    # Kitchen grinder
+    "A grinder that won't start may have power, overload, or motor issues.":
+        "A grinder that won't start usually has a power, overload or motor problem.",
+    "With power confirmed, the thermal overload may have tripped or the motor is burned out.":
+        "Since the power is fine, the overload protection may have tripped or the motor has burned out.",
+    "Please verify the grinder is plugged in and the outlet is working.":
+        "First make sure the grinder is plugged in and the outlet is working.",
+    "Weak grinding performance indicates dull blades or motor wear.":
+        "Weak grinding usually means the blades are dull or the motor is wearing out.",
+    "Excessive vibration suggests unbalanced blades or loose mounting.":
+        "Strong vibration suggests unbalanced blades or loose mounting.",
+    "Burning smell indicates motor overheating or electrical problems - stop using immediately!":
+        "🔥 A burning smell means the motor is overheating or there is an electrical fault - stop using it now.",
+    "Jamming occurs when foreign objects are present or the grinder is overloaded.":
+        "Jamming happens when something hard is stuck inside or the grinder is overloaded.",
+    "Leaking indicates worn gaskets, loose assembly, or container damage.":
+        "Leaks come from worn gaskets, loose assembly or a damaged jar.",
+    "Quick overheating suggests blocked ventilation or continuous overloading.":
+        "Getting hot quickly suggests blocked ventilation or running it overloaded for too long.",
+    "Lid not securing indicates worn lock mechanism or safety switch issue.":
+        "A lid that won't lock points to a worn lock mechanism or a safety switch problem.",
+    "Uneven grinding results from dull blades or loose blade assembly.":
+        "Uneven grinding comes from dull blades or a loose blade assembly.",
+    "Sparks indicate worn motor brushes or electrical short requiring immediate attention.":
+        "⚠️ Sparks mean worn motor brushes or a short circuit, which needs attention right away.",
+    "CRITICAL: Burning smell with vibration indicates worn motor bearings - stop using immediately!":
+        "🔥 A burning smell together with vibration means the motor bearings are worn - stop using it now.",
+    "Weak grinding with burning smell indicates motor is overloaded and overheating - reduce load.":
+        "Weak grinding with a burning smell means the motor is overloaded and overheating - use smaller loads.",
+    "Jamming with vibration strongly indicates foreign object stuck in chamber.":
+        "Jamming together with vibration strongly suggests something is stuck in the jar.",
+    "Weak grinding with vibration indicates dull or unbalanced blades.":
+        "Weak grinding with vibration points to dull or unbalanced blades.",
+    "Leaking with vibration indicates loose assembly or worn gasket from vibration.":
+        "Leaking with vibration suggests the assembly has shaken loose or the gasket has worn.",
+    "STOP: Jamming with burning smell means severe overload or jammed object - turn off now!":
+        "🔥 Jamming with a burning smell means a severe overload or a stuck object - switch it off now.",
+    # No symptoms / no diagnosis
+    "RECOMMENDATION: Start with basic troubleshooting:":
+        "Start with these basic checks:",
+    "1. Check if the appliance is properly plugged in":
+        "1. Check if the appliance is properly plugged in",
+    "2. Verify the power outlet is working":
+        "2. Verify the power outlet is working",
+    "3. Look for any obvious damage or loose parts":
+        "3. Look for any obvious damage or loose parts",
+    "4. Check if any safety switches or breakers have tripped":
+        "4. Check if any safety switches or breakers have tripped",
+    "5. Consult the user manual for basic troubleshooting steps":
+        "5. Consult the user manual for basic troubleshooting steps",
+    "Unable to provide a specific diagnosis with the information provided.":
+        "There isn't enough information yet to point to a specific fault.",
+}
+
+# Explanations with a variable part: (pattern, template using the groups)
+PATTERN_TEMPLATES = [
+    (re.compile(r"No specific symptoms were reported for the (.+)\.$"),
+     "You didn't mention any specific symptoms for the {0}, so we can't narrow the problem down yet."),
+]
+
+
+def plain_sentence(explanation):
+    """Plain-language version of one rule explanation, or None if it has no template."""
+    template = TEMPLATES.get(explanation)
+    if template is not None:
+        return template
+    for pattern, template in PATTERN_TEMPLATES:
+        match = pattern.match(explanation)
+        if match:
+            return template.format(*match.groups())
+    return None
+
+
+def render_explanation(diagnosis, confidence, explanations_list):
+    """
+    Plain-language explanation for a report, or None if any explanation has
+    no template.
+    """
+    sentences = []
+    for explanation in explanations_list:
+        sentence = plain_sentence(explanation)
+        if sentence is None:
+            return None
+        if sentence not in sentences:
+            sentences.append(sentence)
+
+    opening = None
+    if confidence and diagnosis not in NO_OPENING:
+        opening = next(template for minimum, template in OPENINGS if confidence >= minimum)
+        opening = opening.format(diagnosis=diagnosis, confidence=confidence)
+
+    # Numbered steps stay on their own lines; everything else reads as a paragraph
+    paragraph = [s for s in sentences if not s[:1].isdigit()]
+    steps = [s for s in sentences if s[:1].isdigit()]
+    text = " ".join(([opening] if opening else []) + paragraph)
+    if steps:
+        text += "\n" + "\n".join(steps)
+    return text
+
+
+def rule_explanations(source=None):
+    """Fixed explanation strings passed to self.explain(...) in engine.py and the knowledge_base modules."""
+    import ast
+    import os
+    if source is None:
+        import knowledge_base
+        paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engine.py')] + knowledge_base.source_paths()
+        source = ''
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                source += f.read() + '\n'
+    messages = []
+    for node in ast.walk(ast.parse(source)):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'explain'
+                and len(node.args) == 2 and isinstance(node.args[1], ast.Constant)):
+            messages.append(node.args[1].value)
+    return messages
+
+
+if __name__ == '__main__':
+    messages = rule_explanations()
+    missing = [m for m in messages if plain_sentence(m) is None]
+    print(f"📋 {len(messages) - len(missing)}/{len(messages)} rule explanations have a template")
+    for message in missing:
+        print(f"   ⚠️ no template: {message}")
@@ -0,0 +1,164 @@
+"""
+Prompt builder for the LLM fact extractor.
+
+The system prompt is split into a static prefix (role, JSON schema, mapping
+rules), which is byte-identical on every call so the provider can cache it,
+followed by the vocabulary and examples. When the user picked an appliance,
+only that appliance's symptoms and observations are listed, taken from the
+compiled rules so every term offered is one the engine can score.
+
+Usage:
+    python extractor_prompt.py      # prompt size per appliance
+"""
+from functools import lru_cache
+
+# Identical for every call; keep it first so provider-side prompt caching applies
+STATIC_PREFIX = """You are a fact extractor for an appliance diagnostic expert system.
+Extract ONLY this JSON structure from user descriptions:
+
+{
+  "appliance": "Washing Machine" | "Fan" | "Power Generator" | "Kitchen Grinder",
+  "symptoms": ["symptom1", "symptom2"],
+  "observations": {"key": "value"}
+}
+
+Rules:
+1. Map casual language to standard terms (e.g., "won't turn on" → "Wont Start")
+2. Detect multiple symptoms if mentioned
+3. Extract noise type if described
+4. Return ONLY valid JSON, no explanation or markdown
+"""
+
+# Vocabulary offered when no appliance hint is given
+STANDARD_SYMPTOMS = [
+    "Wont Start",
+    "Wont Drain",
+    "Not Spinning",
+    "Leaking Water",
+    "Loud Noise",
+    "Excessive Vibration",
+    "Burning Smell",
+    "Water Not Filling",
+    "Door Wont Lock",
+    "Wobbles",
+    "Slow Speed",
+    "Overheating",
+    "Not Oscillating",
+    "Sparks",
+    "Intermittent Operation",
+    "Wont Turn On",
+    "No Power Output",
+    "Low Power Output",
+    "Excessive Smoke",
+    "Backfiring",
+    "Oil Leaking",
+    "Engine Surging",
+    "High Fuel Consumption",
+    "Battery Not Charging",
+    "Weak Grinding",
+    "Vibration",
+    "Jamming",
+    "Leaking",
+    "Overheating Quickly",
+    "Lid Not Secure",
+    "Uneven Grinding",
+    "Sparks Inside",
+]
+
+STANDARD_OBSERVATIONS = {
+    "noise_type": ["Gurgling", "Grinding", "Banging", "Squealing"],
+    "power": ["Checked", "Not Checked"],
+    "fuel": ["Empty", "Full"],
+}
+
+EXAMPLES = {
+    "Washing Machine": (
+        "My washing machine won't drain and makes a grinding noise",
+        '{"appliance": "Washing Machine", "symptoms": ["Wont Drain", "Loud Noise"], "observations": {"noise_type": "Grinding"}}'
+    ),
+    "Fan": (
+        "Fan is wobbling and getting too hot",
+        '{"appliance": "Fan", "symptoms": ["Wobbles", "Overheating"], "observations": {}}'
+    ),
+    "Power Generator": (
+        "Generator producing smoke and smells like fuel",
+        '{"appliance": "Power Generator", "symptoms": ["Excessive Smoke"], "observations": {}}'
+    ),
+    "Kitchen Grinder": (
+        "The grinder keeps jamming and smells like something is burning",
+        '{"appliance": "Kitchen Grinder", "symptoms": ["Jamming", "Burning Smell"], "observations": {}}'
+    ),
+}
+
+# Examples used in the full (no hint) prompt
+DEFAULT_EXAMPLES = ("Washing Machine", "Fan", "Power Generator")
+
+
+@lru_cache(maxsize=1)
+def _appliance_vocabulary():
+    # Imported here so building the full prompt never compiles the rules
+    from engine import knowledge_base_vocabulary
+    return knowledge_base_vocabulary()
+
+
+def _vocabulary_section(symptoms, observations):
+    lines = ["Standard Symptoms (use EXACTLY these terms):"]
+    lines += [f"- {symptom}" for symptom in symptoms]
+    if observations:
+        lines += ["", "Observations (optional):"]
+        lines += [f"- {key}: " + " | ".join(f'"{value}"' for value in values)
+                  for key, values in observations.items()]
+    return "\n".join(lines) + "\n"
+
+
+def _examples_section(appliances):
+    lines = ["Examples:"]
+    for appliance in appliances:
+        text, output = EXAMPLES[appliance]
+        lines += [f'Input: "{text}"', f"Output: {output}", ""]
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=None)
+def build_system_prompt(preferred_appliance=None):
+    """
+    System prompt for one extraction call. With a known `preferred_appliance`
+    the vocabulary and examples are limited to that appliance; otherwise the
+    full vocabulary is used. Built once per appliance.
+    """
+    vocabulary = _appliance_vocabulary().get(preferred_appliance) if preferred_appliance in EXAMPLES else None
+    if vocabulary is None:
+        return "\n".join([
+            STATIC_PREFIX,
+            _vocabulary_section(STANDARD_SYMPTOMS, STANDARD_OBSERVATIONS),
+            _examples_section(DEFAULT_EXAMPLES),
+        ])
+    return "\n".join([
+        STATIC_PREFIX,
+        _vocabulary_section(vocabulary['symptoms'], vocabulary['observations']),
+        _examples_section([preferred_appliance]),
+    ])
+
+
+def build_user_prompt(user_text, preferred_appliance=None):
+    user_prompt = f"""User description: "{user_text}"
+"""
+    if preferred_appliance:
+        user_prompt += f"Preferred appliance (if ambiguous): {preferred_appliance}\n"
+    user_prompt += "\nReturn JSON only:"
+    return user_prompt
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English)."""
+    return max(1, len(text) // 4)
+
+
+if __name__ == '__main__':
+    full = build_system_prompt()
+    print(f"{'(no hint)':<18} {len(full):6d} chars  ~{estimate_tokens(full)} tokens")
+    for appliance in EXAMPLES:
+        prompt = build_system_prompt(appliance)
+        saved = 1 - len(prompt) / len(full)
+        print(f"{appliance:<18} {len(prompt):6d} chars  ~{estimate_tokens(prompt)} tokens  ({saved:.0%} smaller)")
+    print(f"Static (cacheable) prefix: {len(STATIC_PREFIX)} chars")
@@ -0,0 +1,235 @@
+"""
+Strict parser for the LLM extractor's JSON output.
+
+Parses the model's reply in one pass into a CaseFacts, validating it against
+the expected shape:
+
+    {"appliance": str | null, "symptoms": [str, ...], "observations": {key: str}}
+
+Common defects are repaired locally instead of failing over to the keyword
+fallback: markdown fences or prose around the object, trailing commas and
+output truncated mid-object. Names that are not in the vocabulary are mapped
+to the closest canonical name (case, punctuation and up to two typos), using
+a deletion index built once at import; names with no close match are dropped
+since they would match no rule.
+
+Uses orjson when it is installed, the standard json module otherwise.
+"""
+import re
+
+from extractor_prompt import STANDARD_OBSERVATIONS
+from symbols import APPLIANCE_NAMES, SYMPTOM_NAMES, OBSERVATION_KEYS, CaseFacts
+
+try:
+    import orjson
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:
+    import json
+    _loads = json.loads
+    _DecodeError = json.JSONDecodeError
+
+MAX_EDITS = 2
+
+
+class FactParseError(ValueError):
+    """The LLM output could not be parsed or does not match the schema."""
+
+
+def _normalize(name):
+    """Lower-case and drop everything but letters and digits ("Won't start" -> "wontstart")."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def _deletes(word, edits):
+    """All strings reachable from word by deleting up to `edits` characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def _distance(a, b):
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class NameIndex:
+    """
+    Maps free-form names to a fixed vocabulary. Exact matches after
+    normalization are a dict hit; near misses are found through a
+    precomputed deletion index (symmetric delete), then confirmed with the
+    true edit distance.
+    """
+
+    def __init__(self, names, max_edits=MAX_EDITS):
+        self.max_edits = max_edits
+        self._exact = {_normalize(name): name for name in names}
+        self._deletes = {}
+        for key in self._exact:
+            for variant in _deletes(key, max_edits):
+                self._deletes.setdefault(variant, set()).add(key)
+        self._cache = {}
+
+    def match(self, name):
+        """Return the canonical name for `name`, or None if nothing is close enough."""
+        if name in self._cache:
+            return self._cache[name]
+        key = _normalize(name)
+        result = self._exact.get(key)
+        if result is None and key:
+            # Short names tolerate fewer typos ("fan" must not become "fun")
+            edits = min(self.max_edits, max(0, len(key) // 4))
+            candidates = set()
+            for variant in _deletes(key, edits):
+                candidates |= self._deletes.get(variant, set())
+            scored = sorted((_distance(key, candidate), candidate) for candidate in candidates)
+            if scored and scored[0][0] <= edits:
+                result = self._exact[scored[0][1]]
+        if len(self._cache) < 4096:
+            self._cache[name] = result
+        return result
+
+
+APPLIANCE_INDEX = NameIndex(APPLIANCE_NAMES)
+SYMPTOM_INDEX = NameIndex(SYMPTOM_NAMES)
+OBSERVATION_INDEXES = {key: NameIndex(values) for key, values in STANDARD_OBSERVATIONS.items()}
+OBSERVATION_KEY_INDEX = NameIndex(OBSERVATION_KEYS)
+
+
+def _json_object(text):
+    """
+    Return (JSON object text, truncated) for an LLM reply: fences and
+    surrounding prose are cut off, and a truncated object is closed.
+    """
+    start = text.find('{')
+    if start < 0:
+        raise FactParseError("No JSON object in LLM output")
+
+    closers = []
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]':
+            if not closers or closers.pop() != char:
+                raise FactParseError("Unbalanced brackets in LLM output")
+            if not closers:
+                return text[start:index + 1], False
+
+    # Truncated: drop the partial string, a key without a value and a dangling
+    # comma, then close the open brackets
+    body = text[start:]
+    if in_string:
+        body = body[:body.rfind('"')]
+    body = body.rstrip()
+    if body.endswith(':'):
+        body = re.sub(r'"[^"]*"\s*:$', '', body).rstrip()
+    elif closers[-1] == '}' and body.endswith('"') and not re.search(r':\s*"[^"]*"$', body):
+        body = re.sub(r'"[^"]*"$', '', body).rstrip()
+    body = body.rstrip(',').rstrip()
+    return body + ''.join(reversed(closers)), True
+
+
+def _loads_repaired(text):
+    """Return (parsed object, truncated)."""
+    candidate, truncated = _json_object(text)
+    try:
+        return _loads(candidate), truncated
+    except _DecodeError:
+        # Trailing commas are the most common remaining defect
+        try:
+            return _loads(re.sub(r',\s*([}\]])', r'\1', candidate)), truncated
+        except _DecodeError as e:
+            raise FactParseError(f"Invalid JSON in LLM output: {e}") from None
+
+
+def parse_facts(text, preferred_appliance=None, stats=None):
+    """
+    Parse and validate an LLM reply into a CaseFacts.
+
+    Args:
+        text: Raw model output
+        preferred_appliance: Appliance to use when the output names none
+        stats: Optional dict; receives counts of 'corrected' and 'dropped'
+            names and 'repaired' if truncated output was closed
+
+    Raises:
+        FactParseError if the output is not a JSON object of the expected shape.
+    """
+    data, truncated = _loads_repaired(text)
+    if not isinstance(data, dict):
+        raise FactParseError("LLM output is not a JSON object")
+    stats = stats if stats is not None else {}
+    stats.setdefault('corrected', 0)
+    stats.setdefault('dropped', 0)
+
+    def canonical(index, value):
+        if not isinstance(value, str) or not value.strip():
+            return None
+        name = index.match(value)
+        if name is None:
+            stats['dropped'] += 1
+        elif name != value:
+            stats['corrected'] += 1
+        return name
+
+    case = CaseFacts()
+
+    appliance = data.get('appliance')
+    if appliance is not None and not isinstance(appliance, str):
+        raise FactParseError("'appliance' must be a string or null")
+    appliance = canonical(APPLIANCE_INDEX, appliance) if appliance else None
+    if appliance:
+        case.set_appliance(appliance)
+    elif preferred_appliance:
+        case.set_appliance(preferred_appliance)
+
+    symptoms = data.get('symptoms') or []
+    if isinstance(symptoms, str):
+        symptoms = [symptoms]
+    if not isinstance(symptoms, list):
+        raise FactParseError("'symptoms' must be a list of strings")
+    for symptom in symptoms:
+        symptom = canonical(SYMPTOM_INDEX, symptom)
+        if symptom:
+            case.add_symptom(symptom)
+
+    observations = data.get('observations') or {}
+    if not isinstance(observations, dict):
+        raise FactParseError("'observations' must be an object")
+    for key, value in observations.items():
+        key = canonical(OBSERVATION_KEY_INDEX, key)
+        if key:
+            value = canonical(OBSERVATION_INDEXES[key], value)
+            case.add_observation(key, value)  # Empty values are skipped
+
+    if truncated:
+        stats['repaired'] = stats.get('repaired', 0) + 1
+        if not case.symptom_count:
+            # Nothing usable survived; the keyword fallback will do better
+            raise FactParseError("LLM output was truncated before any symptom")
+    return case
@@ -0,0 +1,83 @@
+"""
+Shared, lazily created Groq client.
+The groq SDK and the .env file are only loaded the first time an LLM
+feature (natural-language extraction or explanations) is actually used.
+All chat calls go through create_completion(), which applies the shared
+circuit breaker so an outage fails fast instead of blocking workers.
+"""
+import os
+import threading
+
+from circuit_breaker import CircuitBreaker
+
+_client = None
+_breaker = None
+_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env():
+    """Load variables from the .env file once."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_client():
+    """
+    Return the process-wide Groq client, creating it on first use.
+    Raises ValueError if GROQ_API_KEY is not configured.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                load_env()
+                api_key = os.getenv("GROQ_API_KEY")
+                if not api_key:
+                    raise ValueError("GROQ_API_KEY not found. Get free key from https://console.groq.com/keys")
+                from groq import Groq
+                # Bounded so a slow Groq call cannot outlive a graceful worker shutdown
+                _client = Groq(
+                    api_key=api_key,
+                    timeout=float(os.getenv("GROQ_TIMEOUT", "10")),
+                    max_retries=int(os.getenv("GROQ_MAX_RETRIES", "1"))
+                )
+    return _client
+
+
+def get_breaker():
+    """Return the process-wide circuit breaker for Groq calls (tunable via GROQ_BREAKER_* env vars)."""
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                load_env()
+                _breaker = CircuitBreaker(
+                    'groq.circuit',
+                    failure_rate=float(os.getenv("GROQ_BREAKER_FAILURE_RATE", "0.5")),
+                    slow_call_seconds=float(os.getenv("GROQ_BREAKER_SLOW_SECONDS", "5")),
+                    slow_call_rate=float(os.getenv("GROQ_BREAKER_SLOW_RATE", "0.8")),
+                    window=int(os.getenv("GROQ_BREAKER_WINDOW", "20")),
+                    min_calls=int(os.getenv("GROQ_BREAKER_MIN_CALLS", "5")),
+                    open_seconds=float(os.getenv("GROQ_BREAKER_OPEN_SECONDS", "30"))
+                )
+    return _breaker
+
+
+def create_completion(client, **kwargs):
+    """
+    client.chat.completions.create(**kwargs) guarded by the circuit breaker.
+    Raises circuit_breaker.CircuitOpenError immediately while Groq is failing.
+    """
+    return get_breaker().call(client.chat.completions.create, **kwargs)
+
+
+def reset_client():
+    """Drop the cached client and breaker (e.g. in a forked worker, which must not share connections)."""
+    global _client, _breaker
+    with _lock:
+        _client = None
+        _breaker = None
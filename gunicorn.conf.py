@@ -0,0 +1,57 @@
+"""
+Gunicorn configuration for serving the Flask frontend in production.
+
+    gunicorn -c gunicorn.conf.py app_flask:app
+
+The app is imported once in the master (preload) and forked; every worker
+then builds its own engines and Groq client before it accepts requests.
+Settings can be overridden with the environment variables below.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# Rule matching is CPU-bound, so one process per core; natural-language
+# requests mostly wait on Groq, so each process also runs a few threads.
+workers = int(os.getenv("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.getenv("THREADS", "4"))
+
+preload_app = True
+
+# Per-client rate limiting (RATE_LIMIT_RPS) is off by default. When enabling
+# it behind a reverse proxy, also set RATE_LIMIT_KEY_HEADER (e.g.
+# X-Forwarded-For): otherwise every client is keyed on the proxy's address.
+
+# On SIGTERM workers stop accepting connections and get graceful_timeout
+# seconds to finish in-flight requests. A natural-language request makes two
+# Groq calls one after the other (fact extraction, then the explanation), each
+# taking up to GROQ_TIMEOUT x (GROQ_MAX_RETRIES + 1) seconds (40 s in all with
+# the defaults), so the default covers both plus a margin for the queue wait
+# and the engine. The worker timeout must stay above it too.
+_groq_call = float(os.getenv("GROQ_TIMEOUT", "10")) * (int(os.getenv("GROQ_MAX_RETRIES", "1")) + 1)
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", int(2 * _groq_call + 5)))
+timeout = int(os.getenv("WORKER_TIMEOUT", max(60, graceful_timeout + 15)))
+keepalive = 5
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Per-worker warm-up: one engine per thread and a fresh Groq client."""
+    import app_flask
+    from groq_client import reset_client
+
+    reset_client()  # never share the master's HTTP connections across forks
+    app_flask.warm_up(engines=threads)
+    server.log.info("Worker %s warmed up (%d engines)", worker.pid, len(app_flask.engine_pool))
+
+
+def worker_int(worker):
+    worker.log.info("Worker %s interrupted, draining in-flight requests", worker.pid)
+
+
+def worker_exit(server, worker):
+    server.log.info("Worker %s exited", worker.pid)
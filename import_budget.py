@@ -0,0 +1,77 @@
+"""
+Import-time budget check for cold starts.
+
+Imports a module in a fresh interpreter with `python -X importtime`, sums
+the cumulative time of its top-level imports and fails (exit code 1) if it
+exceeds the budget or if a lazily-loaded module (the LLM stack) was
+imported eagerly.
+
+Usage:
+    python import_budget.py [--module app_flask] [--budget-ms 600]
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+# Only imported once natural-language mode or explanations are used
+LAZY_MODULES = ('groq', 'httpx', 'dotenv')
+
+LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(module):
+    """
+    Return (total_ms, {direct dependency: cumulative ms}, set of every imported module)
+    for a cold import of `module`.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    top_level = {}
+    dependencies = {}
+    imported = set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        imported.add(name)
+        if len(indent) == 1:  # one space = imported directly by the interpreter
+            top_level[name] = cumulative_us / 1000
+        elif len(indent) == 3:  # imported by one of those (children are listed first)
+            dependencies[name] = cumulative_us / 1000
+    return sum(top_level.values()), dependencies, imported
+
+
+def check(module='app_flask', budget_ms=600.0):
+    """Print the measurement and return True if the module is within budget."""
+    total_ms, dependencies, imported = measure(module)
+    eager = sorted(name for name in imported if name.split('.')[0] in LAZY_MODULES)
+
+    print(f"⏱️ import {module}: {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    for name, ms in sorted(dependencies.items(), key=lambda item: -item[1])[:10]:
+        print(f"   {ms:8.1f} ms  {name}")
+
+    ok = True
+    if total_ms > budget_ms:
+        print(f"❌ Over budget by {total_ms - budget_ms:.0f} ms")
+        ok = False
+    if eager:
+        print(f"❌ Imported eagerly (should be lazy): {', '.join(eager[:10])}")
+        ok = False
+    if ok:
+        print("✅ Within budget")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a budget.")
+    parser.add_argument('--module', default='app_flask')
+    parser.add_argument('--budget-ms', type=float, default=600.0)
+    args = parser.parse_args()
+    sys.exit(0 if check(args.module, args.budget_ms) else 1)
@@ -0,0 +1,511 @@
+"""
+Knowledge-base static analyzer.
+
+Parses the rule definitions (knowledge_base/ and the shared rules in
+engine.py) and the symptom vocabularies the
+frontends and extractor can produce (extractor_prompt.py, llm_extractor.py,
+app.py, catalogue.json), then reports:
+
+- rules that no input source can trigger (unreachable rules)
+- symptoms / observation values a source emits that no rule matches (orphans)
+- overlapping rule patterns (one rule always co-fires with another)
+- diagnoses without a specific recommendation, duplicate recommendation keys
+
+With --benchmark it also measures how Rete compile time, per-case match
+time and network memory grow with the number of rules, for one network
+holding every appliance and for per-appliance sub-engines.
+
+Usage:
+    python kb_analyzer.py [--benchmark]
+"""
+import argparse
+import ast
+import inspect
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+
+import knowledge_base
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SYMBOL_CALLS = {'A': 'appliance', 'S': 'symptom', 'O': 'observation'}
+
+
+def _read(name):
+    with open(os.path.join(BASE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+# =====================================================================
+# PARSING
+# =====================================================================
+
+def _pattern_value(node):
+    """Turn a Fact keyword value into ('const', name), ('var', name) or ('any', None)."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.func.id in SYMBOL_CALLS and node.args and isinstance(node.args[0], ast.Constant):
+            return ('const', node.args[0].value)
+        if node.func.id == 'W':
+            return ('any', None)
+    if isinstance(node, ast.Constant):
+        return ('const', node.value)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'MATCH':
+        return ('var', node.attr)
+    return ('any', None)
+
+
+def _parse_pattern(node, negated=False):
+    """Yield (negated, {key: value}) for a Fact/NOT/AS pattern node."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.LShift):  # AS.name << Fact(...)
+        yield from _parse_pattern(node.right, negated)
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.func.id == 'NOT':
+            for arg in node.args:
+                yield from _parse_pattern(arg, not negated)
+        elif node.func.id == 'Fact':
+            yield negated, {kw.arg: _pattern_value(kw.value) for kw in node.keywords if kw.arg != 'case'}
+
+
+def parse_rules(source=None, filename='engine.py'):
+    """
+    Parse every @Rule method of the classes in `source` (default: each
+    knowledge_base rule module, then engine.py for the shared rules).
+    Returns a list of dicts: name, file, line, appliance, symptoms,
+    observations, negated, salience and scores ({diagnosis: points}).
+    """
+    if source is None:
+        rules = []
+        for path in knowledge_base.source_paths():
+            rules += parse_rules(_read(path), os.path.relpath(path, BASE_DIR))
+        return rules + parse_rules(_read('engine.py'))
+    tree = ast.parse(source)
+    methods = [node for engine_class in tree.body if isinstance(engine_class, ast.ClassDef)
+               for node in engine_class.body if isinstance(node, ast.FunctionDef)]
+    rules = []
+    for node in methods:
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and getattr(decorator.func, 'id', None) == 'Rule'):
+                continue
+            rule = {
+                'name': node.name,
+                'file': filename,
+                'line': node.lineno,
+                'appliance': None,
+                'symptoms': [],
+                'observations': {},
+                'negated': [],
+                'salience': 0,
+                'scores': {}
+            }
+            for kw in decorator.keywords:
+                if kw.arg == 'salience':
+                    rule['salience'] = ast.literal_eval(kw.value)
+            for arg in decorator.args:
+                for negated, pattern in _parse_pattern(arg):
+                    if negated:
+                        rule['negated'].append(pattern)
+                        continue
+                    for key, (kind, value) in pattern.items():
+                        if kind != 'const':
+                            continue
+                        if key == 'appliance':
+                            rule['appliance'] = value
+                        elif key == 'symptom':
+                            rule['symptoms'].append(value)
+                        else:
+                            rule['observations'][key] = value
+            for call in ast.walk(node):
+                if (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                        and call.func.attr == 'add_score'):
+                    args = [a.value for a in call.args if isinstance(a, ast.Constant)]
+                    if len(args) == 2:
+                        rule['scores'][args[0]] = rule['scores'].get(args[0], 0) + args[1]
+            rules.append(rule)
+    return rules
+
+
+def parse_recommendations(source=None):
+    """
+    Read the recommendation tables in get_recommendation.
+    Returns ({table name: [keys in source order]}) so duplicates stay visible.
+    """
+    tree = ast.parse(source if source is not None else _read('engine.py'))
+    tables = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)):
+            keys = [k.value for k in node.value.keys if isinstance(k, ast.Constant)]
+            if keys:
+                tables[node.targets[0].id] = keys
+    return tables
+
+
+def extractor_vocabulary(source=None, fallback_source=None, rule_vocabulary=None):
+    """
+    Symptoms and observation values the LLM extractor prompt (extractor_prompt.py)
+    and keyword fallback (llm_extractor.py) can emit.
+
+    'symptoms' / 'observations' are the unhinted prompt's STANDARD_* lists.
+    'hinted' holds, per appliance with a hinted prompt (a key of EXAMPLES),
+    the rule vocabulary that prompt lists (`rule_vocabulary`, default
+    engine.knowledge_base_vocabulary()), limited to the names fact_parser
+    keeps (symbols.py).
+    """
+    tree = ast.parse(source if source is not None else _read('extractor_prompt.py'))
+    symptoms = []
+    observations = {}
+    hinted_appliances = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign):
+            continue
+        names = {getattr(t, 'id', None) for t in node.targets}
+        if 'STANDARD_SYMPTOMS' in names:
+            symptoms = ast.literal_eval(node.value)
+        elif 'STANDARD_OBSERVATIONS' in names:
+            observations = ast.literal_eval(node.value)
+        elif 'EXAMPLES' in names and isinstance(node.value, ast.Dict):
+            hinted_appliances = [key.value for key in node.value.keys if isinstance(key, ast.Constant)]
+
+    from symbols import SYMPTOM_NAMES, OBSERVATION_VALUES
+    if rule_vocabulary is None:
+        from engine import knowledge_base_vocabulary
+        rule_vocabulary = knowledge_base_vocabulary()
+    hinted = {}
+    for appliance in hinted_appliances:
+        entry = rule_vocabulary.get(appliance)
+        if entry is not None:
+            hinted[appliance] = {
+                'symptoms': [s for s in entry['symptoms'] if s in SYMPTOM_NAMES],
+                'observations': {key: [v for v in values if v in OBSERVATION_VALUES]
+                                 for key, values in entry['observations'].items()}
+            }
+
+    fallback = set()
+    for node in ast.walk(ast.parse(fallback_source if fallback_source is not None else _read('llm_extractor.py'))):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == 'add_symptom' and node.args and isinstance(node.args[0], ast.Constant)):
+            fallback.add(node.args[0].value)
+    return {'symptoms': symptoms, 'fallback_symptoms': sorted(fallback), 'observations': observations,
+            'hinted': hinted}
+
+
+def streamlit_vocabulary(source=None):
+    """
+    Per-appliance symptoms and observation keys offered by the Streamlit
+    widgets in app.py: {appliance: {'symptoms': [...], 'observations': [...]}}.
+    """
+    tree = ast.parse(source if source is not None else _read('app.py'))
+    vocabulary = {}
+
+    def collect(body, entry):
+        for node in body:
+            for child in ast.walk(node):
+                if (isinstance(child, ast.Call) and isinstance(child.func, ast.Attribute)
+                        and child.func.attr == 'append' and getattr(child.func.value, 'id', None) == 'symptoms'
+                        and child.args and isinstance(child.args[0], ast.Constant)):
+                    if child.args[0].value not in entry['symptoms']:
+                        entry['symptoms'].append(child.args[0].value)
+                elif (isinstance(child, ast.Subscript) and isinstance(child.ctx, ast.Store)
+                        and getattr(child.value, 'id', None) == 'observations'
+                        and isinstance(child.slice, ast.Constant)):
+                    if child.slice.value not in entry['observations']:
+                        entry['observations'].append(child.slice.value)
+
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+                and getattr(node.test.left, 'id', None) == 'appliance'
+                and isinstance(node.test.comparators[0], ast.Constant)):
+            entry = vocabulary.setdefault(node.test.comparators[0].value, {'symptoms': [], 'observations': []})
+            collect(node.body, entry)
+    return vocabulary
+
+
+def web_vocabulary(source=None, rules=None):
+    """
+    Per-appliance symptoms offered by the Flask page (catalogue.json, served
+    at /catalogue) and the observations it can send. The page has no
+    observation inputs; its follow-up questions (questions.py) ask for an
+    observation key when the appliance's rules use it, so with `rules`
+    (parse_rules() output) those keys are reported, otherwise none.
+    """
+    catalogue = json.loads(source if source is not None else _read('catalogue.json'))
+    asked = defaultdict(list)
+    for rule in rules or []:
+        for key in rule['observations']:
+            if key not in asked[rule['appliance']]:
+                asked[rule['appliance']].append(key)
+    return {
+        appliance: {'symptoms': list(symptoms), 'observations': asked.get(appliance, [])}
+        for appliance, symptoms in catalogue.items()
+    }
+
+
+# =====================================================================
+# ANALYSIS
+# =====================================================================
+
+def analyze():
+    """Run every static check and return the findings as a dict."""
+    rules = parse_rules()
+    appliance_rules = [r for r in rules if r['appliance']]
+    extractor = extractor_vocabulary()
+    manual_sources = {
+        'app.py': streamlit_vocabulary(),
+        'catalogue.json': web_vocabulary(rules=appliance_rules)
+    }
+
+    ruled_symptoms = defaultdict(set)
+    ruled_observations = defaultdict(set)
+    for rule in appliance_rules:
+        ruled_symptoms[rule['appliance']].update(rule['symptoms'])
+        for key, value in rule['observations'].items():
+            ruled_observations[key].add(value)
+    all_ruled_symptoms = set().union(*ruled_symptoms.values())
+    llm_symptoms = set(extractor['symptoms']) | set(extractor['fallback_symptoms'])
+    no_hint = {'symptoms': [], 'observations': {}}
+
+    # Unreachable rules: a required symptom is not offered for that appliance
+    # (by the unhinted prompt, the keyword fallback or that appliance's hinted prompt)
+    unreachable = []
+    for rule in appliance_rules:
+        hinted = extractor['hinted'].get(rule['appliance'], no_hint)
+        missing_llm = [s for s in rule['symptoms'] if s not in llm_symptoms and s not in hinted['symptoms']]
+        missing_llm += [f"{k}={v}" for k, v in rule['observations'].items()
+                        if v not in extractor['observations'].get(k, []) and v not in hinted['observations'].get(k, [])]
+        missing_manual = {}
+        for source, vocabulary in manual_sources.items():
+            offered = vocabulary.get(rule['appliance'], {'symptoms': [], 'observations': []})
+            missing = [s for s in rule['symptoms'] if s not in offered['symptoms']]
+            missing += [f"{k}={v}" for k, v in rule['observations'].items() if k not in offered['observations']]
+            if missing:
+                missing_manual[source] = missing
+        if missing_llm or missing_manual:
+            unreachable.append({'rule': rule['name'], 'file': rule['file'], 'line': rule['line'],
+                                'natural_language': missing_llm, 'manual': missing_manual})
+
+    # Orphans: offered symptoms / values that no rule matches
+    orphans = {
+        'llm_extractor.py': sorted(s for s in llm_symptoms if s not in all_ruled_symptoms),
+    }
+    for source, vocabulary in manual_sources.items():
+        for appliance, offered in vocabulary.items():
+            missing = [s for s in offered['symptoms'] if s not in ruled_symptoms.get(appliance, ())]
+            if missing:
+                orphans[f"{source} ({appliance})"] = missing
+    orphan_observations = {
+        key: [v for v in values if v not in ruled_observations.get(key, ())]
+        for key, values in extractor['observations'].items()
+    }
+    orphan_observations = {k: v for k, v in orphan_observations.items() if v}
+
+    # Overlaps: a rule whose positive patterns are a subset of another rule's
+    overlaps = []
+    signatures = {r['name']: (r['appliance'], frozenset(r['symptoms']),
+                              frozenset(r['observations'].items()))
+                  for r in appliance_rules}
+    for a in appliance_rules:
+        for b in appliance_rules:
+            if a is b or a['appliance'] != b['appliance']:
+                continue
+            _, sym_a, obs_a = signatures[a['name']]
+            _, sym_b, obs_b = signatures[b['name']]
+            if sym_a == sym_b and obs_a == obs_b:
+                if a['name'] < b['name']:
+                    overlaps.append({'kind': 'identical', 'rules': [a['name'], b['name']]})
+            elif sym_a <= sym_b and obs_a <= obs_b:
+                overlaps.append({'kind': 'subsumed', 'rules': [a['name'], b['name']]})
+
+    # Recommendations
+    tables = parse_recommendations()
+    recommended = set(tables.get('diy_issues', [])) | set(tables.get('professional_issues', []))
+    scored = {d for r in rules for d in r['scores']}
+    duplicates = {
+        name: sorted({k for k in keys if keys.count(k) > 1})
+        for name, keys in tables.items()
+        if len(keys) != len(set(keys))
+    }
+
+    return {
+        'rule_count': len(rules),
+        'rules_per_appliance': {a: sum(1 for r in appliance_rules if r['appliance'] == a)
+                                for a in sorted({r['appliance'] for r in appliance_rules})},
+        'unreachable_rules': unreachable,
+        'orphan_symptoms': {k: v for k, v in orphans.items() if v},
+        'orphan_observations': orphan_observations,
+        'overlapping_rules': overlaps,
+        'diagnoses_without_recommendation': sorted(scored - recommended),
+        'duplicate_recommendation_keys': duplicates
+    }
+
+
+# =====================================================================
+# RULE-COUNT BENCHMARK
+# =====================================================================
+
+def _scaled_engine_class(factor):
+    """
+    Build an engine class holding `factor` times the current rules in one network.
+    Below 1 a prefix of the appliance rules is dropped; above 1 the rules are
+    cloned for synthetic appliance ids (like adding new appliance types).
+    """
+    from experta import Fact
+    from engine import knowledge_base_engine_class
+
+    base = knowledge_base_engine_class()
+    rules = {}
+    for cls in reversed(base.__mro__):
+        rules.update((name, rule) for name, rule in vars(cls).items() if type(rule).__name__ == 'Rule')
+    appliance_rules = [name for name in rules if _rule_appliance(rules[name]) is not None]
+    attributes = {}
+    if factor < 1:
+        for name in appliance_rules[int(len(appliance_rules) * factor):]:
+            attributes[name] = None
+    else:
+        for copy in range(1, int(factor)):
+            for name in appliance_rules:
+                patterns = [Fact(**{**p.as_dict(), 'appliance': 1000 * copy + p['appliance']})
+                            if isinstance(p, Fact) and 'appliance' in p else p
+                            for p in rules[name]]
+                attributes[f"{name}_x{copy}"] = rules[name].new_conditions(*patterns)
+    return type(f"KnowledgeBaseEngine_x{factor}", (base,), attributes)
+
+
+def _rule_appliance(rule):
+    """Appliance id a rule is specific to, or None for a shared rule."""
+    from experta import Fact
+    return next((p['appliance'] for p in rule
+                 if isinstance(p, Fact) and isinstance(p.get('appliance'), int)), None)
+
+
+def _partitioned_classes(engine_class):
+    """Split an engine class into one class per appliance id, like knowledge_base/ and DiagnosticEngine."""
+    from engine import ApplianceEngine
+
+    partitions = defaultdict(dict)
+    for name, rule in inspect.getmembers(engine_class, lambda member: type(member).__name__ == 'Rule'):
+        appliance = _rule_appliance(rule)
+        if appliance is not None:
+            partitions[appliance][name] = rule
+    return {appliance: type(f"Engine_{appliance}", (ApplianceEngine,), rules)
+            for appliance, rules in partitions.items()}
+
+
+def _network_kb(build):
+    """Memory allocated (KB) while compiling, for the engines returned by `build`."""
+    tracemalloc.start()
+    try:
+        engines = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del engines
+    return size / 1024
+
+
+def benchmark_rule_count(factors=(0.25, 0.5, 0.75, 1, 2, 4, 8), repeat=5):
+    """
+    Measure Rete compile time, average match time per case and network memory
+    for several knowledge-base sizes: all rules in one network, and split into
+    per-appliance sub-engines of which only those the cases need are compiled.
+    """
+    from symbols import CaseFacts
+
+    sample = [
+        CaseFacts('Washing Machine', ['Wont Drain', 'Loud Noise'], {'noise_type': 'Grinding'}),
+        CaseFacts('Fan', ['Wobbles', 'Noisy Operation']),
+        CaseFacts('Power Generator', ['Wont Start', 'Excessive Smoke', 'Overheating'], {'fuel': 'Full'}),
+        CaseFacts('Kitchen Grinder', ['Jamming', 'Burning Smell']),
+    ]
+    results = []
+    for factor in factors:
+        engine_class = _scaled_engine_class(factor)
+        partitions = _partitioned_classes(engine_class)
+        builds = {
+            'single': lambda: engine_class(),
+            'partitioned': lambda: {case.appliance: partitions[case.appliance]() for case in sample
+                                    if case.appliance in partitions}
+        }
+        row = {'factor': factor, 'rules': len(engine_class().get_rules()), 'appliances': len(partitions)}
+        for layout, build in builds.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                engines = build()
+            compile_ms = (time.perf_counter() - started) / repeat * 1000
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for case in sample:
+                    engine = engines if layout == 'single' else engines.get(case.appliance)
+                    if engine is not None:
+                        engine.run_cases([case])
+            match_ms = (time.perf_counter() - started) / (repeat * len(sample)) * 1000
+
+            row[layout] = {
+                'compile_ms': round(compile_ms, 2),
+                'match_ms': round(match_ms, 2),
+                'network_kb': round(_network_kb(build))
+            }
+        results.append(row)
+    return results
+
+
+# =====================================================================
+# REPORT
+# =====================================================================
+
+def print_report(findings):
+    print(f"📚 {findings['rule_count']} rules")
+    for appliance, count in findings['rules_per_appliance'].items():
+        print(f"   {appliance}: {count}")
+
+    print(f"\n🚫 Rules unreachable from at least one input source ({len(findings['unreachable_rules'])})")
+    for item in findings['unreachable_rules']:
+        print(f"   {item['rule']} ({item['file']}:{item['line']})")
+        if item['natural_language']:
+            print(f"      not emitted by extractor: {', '.join(item['natural_language'])}")
+        for source, missing in item['manual'].items():
+            print(f"      not offered by {source}: {', '.join(missing)}")
+
+    print("\n👻 Orphan symptoms (offered but matched by no rule)")
+    for source, symptoms in findings['orphan_symptoms'].items():
+        print(f"   {source}: {', '.join(symptoms)}")
+    for key, values in findings['orphan_observations'].items():
+        print(f"   observation {key}: {', '.join(values)}")
+
+    identical = [o for o in findings['overlapping_rules'] if o['kind'] == 'identical']
+    subsumed = [o for o in findings['overlapping_rules'] if o['kind'] == 'subsumed']
+    print(f"\n🔁 Overlapping patterns: {len(identical)} identical, {len(subsumed)} subsumed")
+    for overlap in identical:
+        print(f"   identical: {' == '.join(overlap['rules'])}")
+    for overlap in subsumed:
+        base, extended = overlap['rules']
+        print(f"   {extended} extends {base} (every match of {extended} also fires {base})")
+
+    print("\n📝 Recommendations")
+    missing = findings['diagnoses_without_recommendation']
+    print(f"   diagnoses using the default recommendation: {', '.join(missing) if missing else 'none'}")
+    for table, keys in findings['duplicate_recommendation_keys'].items():
+        print(f"   duplicate keys in {table} (later entry wins): {', '.join(keys)}")
+
+
+def print_benchmark(results):
+    print("\n⏱️ Rule count vs Rete compile / match time and network memory")
+    print(f"   {'':17} {'one network':^36} | {'per-appliance sub-engines':^36}")
+    print(f"   {'rules':>6} {'appliances':>10} " + ' | '.join([f"{'compile ms':>11} {'match ms/case':>14} {'KB':>9}"] * 2))
+    for row in results:
+        print(f"   {row['rules']:>6} {row['appliances']:>10} " + ' | '.join(
+            f"{row[layout]['compile_ms']:>11} {row[layout]['match_ms']:>14} {row[layout]['network_kb']:>9}"
+            for layout in ('single', 'partitioned')))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Static analysis of the diagnostic knowledge base.")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Also measure compile and match time against rule count")
+    args = parser.parse_args()
+
+    print_report(analyze())
+    if args.benchmark:
+        print_benchmark(benchmark_rule_count())
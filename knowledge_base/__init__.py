@@ -0,0 +1,37 @@
+"""
+Knowledge base, one rule module per appliance.
+
+Each module defines a class of @Rule methods for a single appliance. The
+engine mixes it into ApplianceEngine (the rules every appliance shares:
+no symptoms reported, final decision) to get a sub-engine that holds only
+that appliance's rules, and DiagnosticEngine routes each case to the
+sub-engine of its appliance. Modules are imported, and their sub-engines
+compiled, the first time a case of that appliance comes in.
+
+Adding an appliance type: write its rule module here and list it in
+RULE_MODULES (plus its names in symbols.py).
+"""
+import importlib
+import os
+
+# Appliance name -> (module in this package, rule class)
+RULE_MODULES = {
+    'Washing Machine': ('washing_machine', 'WashingMachineRules'),
+    'Fan': ('fan', 'FanRules'),
+    'Power Generator': ('power_generator', 'PowerGeneratorRules'),
+    'Kitchen Grinder': ('kitchen_grinder', 'KitchenGrinderRules'),
+}
+
+
+def rule_class(appliance):
+    """Import an appliance's rule module and return its rule class (None for an appliance without rules)."""
+    if appliance not in RULE_MODULES:
+        return None
+    module, name = RULE_MODULES[appliance]
+    return getattr(importlib.import_module(f'{__name__}.{module}'), name)
+
+
+def source_paths():
+    """Paths of the rule modules, in RULE_MODULES order (for the tools that parse or hash the rules)."""
+    base = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(base, module + '.py') for module, _ in RULE_MODULES.values()]
@@ -0,0 +1,167 @@
+"""
+Fan rules.
+
+Mixed into ApplianceEngine by engine.appliance_engine_class('Fan')
+the first time a fan case is diagnosed.
+"""
+from experta import *
+
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+# Rule patterns match on interned symbol ids (see symbols.py)
+A = APPLIANCES.id
+S = SYMPTOMS.id
+O = OBSERVATIONS.id
+
+
+class FanRules:
+    """Diagnostic rules for the Fan."""
+    
+    # =====================================================================
+    # FAN RULES
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Wont Start'))
+    )
+    def fan_wont_start(self, case):
+        self.add_score(case, 'Power Supply Issue', 20)
+        self.add_score(case, 'Blown Thermal Fuse', 15)
+        self.add_score(case, 'Broken Switch', 10)
+        self.explain(case, "A fan that won't start may have a power, fuse, or switch problem.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Checked'))
+    )
+    def fan_wont_start_power_ok(self, case):
+        self.add_score(case, 'Blown Thermal Fuse', 40)
+        self.add_score(case, 'Broken Switch', 25)
+        self.add_score(case, 'Failed Motor', 20)
+        self.explain(case, "With power confirmed, a blown thermal fuse or failed motor is most likely.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Not Checked'))
+    )
+    def fan_no_power_check(self, case):
+        self.add_score(case, 'Power Supply Issue', 30)
+        self.explain(case, "Please check if the fan is plugged in and the outlet has power.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Wobbles'))
+    )
+    def fan_wobbles(self, case):
+        self.add_score(case, 'Unbalanced Blades', 45)
+        self.add_score(case, 'Loose Mounting', 25)
+        self.add_score(case, 'Bent Blade', 20)
+        self.explain(case, "Wobbling is typically caused by unbalanced or damaged blades.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Slow Speed'))
+    )
+    def fan_slow(self, case):
+        self.add_score(case, 'Dust Buildup', 35)
+        self.add_score(case, 'Worn Motor Bearings', 25)
+        self.add_score(case, 'Capacitor Failure', 20)
+        self.explain(case, "Slow speed suggests dust buildup, worn bearings, or capacitor issues.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Noisy Operation'))
+    )
+    def fan_noisy(self, case):
+        self.add_score(case, 'Worn Motor Bearings', 40)
+        self.add_score(case, 'Loose Parts', 25)
+        self.add_score(case, 'Blade Obstruction', 15)
+        self.explain(case, "Unusual noise indicates worn bearings, loose parts, or obstructions.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def fan_overheating(self, case):
+        self.add_score(case, 'Motor Overload', 35)
+        self.add_score(case, 'Dust Buildup', 30)
+        self.add_score(case, 'Failing Capacitor', 20)
+        self.explain(case, "Overheating may result from motor overload or dust restricting airflow.")
+    
+    # =====================================================================
+    # FAN COMBINATION RULES (Multiple Symptoms)
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Noisy Operation')),
+        Fact(case=MATCH.case, symptom=S('Wobbles'))
+    )
+    def fan_noisy_and_wobbles(self, case):
+        self.add_score(case, 'Worn Motor Bearings', 60)
+        self.add_score(case, 'Unbalanced Blades', 50)
+        self.explain(case, "Noise with wobbling indicates worn motor bearings combined with unbalanced blades.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Slow Speed')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def fan_slow_and_overheating(self, case):
+        self.add_score(case, 'Dust Buildup', 65)
+        self.add_score(case, 'Motor Overload', 50)
+        self.explain(case, "Slow speed with overheating indicates severe dust buildup restricting airflow.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Noisy Operation')),
+        Fact(case=MATCH.case, symptom=S('Slow Speed'))
+    )
+    def fan_noisy_and_slow(self, case):
+        self.add_score(case, 'Worn Motor Bearings', 55)
+        self.add_score(case, 'Capacitor Failure', 45)
+        self.explain(case, "Noise with slow speed points to worn bearings or failing capacitor.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Wobbles')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def fan_wobbles_and_overheating(self, case):
+        self.add_score(case, 'Loose Mounting', 50)
+        self.add_score(case, 'Motor Overload', 45)
+        self.explain(case, "Wobbling with overheating suggests loose mounting causing motor strain.")
+    
+    # Additional Fan Rules
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Not Oscillating'))
+    )
+    def fan_no_oscillation(self, case):
+        self.add_score(case, 'Broken Oscillating Gear', 40)
+        self.add_score(case, 'Dry Oscillator Mechanism', 25)
+        self.add_score(case, 'Motor Issue', 15)
+        self.explain(case, "No oscillation indicates broken gear or dry mechanism needing lubrication.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Sparks'))
+    )
+    def fan_sparks(self, case):
+        self.add_score(case, 'Electrical Short', 50)
+        self.add_score(case, 'Worn Motor Brushes', 30)
+        self.add_score(case, 'Loose Wiring', 15)
+        self.explain(case, "Sparks indicate serious electrical issue requiring immediate attention.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Fan')),
+        Fact(case=MATCH.case, symptom=S('Intermittent Operation'))
+    )
+    def fan_intermittent(self, case):
+        self.add_score(case, 'Loose Connection', 35)
+        self.add_score(case, 'Failing Capacitor', 30)
+        self.add_score(case, 'Speed Switch Issue', 20)
+        self.explain(case, "Intermittent operation suggests loose connection or failing capacitor.")
@@ -0,0 +1,207 @@
+"""
+Kitchen Grinder rules.
+
+Mixed into ApplianceEngine by engine.appliance_engine_class('Kitchen Grinder')
+the first time a kitchen grinder case is diagnosed.
+"""
+from experta import *
+
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+# Rule patterns match on interned symbol ids (see symbols.py)
+A = APPLIANCES.id
+S = SYMPTOMS.id
+O = OBSERVATIONS.id
+
+
+class KitchenGrinderRules:
+    """Diagnostic rules for the Kitchen Grinder."""
+    
+    # =====================================================================
+    # KITCHEN GRINDER RULES
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Wont Start'))
+    )
+    def grinder_wont_start(self, case):
+        self.add_score(case, 'Power Supply Issue', 25)
+        self.add_score(case, 'Thermal Overload Trip', 20)
+        self.add_score(case, 'Motor Burnout', 15)
+        self.explain(case, "A grinder that won't start may have power, overload, or motor issues.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Checked'))
+    )
+    def grinder_wont_start_power_ok(self, case):
+        self.add_score(case, 'Thermal Overload Trip', 40)
+        self.add_score(case, 'Motor Burnout', 30)
+        self.add_score(case, 'Switch Failure', 20)
+        self.explain(case, "With power confirmed, the thermal overload may have tripped or the motor is burned out.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Not Checked'))
+    )
+    def grinder_no_power_check(self, case):
+        self.add_score(case, 'Power Supply Issue', 35)
+        self.explain(case, "Please verify the grinder is plugged in and the outlet is working.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Weak Grinding'))
+    )
+    def grinder_weak(self, case):
+        self.add_score(case, 'Dull Blades', 45)
+        self.add_score(case, 'Motor Wear', 25)
+        self.add_score(case, 'Belt Slippage', 15)
+        self.explain(case, "Weak grinding performance indicates dull blades or motor wear.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def grinder_vibration(self, case):
+        self.add_score(case, 'Unbalanced Blade Assembly', 40)
+        self.add_score(case, 'Loose Mounting', 30)
+        self.add_score(case, 'Worn Motor Bearings', 20)
+        self.explain(case, "Excessive vibration suggests unbalanced blades or loose mounting.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Burning Smell'))
+    )
+    def grinder_burning_smell(self, case):
+        self.add_score(case, 'Motor Overheating', 45)
+        self.add_score(case, 'Electrical Short', 30)
+        self.add_score(case, 'Overloaded Motor', 20)
+        self.explain(case, "Burning smell indicates motor overheating or electrical problems - stop using immediately!")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Jamming'))
+    )
+    def grinder_jamming(self, case):
+        self.add_score(case, 'Foreign Object in Chamber', 40)
+        self.add_score(case, 'Overloading', 30)
+        self.add_score(case, 'Worn Clutch', 15)
+        self.explain(case, "Jamming occurs when foreign objects are present or the grinder is overloaded.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Leaking'))
+    )
+    def grinder_leaking(self, case):
+        self.add_score(case, 'Worn Gasket/Seal', 45)
+        self.add_score(case, 'Loose Assembly', 30)
+        self.add_score(case, 'Cracked Container', 20)
+        self.explain(case, "Leaking indicates worn gaskets, loose assembly, or container damage.")
+    
+    # Additional Grinder Rules
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Overheating Quickly'))
+    )
+    def grinder_quick_overheat(self, case):
+        self.add_score(case, 'Blocked Ventilation', 40)
+        self.add_score(case, 'Motor Overload', 30)
+        self.add_score(case, 'Worn Motor Brushes', 20)
+        self.explain(case, "Quick overheating suggests blocked ventilation or continuous overloading.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Lid Not Secure'))
+    )
+    def grinder_lid_issue(self, case):
+        self.add_score(case, 'Worn Lid Lock', 40)
+        self.add_score(case, 'Broken Safety Switch', 30)
+        self.add_score(case, 'Damaged Threads', 20)
+        self.explain(case, "Lid not securing indicates worn lock mechanism or safety switch issue.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Uneven Grinding'))
+    )
+    def grinder_uneven(self, case):
+        self.add_score(case, 'Dull Blades', 40)
+        self.add_score(case, 'Loose Blade Assembly', 30)
+        self.add_score(case, 'Unbalanced Load', 20)
+        self.explain(case, "Uneven grinding results from dull blades or loose blade assembly.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Sparks Inside'))
+    )
+    def grinder_sparks(self, case):
+        self.add_score(case, 'Worn Motor Brushes', 50)
+        self.add_score(case, 'Electrical Short', 35)
+        self.add_score(case, 'Motor Armature Damage', 10)
+        self.explain(case, "Sparks indicate worn motor brushes or electrical short requiring immediate attention.")
+    
+    # =====================================================================
+    # KITCHEN GRINDER COMBINATION RULES (Multiple Symptoms)
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Burning Smell')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def grinder_burning_and_vibration(self, case):
+        self.add_score(case, 'Worn Motor Bearings', 70)
+        self.add_score(case, 'Motor Overheating', 55)
+        self.explain(case, "CRITICAL: Burning smell with vibration indicates worn motor bearings - stop using immediately!")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Weak Grinding')),
+        Fact(case=MATCH.case, symptom=S('Burning Smell'))
+    )
+    def grinder_weak_and_burning(self, case):
+        self.add_score(case, 'Motor Overheating', 65)
+        self.add_score(case, 'Overloaded Motor', 50)
+        self.explain(case, "Weak grinding with burning smell indicates motor is overloaded and overheating - reduce load.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Jamming')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def grinder_jamming_and_vibration(self, case):
+        self.add_score(case, 'Foreign Object in Chamber', 60)
+        self.add_score(case, 'Unbalanced Blade Assembly', 50)
+        self.explain(case, "Jamming with vibration strongly indicates foreign object stuck in chamber.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Weak Grinding')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def grinder_weak_and_vibration(self, case):
+        self.add_score(case, 'Dull Blades', 60)
+        self.add_score(case, 'Unbalanced Blade Assembly', 55)
+        self.explain(case, "Weak grinding with vibration indicates dull or unbalanced blades.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Leaking')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def grinder_leaking_and_vibration(self, case):
+        self.add_score(case, 'Worn Gasket/Seal', 60)
+        self.add_score(case, 'Loose Assembly', 55)
+        self.explain(case, "Leaking with vibration indicates loose assembly or worn gasket from vibration.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Kitchen Grinder')),
+        Fact(case=MATCH.case, symptom=S('Jamming')),
+        Fact(case=MATCH.case, symptom=S('Burning Smell'))
+    )
+    def grinder_jamming_and_burning(self, case):
+        self.add_score(case, 'Overloading', 65)
+        self.add_score(case, 'Foreign Object in Chamber', 50)
+        self.explain(case, "STOP: Jamming with burning smell means severe overload or jammed object - turn off now!")
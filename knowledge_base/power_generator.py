@@ -0,0 +1,196 @@
+"""
+Power Generator rules.
+
+Mixed into ApplianceEngine by engine.appliance_engine_class('Power Generator')
+the first time a power generator case is diagnosed.
+"""
+from experta import *
+
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+# Rule patterns match on interned symbol ids (see symbols.py)
+A = APPLIANCES.id
+S = SYMPTOMS.id
+O = OBSERVATIONS.id
+
+
+class PowerGeneratorRules:
+    """Diagnostic rules for the Power Generator."""
+    
+    # =====================================================================
+    # POWER GENERATOR RULES
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Wont Start'))
+    )
+    def gen_wont_start(self, case):
+        self.add_score(case, 'Fuel System Problem', 25)
+        self.add_score(case, 'Dead Battery', 20)
+        self.add_score(case, 'Spark Plug Failure', 15)
+        self.explain(case, "A generator that won't start often has fuel, battery, or ignition issues.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, fuel=O('Empty'))
+    )
+    def gen_no_fuel(self, case):
+        self.add_score(case, 'Fuel System Problem', 50)
+        self.explain(case, "The fuel tank is empty or the fuel line may be clogged.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, fuel=O('Full'))
+    )
+    def gen_fuel_ok(self, case):
+        self.add_score(case, 'Dead Battery', 30)
+        self.add_score(case, 'Spark Plug Failure', 25)
+        self.add_score(case, 'Carburetor Issue', 20)
+        self.explain(case, "With fuel present, check the battery, spark plug, or carburetor.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Low Power Output'))
+    )
+    def gen_low_power(self, case):
+        self.add_score(case, 'Overloaded Circuit', 35)
+        self.add_score(case, 'Dirty Air Filter', 25)
+        self.add_score(case, 'Voltage Regulator Failure', 20)
+        self.explain(case, "Low power output suggests overload, air filter issues, or voltage regulation problems.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Runs But No Electricity'))
+    )
+    def gen_no_output(self, case):
+        self.add_score(case, 'Failed AVR (Voltage Regulator)', 45)
+        self.add_score(case, 'Faulty Breaker', 25)
+        self.add_score(case, 'Capacitor Failure', 20)
+        self.explain(case, "Generator runs but produces no power indicates AVR or breaker failure.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Excessive Smoke'))
+    )
+    def gen_smoke(self, case):
+        self.add_score(case, 'Oil Leak/Overfill', 40)
+        self.add_score(case, 'Air Filter Clogged', 30)
+        self.add_score(case, 'Rich Fuel Mixture', 20)
+        self.explain(case, "Excessive smoke indicates oil issues, clogged air filter, or fuel mixture problems.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def gen_overheating(self, case):
+        self.add_score(case, 'Low Oil Level', 40)
+        self.add_score(case, 'Blocked Cooling Vents', 30)
+        self.add_score(case, 'Overload', 20)
+        self.explain(case, "Overheating is often caused by low oil, blocked vents, or overload.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Backfiring'))
+    )
+    def gen_backfiring(self, case):
+        self.add_score(case, 'Carburetor Timing Issue', 40)
+        self.add_score(case, 'Exhaust System Problem', 25)
+        self.add_score(case, 'Bad Fuel', 20)
+        self.explain(case, "Backfiring suggests carburetor timing, exhaust, or fuel quality issues.")
+    
+    # Additional Generator Rules
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Oil Leaking'))
+    )
+    def gen_oil_leak(self, case):
+        self.add_score(case, 'Worn Oil Seal', 40)
+        self.add_score(case, 'Cracked Gasket', 30)
+        self.add_score(case, 'Overfilled Oil', 20)
+        self.explain(case, "Oil leaking indicates worn seal, cracked gasket, or overfilled oil reservoir.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Engine Surging'))
+    )
+    def gen_engine_surging(self, case):
+        self.add_score(case, 'Dirty Air Filter', 35)
+        self.add_score(case, 'Carburetor Adjustment Needed', 30)
+        self.add_score(case, 'Fuel Flow Problem', 25)
+        self.explain(case, "Engine surging suggests restricted air intake or fuel flow irregularities.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('High Fuel Consumption'))
+    )
+    def gen_high_fuel_consumption(self, case):
+        self.add_score(case, 'Carburetor Adjustment Needed', 35)
+        self.add_score(case, 'Air Filter Clogged', 25)
+        self.add_score(case, 'Engine Running Rich', 20)
+        self.explain(case, "High fuel consumption suggests carburetor needs adjustment or air filter is clogged.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Battery Not Charging'))
+    )
+    def gen_battery_not_charging(self, case):
+        self.add_score(case, 'Faulty Alternator', 45)
+        self.add_score(case, 'Broken Charging Circuit', 30)
+        self.add_score(case, 'Dead Battery', 20)
+        self.explain(case, "Battery not charging indicates faulty alternator or charging circuit issue.")
+    
+    # =====================================================================
+    # POWER GENERATOR COMBINATION RULES (Multiple Symptoms)
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Excessive Smoke')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def gen_smoke_and_overheating(self, case):
+        self.add_score(case, 'Low Oil Level', 70)
+        self.add_score(case, 'Oil Leak/Overfill', 55)
+        self.explain(case, "Smoke with overheating is a CRITICAL sign of oil level problems - check immediately!")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Low Power Output')),
+        Fact(case=MATCH.case, symptom=S('Excessive Smoke'))
+    )
+    def gen_low_power_and_smoke(self, case):
+        self.add_score(case, 'Air Filter Clogged', 60)
+        self.add_score(case, 'Rich Fuel Mixture', 45)
+        self.explain(case, "Low power with smoke indicates severely clogged air filter or fuel mixture issues.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Backfiring')),
+        Fact(case=MATCH.case, symptom=S('Excessive Smoke'))
+    )
+    def gen_backfire_and_smoke(self, case):
+        self.add_score(case, 'Bad Fuel', 55)
+        self.add_score(case, 'Carburetor Timing Issue', 50)
+        self.explain(case, "Backfiring with smoke strongly suggests bad fuel or serious carburetor problems.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Low Power Output')),
+        Fact(case=MATCH.case, symptom=S('Overheating'))
+    )
+    def gen_low_power_and_overheating(self, case):
+        self.add_score(case, 'Overload', 60)
+        self.add_score(case, 'Voltage Regulator Failure', 45)
+        self.explain(case, "Low power with overheating indicates generator overload or voltage regulator failure.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Power Generator')),
+        Fact(case=MATCH.case, symptom=S('Runs But No Electricity')),
+        Fact(case=MATCH.case, symptom=S('Low Power Output'))
+    )
+    def gen_no_output_and_low_power(self, case):
+        self.add_score(case, 'Failed AVR (Voltage Regulator)', 75)
+        self.explain(case, "No electricity output with low power conclusively points to AVR failure.")
@@ -0,0 +1,197 @@
+"""
+Washing Machine rules.
+
+Mixed into ApplianceEngine by engine.appliance_engine_class('Washing Machine')
+the first time a washing machine case is diagnosed.
+"""
+from experta import *
+
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+# Rule patterns match on interned symbol ids (see symbols.py)
+A = APPLIANCES.id
+S = SYMPTOMS.id
+O = OBSERVATIONS.id
+
+
+class WashingMachineRules:
+    """Diagnostic rules for the Washing Machine."""
+    
+    # =====================================================================
+    # WASHING MACHINE RULES
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Start'))
+    )
+    def wm_wont_start(self, case):
+        self.add_score(case, 'Power Supply Issue', 25)
+        self.add_score(case, 'Door Latch Problem', 20)
+        self.add_score(case, 'Control Board Failure', 15)
+        self.explain(case, "Symptom 'Won't Start' suggests a power, door latch, or control issue.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Not Checked'))
+    )
+    def wm_wont_start_no_power_check(self, case):
+        self.add_score(case, 'Power Supply Issue', 20)
+        self.explain(case, "Please verify the washing machine is plugged in and the outlet is working.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Start')),
+        Fact(case=MATCH.case, power=O('Checked'))
+    )
+    def wm_wont_start_power_ok(self, case):
+        self.add_score(case, 'Door Latch Problem', 25)
+        self.add_score(case, 'Control Board Failure', 20)
+        self.explain(case, "Since power is confirmed, the door latch or control board is likely faulty.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Drain'))
+    )
+    def wm_wont_drain(self, case):
+        self.add_score(case, 'Clogged Filter', 30)
+        self.add_score(case, 'Failed Pump', 10)
+        self.add_score(case, 'Blocked Drain Hose', 15)
+        self.explain(case, "Symptom 'Won't Drain' points to a blockage or pump failure.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Loud Noise')),
+        Fact(case=MATCH.case, noise_type=O('Gurgling'))
+    )
+    def wm_gurgling(self, case):
+        self.add_score(case, 'Clogged Filter', 40)
+        self.add_score(case, 'Blocked Drain Hose', 20)
+        self.explain(case, "'Gurgling' noise strongly suggests a drainage blockage.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Loud Noise')),
+        Fact(case=MATCH.case, noise_type=O('Grinding'))
+    )
+    def wm_grinding(self, case):
+        self.add_score(case, 'Failed Pump', 50)
+        self.add_score(case, 'Worn Bearings', 30)
+        self.add_score(case, 'Clogged Filter', -10)
+        self.explain(case, "'Grinding' noise strongly suggests a motor, pump, or bearing failure.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Loud Noise')),
+        Fact(case=MATCH.case, noise_type=O('Banging'))
+    )
+    def wm_banging(self, case):
+        self.add_score(case, 'Unbalanced Load', 45)
+        self.add_score(case, 'Worn Bearings', 20)
+        self.explain(case, "'Banging' noise often indicates an unbalanced load or worn drum bearings.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Leaking Water'))
+    )
+    def wm_leaking(self, case):
+        self.add_score(case, 'Worn Door Seal', 30)
+        self.add_score(case, 'Loose Hose Connection', 25)
+        self.add_score(case, 'Damaged Drain Pump', 15)
+        self.explain(case, "Water leaking could be from the door seal, hose connections, or drain pump.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Not Spinning'))
+    )
+    def wm_not_spinning(self, case):
+        self.add_score(case, 'Broken Drive Belt', 35)
+        self.add_score(case, 'Motor Coupler Failure', 25)
+        self.add_score(case, 'Control Board Failure', 15)
+        self.explain(case, "'Not Spinning' suggests a drive belt, motor coupler, or control issue.")
+    
+    # =====================================================================
+    # WASHING MACHINE COMBINATION RULES (Multiple Symptoms)
+    # =====================================================================
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Drain')),
+        Fact(case=MATCH.case, symptom=S('Not Spinning'))
+    )
+    def wm_wont_drain_and_spin(self, case):
+        self.add_score(case, 'Clogged Filter', 60)
+        self.add_score(case, 'Failed Pump', 50)
+        self.explain(case, "Won't drain AND won't spin together indicates a severely clogged filter or failed pump.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Leaking Water')),
+        Fact(case=MATCH.case, symptom=S('Not Spinning'))
+    )
+    def wm_leaking_and_not_spinning(self, case):
+        self.add_score(case, 'Worn Bearings', 55)
+        self.add_score(case, 'Damaged Tub Seal', 40)
+        self.explain(case, "Leaking with spinning failure strongly suggests worn drum bearings or tub seal damage.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Wont Drain')),
+        Fact(case=MATCH.case, symptom=S('Leaking Water'))
+    )
+    def wm_wont_drain_and_leaking(self, case):
+        self.add_score(case, 'Damaged Drain Pump', 50)
+        self.add_score(case, 'Blocked Drain Hose', 45)
+        self.explain(case, "Won't drain with leaking indicates damaged pump or severely blocked hose.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Loud Noise')),
+        Fact(case=MATCH.case, symptom=S('Not Spinning'))
+    )
+    def wm_noisy_and_not_spinning(self, case):
+        self.add_score(case, 'Worn Bearings', 60)
+        self.add_score(case, 'Broken Drive Belt', 45)
+        self.explain(case, "Noise with spinning failure points to worn bearings or broken drive belt.")
+    
+    # Additional Washing Machine Rules
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Excessive Vibration'))
+    )
+    def wm_excessive_vibration(self, case):
+        self.add_score(case, 'Unbalanced Load', 35)
+        self.add_score(case, 'Worn Shock Absorbers', 30)
+        self.add_score(case, 'Unlevel Machine', 25)
+        self.explain(case, "Excessive vibration suggests unbalanced load, worn shock absorbers, or machine not level.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Burning Smell'))
+    )
+    def wm_burning_smell(self, case):
+        self.add_score(case, 'Motor Overheating', 40)
+        self.add_score(case, 'Worn Drive Belt', 30)
+        self.add_score(case, 'Electrical Short', 20)
+        self.explain(case, "Burning smell indicates motor overheating, worn belt friction, or electrical issue.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Water Not Filling'))
+    )
+    def wm_no_water_fill(self, case):
+        self.add_score(case, 'Faulty Water Inlet Valve', 40)
+        self.add_score(case, 'Clogged Inlet Screen', 30)
+        self.add_score(case, 'Low Water Pressure', 20)
+        self.explain(case, "Water not filling suggests faulty inlet valve, clogged screen, or low pressure.")
+    
+    @Rule(
+        Fact(case=MATCH.case, appliance=A('Washing Machine')),
+        Fact(case=MATCH.case, symptom=S('Door Wont Lock'))
+    )
+    def wm_door_wont_lock(self, case):
+        self.add_score(case, 'Door Latch Problem', 45)
+        self.add_score(case, 'Control Board Failure', 25)
+        self.add_score(case, 'Wiring Issue', 15)
+        self.explain(case, "Door won't lock indicates faulty latch mechanism or control board issue.")
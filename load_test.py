@@ -0,0 +1,364 @@
+"""
+Load test for the /diagnose endpoint.
+
+Drives a running server either with a fixed number of concurrent clients
+(each on a keep-alive connection) or, with --rps, at a fixed arrival rate,
+and reports throughput, latency percentiles and how each stage was served
+(LLM, template, lookup table, or fallback after an LLM failure). With
+--compare it starts the development server and the gunicorn profile in turn
+on a local port and runs the same load against both. --mock starts
+mock_groq.py and points the servers it launches at it, so natural-language
+mode can be tested offline.
+
+Usage:
+    python load_test.py --url http://127.0.0.1:8000 [--concurrency 16] [--duration 20]
+    python load_test.py --url http://127.0.0.1:8000 --mode natural --rps 20
+    python load_test.py --compare --mock --mode natural [--rps 20] [--mock-args "--error-rate 0.1"]
+    python load_test.py --admission --mock --mode natural --rps 30 --mock-args "--capacity 6" --server-env "LLM_CONCURRENCY=6"
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+MANUAL_CASES = [
+    {'appliance': 'Washing Machine', 'symptoms': ['Wont Drain', 'Loud Noise'], 'observations': {'noise_type': 'Grinding'}},
+    {'appliance': 'Fan', 'symptoms': ['Wobbles', 'Noisy Operation'], 'observations': {}},
+    {'appliance': 'Power Generator', 'symptoms': ['Wont Start', 'Excessive Smoke'], 'observations': {'fuel': 'Full'}},
+    {'appliance': 'Kitchen Grinder', 'symptoms': ['Jamming', 'Burning Smell'], 'observations': {}},
+]
+
+# (appliance hint, description)
+NATURAL_TEXTS = [
+    ('Washing Machine', "My washing machine won't drain and makes a grinding noise"),
+    ('Fan', "Fan is wobbling and getting too hot"),
+    ('Power Generator', "Generator producing smoke and it's overheating"),
+    ('Kitchen Grinder', "The grinder keeps jamming and smells like something is burning"),
+]
+
+
+def payloads(mode, hinted=False):
+    """Endless stream of request bodies for the given input mode."""
+    if mode == 'natural':
+        for appliance, text in itertools.cycle(NATURAL_TEXTS):
+            yield {'input_mode': 'natural', 'text': text, 'appliance_hint': appliance if hinted else 'auto'}
+    else:
+        for case in itertools.cycle(MANUAL_CASES):
+            yield {'input_mode': 'manual', **case}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def post(target, connection, path, body):
+    """
+    Send one POST on a keep-alive connection.
+    Returns (connection or None if it must be reopened, status, stage outcomes).
+    """
+    stages = {}
+    try:
+        if connection is None:
+            connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+        connection.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        status = response.status
+        # "extraction=llm, explanation=fallback" as set by app_flask
+        for item in (response.getheader('X-Diagnosis-Stages') or '').split(','):
+            if '=' in item:
+                stage, outcome = item.strip().split('=', 1)
+                stages[stage] = outcome
+        if response.getheader('Connection', '').lower() == 'close':
+            connection.close()
+            connection = None
+    except (OSError, http.client.HTTPException):
+        status = 'connection error'
+        connection = None
+    return connection, status, stages
+
+
+class Results:
+    """Thread-safe collection of latencies, statuses and stage outcomes."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.stages = {}
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+    def add(self, latency_ms, status, stages):
+        with self.lock:
+            self.latencies.append(latency_ms)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            for stage, outcome in stages.items():
+                if stage.endswith('_tokens'):
+                    # "prompt+completion" token counts of an LLM call
+                    prompt, _, completion = outcome.partition('+')
+                    totals = self.tokens.setdefault(stage[:-len('_tokens')], [0, 0, 0])
+                    totals[0] += 1
+                    totals[1] += int(prompt)
+                    totals[2] += int(completion or 0)
+                    continue
+                outcomes = self.stages.setdefault(stage, {})
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def summary(self, elapsed):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': len(latencies),
+            'errors': sum(count for status, count in self.statuses.items() if status != 200),
+            'statuses': self.statuses,
+            'throughput_rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 1),
+            'p90_ms': round(percentile(latencies, 0.90), 1),
+            'p99_ms': round(percentile(latencies, 0.99), 1),
+            # Fraction of requests per stage that used the non-LLM fallback
+            'fallback_rates': {
+                stage: round(outcomes.get('fallback', 0) / sum(outcomes.values()), 3)
+                for stage, outcomes in self.stages.items()
+                if stage != 'diagnosis'
+            },
+            'stages': self.stages,
+            # Share of each outcome per stage, e.g. explanation: template / llm / fallback
+            'outcome_shares': {
+                stage: {outcome: round(count / sum(outcomes.values()), 3) for outcome, count in outcomes.items()}
+                for stage, outcomes in self.stages.items()
+            },
+            # Mean prompt/completion tokens per LLM call, by stage
+            'mean_tokens': {
+                stage: {'prompt': round(prompt / calls, 1), 'completion': round(completion / calls, 1)}
+                for stage, (calls, prompt, completion) in self.tokens.items()
+            },
+        }
+
+
+def run_load(url, concurrency=16, duration=20.0, mode='manual', path='/diagnose', hinted=False):
+    """
+    Hammer `url + path` from `concurrency` threads for `duration` seconds (closed loop).
+    Returns a dict with requests, errors, throughput, latency percentiles (ms)
+    and per-stage fallback rates.
+    """
+    target = urlparse(url)
+    deadline = time.perf_counter() + duration
+    results = Results()
+
+    def client(bodies):
+        connection = None
+        while time.perf_counter() < deadline:
+            body = json.dumps(next(bodies))
+            started = time.perf_counter()
+            connection, status, stages = post(target, connection, path, body)
+            results.add((time.perf_counter() - started) * 1000, status, stages)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(payloads(mode, hinted),)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results.summary(time.perf_counter() - started)
+
+
+def run_rate(url, rps=10.0, duration=20.0, mode='manual', path='/diagnose', max_in_flight=256, hinted=False):
+    """
+    Send requests at a fixed arrival rate for `duration` seconds (open loop).
+    Latency is measured from each request's scheduled start, so queueing in
+    the client counts too and an overloaded server cannot hide behind
+    fewer requests being sent.
+    """
+    target = urlparse(url)
+    results = Results()
+    bodies = payloads(mode, hinted)
+    connections = queue.LifoQueue()
+    interval = 1.0 / rps
+    total = int(rps * duration)
+
+    def send(scheduled, body):
+        try:
+            connection = connections.get_nowait()
+        except queue.Empty:
+            connection = None
+        connection, status, stages = post(target, connection, path, body)
+        results.add((time.perf_counter() - scheduled) * 1000, status, stages)
+        if connection is not None:
+            connections.put(connection)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for index in range(total):
+            scheduled = started + index * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, scheduled, json.dumps(next(bodies)))
+    return results.summary(time.perf_counter() - started)
+
+
+def print_result(name, result):
+    print(f"📊 {name}: {result['throughput_rps']} req/s, {result['requests']} requests, {result['errors']} errors")
+    print(f"   latency p50 {result['p50_ms']} ms | p90 {result['p90_ms']} ms | p99 {result['p99_ms']} ms")
+    for stage, shares in result['outcome_shares'].items():
+        print(f"   {stage}: " + " | ".join(f"{outcome} {share:.1%}" for outcome, share in sorted(shares.items())))
+    for stage, tokens in result['mean_tokens'].items():
+        print(f"   {stage} tokens per call: {tokens['prompt']} prompt + {tokens['completion']} completion")
+    if result['errors']:
+        print(f"   statuses: {result['statuses']}")
+
+
+# =====================================================================
+# SERVER PROFILES FOR --compare
+# =====================================================================
+
+SERVERS = {
+    'dev server (app.run)': [sys.executable, 'app_flask.py'],
+    'gunicorn (gunicorn.conf.py)': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app_flask:app'],
+}
+
+
+def start_server(command, port, env=None):
+    """Start a server process on `port` and wait until it answers."""
+    environment = dict(os.environ, PORT=str(port), **(env or {}))
+    process = subprocess.Popen(command, env=environment, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"{' '.join(command)} exited with code {process.returncode}")
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{' '.join(command)} did not start within 30s")
+
+
+def stop_server(process):
+    """Gracefully stop a server and its children (reloader, workers)."""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=40)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def start_mock(port=9000, extra_args=''):
+    """Start mock_groq.py; returns (process, env pointing the app at it)."""
+    command = [sys.executable, 'mock_groq.py', '--port', str(port)] + shlex.split(extra_args)
+    process = subprocess.Popen(command, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/')
+            connection.getresponse().read()
+            break
+        except OSError:
+            time.sleep(0.1)
+    env = {'GROQ_BASE_URL': f"http://127.0.0.1:{port}", 'GROQ_API_KEY': 'mock'}
+    return process, env
+
+
+def drive(url, args):
+    """Run whichever load shape the command line asked for."""
+    if args.rps:
+        return run_rate(url, args.rps, args.duration, args.mode, hinted=args.hint)
+    return run_load(url, args.concurrency, args.duration, args.mode, hinted=args.hint)
+
+
+# All load comes from one client address, so the per-client limit is off
+LOAD_TEST_ENV = {'RATE_LIMIT_RPS': '0'}
+
+# --admission: the same dev server without and with the LLM concurrency limit
+ADMISSION_PROFILES = {
+    'no admission control': {'LLM_CONCURRENCY': '0'},
+    'admission control': {},
+}
+
+
+def compare(args, port=8765, env=None):
+    results = {}
+    for name, command in SERVERS.items():
+        print(f"🚀 Starting {name} ...")
+        process = start_server(command, port, dict(LOAD_TEST_ENV, **(env or {})))
+        try:
+            results[name] = drive(f"http://127.0.0.1:{port}", args)
+        finally:
+            stop_server(process)
+        print_result(name, results[name])
+    return results
+
+
+def admission_compare(args, port=8765, env=None):
+    """Overload the dev server with and without admission control (use with --mock)."""
+    results = {}
+    for name, profile in ADMISSION_PROFILES.items():
+        print(f"🚀 Starting dev server with {name} ...")
+        process = start_server(SERVERS['dev server (app.run)'], port, {**LOAD_TEST_ENV, **(env or {}), **profile})
+        try:
+            results[name] = drive(f"http://127.0.0.1:{port}", args)
+        finally:
+            stop_server(process)
+        print_result(name, results[name])
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the /diagnose endpoint.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rps', type=float, default=0,
+                        help="Open-loop arrival rate (requests/s) instead of a fixed number of clients")
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--mode', choices=['manual', 'natural'], default='manual')
+    parser.add_argument('--hint', action='store_true',
+                        help="Send the appliance hint with natural-language requests (smaller extractor prompt)")
+    parser.add_argument('--compare', action='store_true',
+                        help="Start the dev server and the gunicorn profile in turn and load both")
+    parser.add_argument('--admission', action='store_true',
+                        help="Run the dev server without and with LLM admission control and load both")
+    parser.add_argument('--server-env', default='',
+                        help="Extra environment for servers started by --compare/--admission, e.g. \"LLM_CONCURRENCY=6\"")
+    parser.add_argument('--mock', action='store_true',
+                        help="Start mock_groq.py and point the servers started by --compare at it")
+    parser.add_argument('--mock-port', type=int, default=9000)
+    parser.add_argument('--mock-args', default='', help="Extra arguments for mock_groq.py")
+    args = parser.parse_args()
+
+    mock, env = (start_mock(args.mock_port, args.mock_args) if args.mock else (None, {}))
+    env.update(item.split('=', 1) for item in shlex.split(args.server_env))
+    try:
+        if args.admission:
+            admission_compare(args, env=env)
+        elif args.compare:
+            compare(args, env=env)
+        else:
+            if mock is not None:
+                print(f"🧪 Mock Groq running; start the server with {env}")
+            print_result(args.url, drive(args.url, args))
+    finally:
+        if mock is not None:
+            stop_server(mock)
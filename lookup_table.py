@@ -0,0 +1,249 @@
+"""
+Precomputed diagnosis lookup table.
+
+Every appliance only has a handful of symptoms and observation values, so
+the whole manual-mode input space can be enumerated offline. `build` runs
+DiagnosticEngine over every symptom subset x observation combination and
+writes a compact binary artifact; `DiagnosisTable` memory-maps it and
+answers lookups without running the engine.
+
+Keys are mapped to slots with a mixed-radix index (symptom bitmask, then
+one digit per observation key, 0 meaning "not given"), which is a minimal
+perfect hash over the enumerated space. Identical reports are stored once.
+
+Cases are built with symptoms in vocabulary order. The engine breaks score
+ties and orders explanations by declaration order, and CaseFacts declares
+symptoms and observations in that same canonical order whatever order they
+were given in, so a lookup returns exactly the report of a live run.
+
+Usage:
+    python lookup_table.py build [--output diagnosis_table.bin]
+"""
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+import engine as engine_module
+import knowledge_base
+import symbols
+from engine import DiagnosticEngine, knowledge_base_vocabulary
+from symbols import CaseFacts
+
+MAGIC = b'AFDLUT01'
+HEADER = struct.Struct('<8sII')  # magic, header JSON length, report count
+
+
+def default_table_path():
+    """DIAGNOSIS_TABLE (from the environment or .env), read when needed rather than at import."""
+    from groq_client import load_env
+    load_env()
+    return os.getenv('DIAGNOSIS_TABLE', 'diagnosis_table.bin')
+
+
+def knowledge_base_fingerprint():
+    """Hash of the rule and vocabulary sources; a table built from other rules is stale."""
+    digest = hashlib.sha256()
+    for module in (engine_module, symbols):
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    for path in knowledge_base.source_paths():
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _layout(vocabulary):
+    """Slot layout per appliance: base offset, symptom order and observation radices."""
+    layout = {}
+    base = 0
+    for appliance, entry in vocabulary.items():
+        observations = list(entry['observations'].items())
+        size = 2 ** len(entry['symptoms'])
+        for _, values in observations:
+            size *= len(values) + 1
+        layout[appliance] = {
+            'base': base,
+            'size': size,
+            'symptoms': entry['symptoms'],
+            'observations': observations
+        }
+        base += size
+    return layout, base
+
+
+def _enumerate(appliance, table):
+    """Yield (slot index within the appliance, CaseFacts) in slot order."""
+    symptoms = table['symptoms']
+    value_choices = [[None] + values for _, values in table['observations']]
+    index = 0
+    for mask in range(2 ** len(symptoms)):
+        selected = [s for bit, s in enumerate(symptoms) if mask & (1 << bit)]
+        for values in itertools.product(*value_choices):
+            observations = {key: value for (key, _), value in zip(table['observations'], values) if value}
+            yield index, CaseFacts(appliance, selected, observations)
+            index += 1
+
+
+def build(output_path=None):
+    """Run the engine over the full input space and write the lookup artifact."""
+    output_path = output_path or default_table_path()
+    started = time.time()
+    engine = DiagnosticEngine()
+    vocabulary = knowledge_base_vocabulary(engine)
+    layout, slot_count = _layout(vocabulary)
+
+    slots = array('I', [0]) * slot_count
+    report_ids = {}
+    blobs = []
+
+    for appliance, table in layout.items():
+        print(f"🔧 {appliance}: {table['size']} cases")
+        for index, case in _enumerate(appliance, table):
+            report = engine.run_cases([case])[0]
+            blob = json.dumps(report, sort_keys=True, separators=(',', ':')).encode('utf-8')
+            if blob not in report_ids:
+                report_ids[blob] = len(blobs)
+                blobs.append(blob)
+            slots[table['base'] + index] = report_ids[blob]
+
+    offsets = array('Q', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    header = json.dumps({
+        'fingerprint': knowledge_base_fingerprint(),
+        'byteorder': sys.byteorder,
+        'slot_count': slot_count,
+        'layout': layout
+    }).encode('utf-8')
+    header += b' ' * (-(HEADER.size + len(header)) % 8)  # keep the arrays 8-byte aligned
+
+    with open(output_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(header), len(blobs)))
+        f.write(header)
+        f.write(offsets.tobytes())
+        slots.tofile(f)
+        for blob in blobs:
+            f.write(blob)
+
+    size = os.path.getsize(output_path)
+    print(f"✅ Wrote {output_path}: {slot_count} cases, {len(blobs)} distinct reports, "
+          f"{size / 1024:.0f} KB in {time.time() - started:.1f}s")
+    return output_path
+
+
+class DiagnosisTable:
+    """Memory-mapped, read-only view over a built lookup artifact."""
+
+    def __init__(self, path=None):
+        path = path or default_table_path()
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_length, report_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a diagnosis lookup table")
+        header = json.loads(self._map[HEADER.size:HEADER.size + header_length])
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was built on a {header['byteorder']}-endian machine")
+
+        self.fingerprint = header['fingerprint']
+        self._tables = {}
+        for appliance, table in header['layout'].items():
+            self._tables[appliance] = (
+                table['base'],
+                {symptom: 1 << bit for bit, symptom in enumerate(table['symptoms'])},
+                [(key, {value: i for i, value in enumerate(values, 1)}) for key, values in table['observations']]
+            )
+
+        view = memoryview(self._map)
+        start = HEADER.size + header_length
+        self._offsets = view[start:start + 8 * (report_count + 1)].cast('Q')
+        start += 8 * (report_count + 1)
+        self._slots = view[start:start + 4 * header['slot_count']].cast('I')
+        self._blob_start = start + 4 * header['slot_count']
+
+    @property
+    def is_current(self):
+        """False if the rules changed since the table was built."""
+        return self.fingerprint == knowledge_base_fingerprint()
+
+    def lookup(self, appliance, symptoms, observations=None):
+        """
+        Return the precomputed report for a manual-mode case (the same for any
+        order of `symptoms`), or None if any input is outside the enumerated vocabulary.
+        """
+        table = self._tables.get(appliance)
+        if table is None:
+            return None
+        base, symptom_bits, observation_digits = table
+
+        index = 0
+        for symptom in symptoms:
+            bit = symptom_bits.get(symptom)
+            if bit is None:
+                return None
+            index |= bit
+
+        remaining = {key: value for key, value in (observations or {}).items() if value}
+        for key, digits in observation_digits:
+            value = remaining.pop(key, None)
+            digit = 0 if value is None else digits.get(value)
+            if digit is None:
+                return None
+            index = index * (len(digits) + 1) + digit
+        if remaining:
+            return None
+
+        report_id = self._slots[base + index]
+        start = self._blob_start + self._offsets[report_id]
+        end = self._blob_start + self._offsets[report_id + 1]
+        return json.loads(self._map[start:end])
+
+
+def load_table(path=None):
+    """Open the lookup table if it exists and matches the current rules, else None."""
+    path = path or default_table_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        table = DiagnosisTable(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load diagnosis table {path}: {e}")
+        return None
+    if not table.is_current:
+        print(f"⚠️ Diagnosis table {path} is stale (rules changed). Rebuild it with: python lookup_table.py build")
+        return None
+    return table
+
+
+def diagnose_manual(appliance, symptoms, observations=None, table=None):
+    """
+    Answer a manual-mode case from the lookup table, falling back to the
+    live engine for inputs outside the table.
+    """
+    if table is not None:
+        report = table.lookup(appliance, symptoms, observations)
+        if report is not None:
+            return report
+    engine = DiagnosticEngine()
+    return engine.run_cases([CaseFacts(appliance, symptoms, observations)])[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute every manual-mode diagnosis into a lookup table.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build_parser = subcommands.add_parser('build', help="Build the lookup artifact")
+    build_parser.add_argument('--output', help="Default: DIAGNOSIS_TABLE or diagnosis_table.bin")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build(args.output)
@@ -0,0 +1,77 @@
+"""
+Lightweight in-process metrics.
+
+Counters are process-wide (one set per worker). Stage outcomes such as
+"extraction=fallback" are also collected in a per-request trace so the
+Flask app can report them on each response, which stays accurate when
+several workers serve traffic.
+"""
+import contextvars
+import threading
+from collections import Counter
+
+_counters = Counter()
+_gauges = {}
+_lock = threading.Lock()
+_trace = contextvars.ContextVar('metrics_trace', default=None)
+
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def record(stage, outcome):
+    """Count a stage outcome (e.g. 'extraction', 'llm') and add it to the current trace."""
+    increment(f"{stage}.{outcome}")
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = outcome
+
+
+def annotate(stage, outcome):
+    """Add a stage outcome to the current trace without counting it (already counted elsewhere)."""
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = outcome
+
+
+def outcome(stage):
+    """Outcome recorded for a stage in the current trace (None if none yet)."""
+    trace = _trace.get()
+    return trace.get(stage) if trace is not None else None
+
+
+def record_tokens(stage, prompt_tokens, completion_tokens):
+    """Count the tokens of one LLM call and add them to the current trace as 'prompt+completion'."""
+    with _lock:
+        _counters[f"{stage}.calls"] += 1
+        _counters[f"{stage}.prompt_tokens"] += prompt_tokens
+        _counters[f"{stage}.completion_tokens"] += completion_tokens
+    trace = _trace.get()
+    if trace is not None:
+        trace[f"{stage}_tokens"] = f"{prompt_tokens}+{completion_tokens}"
+
+
+def start_trace():
+    """Begin collecting stage outcomes for the current request."""
+    trace = {}
+    _trace.set(trace)
+    return trace
+
+
+def snapshot():
+    """Return a copy of all counters and gauges."""
+    with _lock:
+        return {'counters': dict(_counters), 'gauges': dict(_gauges)}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
@@ -0,0 +1,246 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Serves POST /openai/v1/chat/completions with OpenAI-style responses so the
+natural-language mode can be load-tested offline. Latency, server errors,
+429s, timeouts and malformed output are configurable. Extraction prompts get
+canned fact JSON picked by keyword; every other prompt gets a canned
+explanation.
+
+Point the app at it with:
+    GROQ_BASE_URL=http://127.0.0.1:9000 GROQ_API_KEY=mock python app_flask.py
+
+Usage:
+    python mock_groq.py [--port 9000] [--latency lognormal:300:0.5] [--per-token-ms 0]
+                        [--error-rate 0.0] [--rate-limit-rate 0.0]
+                        [--timeout-rate 0.0] [--malformed-rate 0.0] [--capacity 0]
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = '/openai/v1/chat/completions'
+
+# Canned extractor outputs, chosen by the first keyword found in the user text
+CANNED_FACTS = [
+    ('washing', {"appliance": "Washing Machine", "symptoms": ["Wont Drain", "Loud Noise"],
+                 "observations": {"noise_type": "Grinding"}}),
+    ('fan', {"appliance": "Fan", "symptoms": ["Wobbles", "Overheating"], "observations": {}}),
+    ('generator', {"appliance": "Power Generator", "symptoms": ["Excessive Smoke", "Overheating"],
+                   "observations": {}}),
+    ('grinder', {"appliance": "Kitchen Grinder", "symptoms": ["Jamming", "Burning Smell"],
+                 "observations": {}}),
+]
+DEFAULT_FACTS = {"appliance": "Washing Machine", "symptoms": ["Not Spinning"], "observations": {}}
+
+CANNED_EXPLANATION = (
+    "The symptoms you described match this fault most closely. The recommended "
+    "steps address the most likely cause first, so try them in order and stop "
+    "once the appliance works normally again."
+)
+
+
+def parse_latency(spec):
+    """
+    Turn a latency spec into a function returning seconds:
+    'fixed:MS', 'uniform:LO_MS:HI_MS' or 'lognormal:MEDIAN_MS:SIGMA'.
+    """
+    kind, *values = spec.split(':')
+    values = [float(v) for v in values]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == 'uniform' and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == 'lognormal' and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Unknown latency spec: {spec!r}")
+
+
+def canned_content(messages):
+    """Pick the reply text for a chat request."""
+    system = next((m.get('content', '') for m in messages if m.get('role') == 'system'), '')
+    user = next((m.get('content', '') for m in reversed(messages) if m.get('role') == 'user'), '')
+    if 'fact extractor' not in system.lower():
+        return CANNED_EXPLANATION
+    text = user.lower()
+    facts = next((facts for keyword, facts in CANNED_FACTS if keyword in text), DEFAULT_FACTS)
+    return json.dumps(facts)
+
+
+class MockGroq:
+    """Behaviour settings and request counters shared by all handler threads."""
+
+    def __init__(self, latency='lognormal:300:0.5', error_rate=0.0, rate_limit_rate=0.0,
+                 timeout_rate=0.0, malformed_rate=0.0, timeout_seconds=30.0, per_token_ms=0.0,
+                 capacity=0):
+        self.latency = parse_latency(latency)
+        self.per_token_ms = per_token_ms
+        self.capacity = capacity
+        self.in_flight = 0
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.timeout_seconds = timeout_seconds
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def enter(self):
+        """Admit a request; False if `capacity` requests are already in flight."""
+        with self._lock:
+            if self.capacity and self.in_flight >= self.capacity:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def outcome(self):
+        """Draw what happens to the next request."""
+        roll = random.random()
+        for name, rate in (('error', self.error_rate), ('rate_limited', self.rate_limit_rate),
+                           ('timeout', self.timeout_rate), ('malformed', self.malformed_rate)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return 'ok'
+
+
+def completion(model, content, prompt_chars):
+    """Build an OpenAI-style chat completion body."""
+    prompt_tokens = max(1, prompt_chars // 4)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': content},
+            'finish_reason': 'stop',
+        }],
+        'usage': {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            # Counters for checking what the mock actually served
+            self.send_json(200, mock.counts)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path != CHAT_PATH:
+                self.send_json(404, {'error': {'message': f"Unknown path {self.path}"}})
+                return
+            try:
+                payload = json.loads(body)
+                messages = payload['messages']
+            except (ValueError, KeyError):
+                self.send_json(400, {'error': {'message': 'Invalid request body'}})
+                return
+
+            # Like the real API, concurrency beyond the account's limit is refused
+            if not mock.enter():
+                mock.count('over_capacity')
+                self.send_json(429, {'error': {'message': 'Mock capacity exceeded', 'type': 'rate_limit_exceeded'}},
+                               headers={'Retry-After': '1'})
+                return
+            try:
+                self.respond(payload, messages)
+            finally:
+                mock.leave()
+
+        def respond(self, payload, messages):
+            outcome = mock.outcome()
+            mock.count(outcome)
+            prompt_chars = sum(len(m.get('content', '')) for m in messages)
+            if outcome == 'timeout':
+                time.sleep(mock.timeout_seconds)
+            else:
+                # Base latency plus prompt processing time, so shorter prompts answer faster
+                time.sleep(mock.latency() + prompt_chars // 4 * mock.per_token_ms / 1000)
+
+            if outcome == 'error':
+                self.send_json(500, {'error': {'message': 'Mock internal error', 'type': 'internal_server_error'}})
+            elif outcome == 'rate_limited':
+                self.send_json(429, {'error': {'message': 'Mock rate limit', 'type': 'rate_limit_exceeded'}},
+                               headers={'Retry-After': '1'})
+            else:
+                content = canned_content(messages)
+                if outcome == 'malformed':
+                    content = content[:len(content) // 2]
+                self.send_json(200, completion(payload.get('model', 'mock'), content, prompt_chars))
+
+    return Handler
+
+
+def serve(port=9000, **settings):
+    """Run the mock server until interrupted."""
+    mock = MockGroq(**settings)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(mock))
+    server.daemon_threads = True
+    print(f"🧪 Mock Groq listening on http://127.0.0.1:{port}{CHAT_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {mock.counts}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local Groq-compatible mock server.")
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', default='lognormal:300:0.5',
+                        help="fixed:MS, uniform:LO:HI or lognormal:MEDIAN:SIGMA (ms)")
+    parser.add_argument('--per-token-ms', type=float, default=0.0,
+                        help="Extra latency per prompt token (~4 chars), to model prompt size cost")
+    parser.add_argument('--capacity', type=int, default=0,
+                        help="Concurrent requests served; more are answered with HTTP 429 (0 = unlimited)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction answered with HTTP 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction answered with HTTP 429")
+    parser.add_argument('--timeout-rate', type=float, default=0.0,
+                        help="Fraction held open for --timeout-seconds (beyond the client timeout)")
+    parser.add_argument('--timeout-seconds', type=float, default=30.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help="Fraction answered with truncated (unparseable) content")
+    args = parser.parse_args()
+    serve(args.port, latency=args.latency, error_rate=args.error_rate,
+          rate_limit_rate=args.rate_limit_rate, timeout_rate=args.timeout_rate,
+          malformed_rate=args.malformed_rate, timeout_seconds=args.timeout_seconds,
+          per_token_ms=args.per_token_ms, capacity=args.capacity)
@@ -0,0 +1,227 @@
+"""
+Next-best-question selection.
+
+When the facts so far leave several diagnoses close together, ask the user
+the question whose answer is expected to settle the most: every unasked
+symptom ("Do you also notice ...?") and observation (noise_type, power,
+fuel) is ranked by expected information gain, the drop in entropy of the
+posterior over diagnoses averaged over the possible answers.
+
+Hypothetical answers are not run through the engine. They are simulated on
+the Bayes scoring index (bayes.BayesModel: log-prior vector and likelihood
+matrix per appliance), so all candidate questions and all their answers
+are scored together in a few array operations.
+
+Usage:
+    python questions.py             # timing vs the engine, and accuracy after k questions in simulated interviews
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from symbols import OBSERVATION_KEYS
+
+OBSERVATION_QUESTIONS = {
+    'noise_type': "What kind of noise does it make?",
+    'power': "Have you checked the power supply (plug, outlet, breaker)?",
+    'fuel': "What is the fuel level?",
+}
+
+def _entropy(probabilities, axis=0):
+    """Entropy in bits along an axis (0 log 0 = 0)."""
+    p = np.clip(probabilities, 1e-12, 1.0)
+    return -(probabilities * np.log2(p)).sum(axis=axis)
+
+
+def _normalize(weights, axis=0):
+    return weights / weights.sum(axis=axis, keepdims=True)
+
+
+def _posterior(model, symptoms, observations, ruled_out):
+    """Posterior over the model's diagnoses for reported facts and symptoms answered 'no'."""
+    present = [model.feature_index[s] for s in symptoms if s in model.feature_index]
+    present += [model.feature_index[f"{k}={v}"] for k, v in observations.items()
+                if f"{k}={v}" in model.feature_index]
+    absent = [model.feature_index[s] for s in ruled_out if s in model.feature_index]
+    logits = model.log_prior + model.log_likelihood[:, present].sum(axis=1)
+    logits += np.log1p(-model.likelihood[:, absent]).sum(axis=1)
+    return _normalize(np.exp(logits - logits.max()))
+
+
+def _answers(model, labels, answer_probabilities, posteriors):
+    return [{'answer': label, 'probability': round(float(p), 3),
+             'likely_diagnosis': model.diagnoses[int(np.argmax(posteriors[:, i]))]}
+            for i, (label, p) in enumerate(zip(labels, answer_probabilities))]
+
+
+def next_questions(model, appliance, symptoms=(), observations=None, ruled_out=(), limit=3):
+    """
+    Rank the unasked questions for a case by expected information gain (bits).
+
+    `model` is a bayes.BayesModel; `symptoms` and `observations` are the facts
+    reported so far, `ruled_out` the symptoms the user answered "no" to.
+    Raises ValueError for an appliance the model does not know or facts of
+    the wrong type.
+    """
+    appliance_model = model.appliance_model(appliance)
+    if appliance_model is None:
+        raise ValueError(f"Unknown appliance: {appliance}")
+    for field, names in (('symptoms', symptoms), ('ruled_out', ruled_out)):
+        if not isinstance(names, (list, tuple, set)) or not all(isinstance(name, str) for name in names):
+            raise ValueError(f"'{field}' must be a list of symptom names")
+    if observations is not None and not isinstance(observations, dict):
+        raise ValueError("'observations' must be an object")
+    observations = {key: value for key, value in (observations or {}).items() if value}
+    posterior = _posterior(appliance_model, symptoms, observations, ruled_out)
+    entropy = float(_entropy(posterior))
+    questions = []
+
+    # Symptoms: yes/no for every candidate at once (diagnoses x candidates)
+    asked = set(symptoms) | set(ruled_out)
+    candidates = [(i, f) for i, f in enumerate(appliance_model.features) if '=' not in f and f not in asked]
+    if candidates:
+        columns = [i for i, _ in candidates]
+        yes = posterior[:, None] * appliance_model.likelihood[:, columns]
+        no = posterior[:, None] - yes
+        p_yes, p_no = yes.sum(axis=0), no.sum(axis=0)
+        expected = p_yes * _entropy(_normalize(yes)) + p_no * _entropy(_normalize(no))
+        for n, (_, symptom) in enumerate(candidates):
+            questions.append({
+                'type': 'symptom',
+                'name': symptom,
+                'question': f"Do you also notice '{symptom}'?",
+                'information_gain': entropy - float(expected[n]),
+                'answers': _answers(appliance_model, ['yes', 'no'], [p_yes[n], p_no[n]],
+                                    np.stack([_normalize(yes[:, n]), _normalize(no[:, n])], axis=1))
+            })
+
+    # Observations: one answer per known value, likelihoods normalized over the values
+    for key in OBSERVATION_KEYS:
+        if key in observations:
+            continue
+        values = [(i, f.split('=', 1)[1]) for i, f in enumerate(appliance_model.features)
+                  if f.startswith(key + '=')]
+        if not values:
+            continue
+        likelihood = _normalize(appliance_model.likelihood[:, [i for i, _ in values]], axis=1)
+        joint = posterior[:, None] * likelihood
+        p_answer = joint.sum(axis=0)
+        posteriors = _normalize(joint)
+        questions.append({
+            'type': 'observation',
+            'name': key,
+            'question': OBSERVATION_QUESTIONS.get(key, f"What is the {key.replace('_', ' ')}?"),
+            'information_gain': entropy - float((p_answer * _entropy(posteriors)).sum()),
+            'answers': _answers(appliance_model, [value for _, value in values], p_answer, posteriors)
+        })
+
+    questions.sort(key=lambda question: question['information_gain'], reverse=True)
+    for question in questions:
+        question['information_gain'] = round(question['information_gain'], 3)
+    best = int(np.argmax(posterior))
+    return {
+        'appliance': appliance,
+        'entropy': round(entropy, 3),
+        'likely_diagnosis': {'diagnosis': appliance_model.diagnoses[best],
+                             'probability': round(float(posterior[best]), 3)},
+        'questions': questions[:limit] if limit else questions
+    }
+
+
+# =====================================================================
+# BENCHMARK
+# =====================================================================
+
+def _sample_case(appliance_model, rng):
+    """Draw a diagnosis from the prior and a set of facts from its likelihoods."""
+    diagnosis = rng.choices(range(len(appliance_model.diagnoses)), weights=np.exp(appliance_model.log_prior))[0]
+    truth = {'symptoms': set(), 'observations': {}}
+    for feature, p in zip(appliance_model.features, appliance_model.likelihood[diagnosis]):
+        if '=' not in feature and rng.random() < p:
+            truth['symptoms'].add(feature)
+    for key in OBSERVATION_KEYS:
+        values = [(f.split('=', 1)[1], p) for f, p in zip(appliance_model.features, appliance_model.likelihood[diagnosis])
+                  if f.startswith(key + '=')]
+        if values:
+            truth['observations'][key] = rng.choices([v for v, _ in values], weights=[p for _, p in values])[0]
+    return diagnosis, truth
+
+
+def _interview(model, appliance, truth, first_symptom, strategy, rng, max_questions):
+    """Ask up to `max_questions`; return the likely diagnosis and its probability before each one and at the end."""
+    symptoms, observations, ruled_out = [first_symptom], {}, []
+    steps = []
+    for _ in range(max_questions + 1):
+        result = next_questions(model, appliance, symptoms, observations, ruled_out, limit=0)
+        steps.append((result['likely_diagnosis']['diagnosis'], result['likely_diagnosis']['probability']))
+        if not result['questions'] or len(steps) > max_questions:
+            break
+        question = result['questions'][0] if strategy == 'information gain' else rng.choice(result['questions'])
+        if question['type'] == 'symptom':
+            (symptoms if question['name'] in truth['symptoms'] else ruled_out).append(question['name'])
+        else:
+            observations[question['name']] = truth['observations'][question['name']]
+    # Out of questions: the answer no longer changes
+    return steps + [steps[-1]] * (max_questions + 1 - len(steps))
+
+
+def benchmark(trials=300, max_questions=5, seed=7):
+    from bayes import build_model
+    from engine import DiagnosticEngine
+    from symbols import CaseFacts
+
+    engine = DiagnosticEngine()
+    model = build_model(engine)
+
+    # Cost of one ranking vs running the engine once per hypothetical answer
+    appliance, symptoms = 'Washing Machine', ['Wont Drain']
+    started = time.perf_counter()
+    for _ in range(200):
+        result = next_questions(model, appliance, symptoms, limit=0)
+    ranking = (time.perf_counter() - started) / 200
+    hypotheticals = [(symptoms + [q['name']], {}) if q['type'] == 'symptom' else (symptoms, {q['name']: a['answer']})
+                     for q in result['questions'] for a in q['answers']]
+    started = time.perf_counter()
+    for hypothetical_symptoms, observations in hypotheticals:
+        engine.run_cases([CaseFacts(appliance, hypothetical_symptoms, observations)])
+    simulated = time.perf_counter() - started
+    print(f"📊 {len(result['questions'])} candidate questions, {len(hypotheticals)} hypothetical answers")
+    print(f"   information gain ranking     {ranking * 1000:7.2f} ms")
+    print(f"   engine run per hypothetical  {simulated * 1000:7.2f} ms")
+
+    # Simulated interviews: a diagnosis and its facts drawn from the model, one symptom
+    # reported up front, then questions answered from those facts
+    appliances = sorted(model.artifact['rules'])
+    results = {}
+    for strategy in ('information gain', 'random'):
+        rng = random.Random(seed)
+        correct = np.zeros(max_questions + 1)
+        probability = np.zeros(max_questions + 1)
+        count = 0
+        while count < trials:
+            appliance = rng.choice(appliances)
+            appliance_model = model.appliance_model(appliance)
+            diagnosis, truth = _sample_case(appliance_model, rng)
+            if not truth['symptoms']:
+                continue
+            first = rng.choice(sorted(truth['symptoms']))
+            steps = _interview(model, appliance, truth, first, strategy, rng, max_questions)
+            correct += [likely == appliance_model.diagnoses[diagnosis] for likely, _ in steps]
+            probability += [p for _, p in steps]
+            count += 1
+        results[strategy] = (correct / trials, probability / trials)
+
+    print(f"\n📊 {trials} simulated interviews: top diagnosis correct (mean top probability) after k questions")
+    print(f"{'k':>3} " + ''.join(f"{strategy:>22}" for strategy in results))
+    for k in range(max_questions + 1):
+        print(f"{k:3d} " + ''.join(f"{accuracy[k]:14.1%} ({probability[k]:.2f})" for accuracy, probability in results.values()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark next-best-question selection")
+    parser.add_argument('--trials', type=int, default=300)
+    parser.add_argument('--questions', type=int, default=5, help="Questions per simulated interview")
+    args = parser.parse_args()
+    benchmark(args.trials, args.questions)
@@ -0,0 +1,385 @@
+"""
+Replay and regression harness over a stored case corpus.
+
+Runs every case of a corpus through two versions of the engine and reports
+which diagnoses change: best fit, its confidence and the alternatives. A
+version is a git revision (exported with `git archive`), a source directory
+or `.` for the working tree, scored by the rules or by the naive-Bayes mode
+(bayes.py). Each version runs in its own pool of worker processes with its
+own sys.path, so two versions of engine.py never share an interpreter.
+
+The corpus is streamed: rows are read, sent to both pools in chunks with a
+bounded number of chunks in flight, compared in input order and written
+out one changed case per line, so memory stays flat for millions of cases.
+Rows use the `python -m engine` format (CSV or JSONL with `appliance`,
+`symptoms`, optional `noise_type`/`power`/`fuel` or `observations`, `id`).
+
+Usage:
+    python replay.py cases.jsonl                                  # HEAD vs working tree
+    python replay.py cases.csv --baseline v1.2 --candidate HEAD -o changes.jsonl
+    python replay.py cases.jsonl --candidate-scoring bayes --summary summary.json
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import Counter, defaultdict, deque
+from multiprocessing import get_context
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHUNK_SIZE = 512
+PROGRESS_SECONDS = 2.0
+CHANGE_KINDS = ('diagnosis', 'confidence', 'alternatives')
+
+
+# =====================================================================
+# VERSIONS
+# =====================================================================
+
+def resolve_version(spec, workdir):
+    """
+    Source directory for a version: '.' is the working tree, an existing
+    directory is used as is, anything else is a git revision exported into
+    `workdir`. Raises ValueError for an unknown revision.
+    """
+    if spec == '.':
+        return BASE_DIR
+    if os.path.isdir(spec):
+        return os.path.abspath(spec)
+    result = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', f'{spec}^{{commit}}'],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(f"Not a directory or git revision: {spec}")
+    commit = result.stdout.strip()
+    target = os.path.join(workdir, commit[:12])
+    if not os.path.isdir(target):
+        archive = subprocess.run(['git', 'archive', '--format=tar', commit],
+                                 cwd=BASE_DIR, capture_output=True, check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(target, filter='data')
+            else:
+                tar.extractall(target)
+    return target
+
+
+# =====================================================================
+# WORKERS
+# =====================================================================
+
+# Per worker process: (source dir, scoring) -> diagnose(cases) function
+_diagnosers = {}
+
+
+def _diagnoser(source_dir, scoring):
+    """Import the version's engine (first call in this worker) and return its batch diagnose function."""
+    key = (source_dir, scoring)
+    if key not in _diagnosers:
+        sys.path.insert(0, source_dir)
+        import engine
+
+        # Check before importing anything else: older versions lack symbols.py and bayes.py too
+        if not hasattr(getattr(engine, 'DiagnosticEngine', None), 'run_cases'):
+            raise RuntimeError(f"{source_dir}: DiagnosticEngine has no run_cases(); this version is too old to replay")
+        from symbols import CaseFacts
+
+        rules = engine.DiagnosticEngine()
+        batch_size = getattr(engine, 'BATCH_SIZE', 16)
+
+        def run_rules(cases):
+            reports = []
+            for start in range(0, len(cases), batch_size):
+                reports += rules.run_cases(cases[start:start + batch_size])
+            return reports
+
+        diagnose = run_rules
+        if scoring == 'bayes':
+            try:
+                from bayes import build_model
+            except ImportError:
+                raise RuntimeError(f"{source_dir}: no bayes.py; this version cannot replay with bayes scoring")
+            model = build_model(rules)
+
+            def diagnose(cases):
+                reports = model.diagnose_many(cases)
+                missing = [i for i, report in enumerate(reports) if report is None]
+                for i, report in zip(missing, run_rules([cases[i] for i in missing])):
+                    reports[i] = report
+                return reports
+
+        _diagnosers[key] = lambda rows: diagnose([CaseFacts(*row) for row in rows])
+    return _diagnosers[key]
+
+
+def _summary(report):
+    """What a replay compares: (diagnosis, confidence, ((alternative, confidence), ...))."""
+    best = report['best_fit']
+    return (best['diagnosis'], best['score'],
+            tuple((alternative['diagnosis'], alternative['score']) for alternative in report['alternatives']))
+
+
+def diagnose_chunk(source_dir, scoring, rows):
+    """
+    Worker entry point: diagnose (appliance, symptoms, observations) rows with
+    one version. Returns (summaries, seconds); a row whose case raised gets
+    ('error', message) instead of a summary.
+    """
+    diagnose = _diagnoser(source_dir, scoring)
+    started = time.perf_counter()
+    try:
+        summaries = [_summary(report) for report in diagnose(rows)]
+    except Exception:
+        # Find the row(s) that fail instead of losing the whole chunk
+        summaries = []
+        for row in rows:
+            try:
+                summaries.append(_summary(diagnose([row])[0]))
+            except Exception as e:
+                summaries.append(('error', f'{type(e).__name__}: {e}'))
+    return summaries, time.perf_counter() - started
+
+
+# =====================================================================
+# COMPARISON
+# =====================================================================
+
+def _close(a, b, tolerance):
+    return abs(a - b) <= tolerance
+
+
+def compare(baseline, candidate, tolerance=0.0):
+    """Kinds of change between two summaries, as a list (empty when they agree)."""
+    if baseline[0] == 'error' or candidate[0] == 'error':
+        return [] if baseline == candidate else ['error']
+    changes = []
+    if baseline[0] != candidate[0]:
+        changes.append('diagnosis')
+    elif not _close(baseline[1], candidate[1], tolerance):
+        changes.append('confidence')
+    if (len(baseline[2]) != len(candidate[2])
+            or any(a[0] != b[0] or not _close(a[1], b[1], tolerance) for a, b in zip(baseline[2], candidate[2]))):
+        changes.append('alternatives')
+    return changes
+
+
+def _as_dict(summary):
+    if summary[0] == 'error':
+        return {'error': summary[1]}
+    return {'diagnosis': summary[0], 'confidence': summary[1],
+            'alternatives': [{'diagnosis': d, 'confidence': c} for d, c in summary[2]]}
+
+
+class ReplaySummary:
+    """Counts of changed cases overall, by appliance and by diagnosis."""
+
+    def __init__(self):
+        self.cases = 0
+        self.invalid = 0
+        self.changed = 0
+        self.kinds = Counter()
+        self.appliances = defaultdict(Counter)
+        self.diagnoses = defaultdict(Counter)
+        self.transitions = Counter()
+        self.seconds = {'baseline': 0.0, 'candidate': 0.0}
+
+    def add(self, appliance, baseline, candidate, changes):
+        self.cases += 1
+        self.appliances[appliance]['cases'] += 1
+        diagnosis = baseline[0] if baseline[0] != 'error' else '(error)'
+        self.diagnoses[diagnosis]['cases'] += 1
+        if not changes:
+            return
+        self.changed += 1
+        self.kinds.update(changes)
+        self.appliances[appliance]['changed'] += 1
+        self.appliances[appliance].update(changes)
+        self.diagnoses[diagnosis]['changed'] += 1
+        if 'diagnosis' in changes or 'error' in changes:
+            self.transitions[(diagnosis, candidate[0] if candidate[0] != 'error' else '(error)')] += 1
+
+    def as_dict(self, wall_seconds, top=20):
+        return {
+            'cases': self.cases,
+            'invalid_rows': self.invalid,
+            'changed': self.changed,
+            'changes': {kind: self.kinds[kind] for kind in CHANGE_KINDS + ('error',) if self.kinds[kind]},
+            'by_appliance': {appliance: dict(counts) for appliance, counts in sorted(self.appliances.items())},
+            'by_diagnosis': {diagnosis: dict(counts) for diagnosis, counts in sorted(
+                self.diagnoses.items(), key=lambda item: (-item[1]['changed'], item[0])) if counts['changed']},
+            'transitions': [{'from': a, 'to': b, 'cases': n} for (a, b), n in self.transitions.most_common(top)],
+            'throughput': {
+                'seconds': round(wall_seconds, 2),
+                'cases_per_second': round(self.cases / wall_seconds) if wall_seconds else None,
+                'worker_ms_per_case': {side: round(seconds / self.cases * 1000, 3) if self.cases else None
+                                       for side, seconds in self.seconds.items()}
+            }
+        }
+
+
+# =====================================================================
+# REPLAY
+# =====================================================================
+
+def _rows(stream, fmt):
+    """Yield (line number, row, case tuple or None, error) for every corpus row."""
+    from engine import read_cases, case_from_row
+    from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS
+
+    for line_number, row in read_cases(stream, fmt):
+        case, error = case_from_row(row)
+        if case is None:
+            yield line_number, row, None, error
+            continue
+        yield line_number, row, (APPLIANCES.name(case.appliance),
+                                 [SYMPTOMS.name(s) for s in case.symptoms],
+                                 {key: OBSERVATIONS.name(value) for key, value in case.observations.items()}), None
+
+
+def replay(rows, baseline, candidate, workers=None, chunk_size=CHUNK_SIZE, tolerance=0.0, on_change=None, progress=None):
+    """
+    Replay (line number, row, case, error) items through two versions, each a
+    (source dir, scoring) pair. Calls on_change(record) for every changed case
+    and progress(summary, seconds) now and then; returns the ReplaySummary.
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    context = get_context('spawn')  # fresh interpreters: no engine module inherited from this process
+    summary = ReplaySummary()
+    started = last_progress = time.perf_counter()
+    rows = iter(rows)
+
+    with context.Pool(workers) as baseline_pool, context.Pool(workers) as candidate_pool:
+        pending = deque()
+
+        def settle(chunk, baseline_result, candidate_result):
+            (baseline_summaries, baseline_seconds) = baseline_result.get()
+            (candidate_summaries, candidate_seconds) = candidate_result.get()
+            summary.seconds['baseline'] += baseline_seconds
+            summary.seconds['candidate'] += candidate_seconds
+            for (line_number, row, case), before, after in zip(chunk, baseline_summaries, candidate_summaries):
+                changes = compare(before, after, tolerance)
+                summary.add(case[0], before, after, changes)
+                if changes and on_change is not None:
+                    record = {'line': line_number}
+                    if row.get('id') not in (None, ''):
+                        record['id'] = row['id']
+                    record.update({'appliance': case[0], 'symptoms': case[1], 'observations': case[2],
+                                   'changes': changes, 'baseline': _as_dict(before), 'candidate': _as_dict(after)})
+                    on_change(record)
+
+        while True:
+            items = list(itertools.islice(rows, chunk_size))
+            chunk = [(line_number, row, case) for line_number, row, case, _ in items if case is not None]
+            summary.invalid += len(items) - len(chunk)
+            if chunk:
+                cases = [case for _, _, case in chunk]
+                pending.append((chunk,
+                                baseline_pool.apply_async(diagnose_chunk, (*baseline, cases)),
+                                candidate_pool.apply_async(diagnose_chunk, (*candidate, cases))))
+            # Keep two chunks per worker in flight; settle the oldest beyond that, and all at the end
+            while pending and (not items or len(pending) > 2 * workers):
+                settle(*pending.popleft())
+                if progress is not None and time.perf_counter() - last_progress >= PROGRESS_SECONDS:
+                    last_progress = time.perf_counter()
+                    progress(summary, last_progress - started)
+            if not items:
+                break
+    return summary, time.perf_counter() - started
+
+
+def _print_summary(result, baseline_label, candidate_label):
+    print(f"📊 {baseline_label} → {candidate_label}: {result['cases']:,} cases, "
+          f"{result['changed']:,} changed ({result['changed'] / max(result['cases'], 1):.2%})"
+          + (f", {result['invalid_rows']:,} invalid rows skipped" if result['invalid_rows'] else ""), file=sys.stderr)
+    for kind, count in result['changes'].items():
+        print(f"   {kind:<13} {count:>10,}", file=sys.stderr)
+    if result['changed']:
+        print(f"\n{'Appliance':<18} {'cases':>10} {'changed':>9} {'diagnosis':>10} {'confidence':>11} {'alternatives':>13}",
+              file=sys.stderr)
+        for appliance, counts in result['by_appliance'].items():
+            print(f"{appliance:<18} {counts.get('cases', 0):>10,} {counts.get('changed', 0):>9,} "
+                  f"{counts.get('diagnosis', 0):>10,} {counts.get('confidence', 0):>11,} {counts.get('alternatives', 0):>13,}",
+                  file=sys.stderr)
+        print("\nMost changed best fits (changed / cases):", file=sys.stderr)
+        for diagnosis, counts in list(result['by_diagnosis'].items())[:10]:
+            print(f"   {diagnosis:<40} {counts['changed']:>8,} / {counts['cases']:,}", file=sys.stderr)
+        if result['transitions']:
+            print("\nBest-fit changes:", file=sys.stderr)
+            for transition in result['transitions'][:10]:
+                print(f"   {transition['cases']:>8,}  {transition['from']} → {transition['to']}", file=sys.stderr)
+    throughput = result['throughput']
+    print(f"\n⏱️ {throughput['seconds']} s, {throughput['cases_per_second']:,} cases/s; worker time per case: "
+          + ", ".join(f"{side} {ms} ms" for side, ms in throughput['worker_ms_per_case'].items()), file=sys.stderr)
+
+
+def run_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a case corpus through two engine versions and diff the diagnoses.")
+    parser.add_argument('input', nargs='?', default='-', help="CSV or JSONL corpus ('-' or omitted: stdin)")
+    parser.add_argument('--baseline', default='HEAD', help="Git revision, source directory or '.' (default: HEAD)")
+    parser.add_argument('--candidate', default='.', help="Git revision, source directory or '.' (default: working tree)")
+    parser.add_argument('--baseline-scoring', choices=['rules', 'bayes'], default='rules')
+    parser.add_argument('--candidate-scoring', choices=['rules', 'bayes'], default='rules')
+    parser.add_argument('-o', '--output', help="Write every changed case as JSONL ('-' for stdout)")
+    parser.add_argument('--summary', help="Write the summary as JSON")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from the file extension, else jsonl)")
+    parser.add_argument('--workers', type=int, help="Processes per version (default: half the CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--tolerance', type=float, default=0.0, help="Confidence difference (points) still counted as unchanged")
+    parser.add_argument('--quiet', action='store_true', help="No progress output")
+    args = parser.parse_args(argv)
+
+    from engine import _detect_format
+
+    with tempfile.TemporaryDirectory(prefix='replay-') as workdir:
+        try:
+            baseline = (resolve_version(args.baseline, workdir), args.baseline_scoring)
+            candidate = (resolve_version(args.candidate, workdir), args.candidate_scoring)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+        labels = [f"{spec} ({scoring})" for spec, scoring in ((args.baseline, args.baseline_scoring),
+                                                               (args.candidate, args.candidate_scoring))]
+
+        source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+        target = None
+        if args.output:
+            target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+
+        def write(record):
+            target.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        def progress(summary, seconds):
+            print(f"🚀 {summary.cases:,} cases, {summary.changed:,} changed ({summary.cases / seconds:,.0f} cases/s)",
+                  file=sys.stderr)
+
+        try:
+            summary, seconds = replay(_rows(source, _detect_format(args.input, args.format)), baseline, candidate,
+                                      workers=args.workers, chunk_size=max(args.chunk_size, 1), tolerance=args.tolerance,
+                                      on_change=write if target is not None else None,
+                                      progress=None if args.quiet else progress)
+        except Exception as e:
+            print(f"❌ Replay failed: {type(e).__name__}: {e}", file=sys.stderr)
+            return 2
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if target is not None and target is not sys.stdout:
+                target.close()
+
+    result = summary.as_dict(seconds)
+    result['baseline'], result['candidate'] = labels
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    _print_summary(result, *labels)
+    return 1 if summary.changed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(run_cli())
@@ -0,0 +1,195 @@
+"""
+Response shaping for the Flask frontend: field selection, compression and
+HTTP caching headers.
+
+    /diagnose?fields=diagnosis,confidence   only the listed top-level fields
+    Accept-Encoding: br, gzip               compressed bodies (brotli if the
+                                            optional `brotli` package is installed)
+    GET /diagnose?appliance=...&symptoms=...
+                                            manual-mode diagnoses are deterministic,
+                                            so they get a weak ETag and
+                                            Cache-Control; If-None-Match gives 304
+
+Usage:
+    python response_shaping.py          # bytes on the wire and time per response
+"""
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Smaller bodies are not worth compressing (headers and CPU cost more than the saving)
+MIN_COMPRESS_SIZE = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Observation keys accepted as query parameters on GET /diagnose
+OBSERVATION_PARAMS = ('noise_type', 'power', 'fuel')
+
+
+class FieldError(ValueError):
+    """A requested field does not exist in the response."""
+
+
+def parse_fields(value):
+    """Split a `fields` query parameter into a list of names (None if absent or empty)."""
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    return fields or None
+
+
+def select_fields(payload, fields):
+    """
+    Return `payload` with only the requested top-level fields. Error responses
+    are returned unchanged; 'success' is always kept.
+    """
+    if fields is None or 'error' in payload:
+        return payload
+    unknown = [name for name in fields if name not in payload]
+    if unknown:
+        raise FieldError(f"Unknown field(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(sorted(payload))}")
+    selected = {name: payload[name] for name in fields}
+    if 'success' in payload:
+        selected['success'] = payload['success']
+    return selected
+
+
+def manual_request(args):
+    """Build a manual-mode request body from GET query parameters."""
+    symptoms = []
+    for value in args.getlist('symptoms'):
+        symptoms += [name.strip() for name in value.split(',') if name.strip()]
+    observations = {key: args[key] for key in OBSERVATION_PARAMS if args.get(key)}
+    return {
+        'input_mode': 'manual',
+        'appliance': args.get('appliance'),
+        'symptoms': symptoms,
+        'observations': observations
+    }
+
+
+def choose_encoding(accept_encoding):
+    """Best supported content coding for an Accept-Encoding header, or None."""
+    offered = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if offered.get(encoding, offered.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def body_etag(body):
+    """Content hash used as a (weak) ETag: equal for every encoding of the same body."""
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def cache_seconds():
+    return int(os.getenv('DIAGNOSE_CACHE_SECONDS', '300'))
+
+
+def shape_response(response, request, cacheable=False):
+    """
+    Finish a response: ETag/Cache-Control (and 304) for cacheable GET
+    responses, then compression if the client accepts it.
+    """
+    if response.direct_passthrough or response.status_code != 200:
+        return response
+
+    if cacheable and request.method in ('GET', 'HEAD'):
+        response.set_etag(body_etag(response.get_data()), weak=True)
+        response.cache_control.public = True
+        response.cache_control.max_age = cache_seconds()
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    elif request.method == 'POST':
+        response.cache_control.no_store = True
+
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers:
+        return response
+    body = response.get_data()
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def benchmark(repeats=200):
+    """Bytes on the wire and time per response for field selections and encodings."""
+    import json
+    import time
+
+    os.environ.setdefault('RATE_LIMIT_RPS', '0')
+    from app_flask import app, warm_up
+    from load_test import MANUAL_CASES
+
+    warm_up(engines=1, llm=False)
+    client = app.test_client()
+    variants = [
+        ('full', ''),
+        ('fields=diagnosis,confidence', '&fields=diagnosis,confidence'),
+    ]
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+    print(f"{'Response':<30} {'Encoding':<9} {'Bytes':>7} {'Serialize':>10} {'Encode':>8} {'Request':>9}")
+    for label, query in variants:
+        for encoding in encodings:
+            sizes, serialize, encode, total = [], 0.0, 0.0, 0.0
+            for i in range(repeats):
+                case = MANUAL_CASES[i % len(MANUAL_CASES)]
+                params = (f"appliance={case['appliance']}&symptoms={','.join(case['symptoms'])}"
+                          + ''.join(f"&{k}={v}" for k, v in case.get('observations', {}).items()) + query)
+                start = time.perf_counter()
+                response = client.get(f"/diagnose?{params}", headers={'Accept-Encoding': encoding})
+                total += time.perf_counter() - start
+                body = response.get_data()
+                sizes.append(len(body))
+
+                # Stage costs measured separately on the same payload
+                applied = response.headers.get('Content-Encoding')
+                payload = json.loads(gzip.decompress(body) if applied == 'gzip'
+                                     else brotli.decompress(body) if applied == 'br' else body)
+                start = time.perf_counter()
+                raw = json.dumps(payload).encode()
+                serialize += time.perf_counter() - start
+                if encoding != 'identity' and len(raw) >= MIN_COMPRESS_SIZE:
+                    start = time.perf_counter()
+                    compress(raw, encoding)
+                    encode += time.perf_counter() - start
+            print(f"{label:<30} {encoding:<9} {sum(sizes) / repeats:7.0f} "
+                  f"{serialize / repeats * 1e6:8.1f}µs {encode / repeats * 1e6:6.1f}µs "
+                  f"{total / repeats * 1000:7.2f}ms")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark /diagnose response size and encoding cost")
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+    benchmark(args.repeats)
@@ -0,0 +1,257 @@
+"""
+Rete network with shared join prefixes for the diagnostic engines.
+
+experta compiles every rule into its own chain of join nodes, so each of
+the dozens of rules starting with Fact(appliance=...), Fact(symptom=...)
+joins the appliance fact with the same symptom fact again. SharedPrefixMatcher
+builds the beta network as a trie instead: each rule's patterns are joined
+in a canonical order (appliance, then symptoms, then observations) and
+rules with a common prefix share the join nodes for it. Every rule keeps
+its own conflict-set node, so activations, firing order and reports are
+exactly those of the stock matcher.
+
+DepthAgenda orders the agenda exactly like experta's DepthStrategy
+(salience, then the most recent facts) without its lru_cache, which hashed
+and compared whole activations, facts and contexts on every lookup to save
+a sort of three or four fact ids.
+
+The alpha side gets a hash index: a fact used to be tested against every
+"appliance == x" / "symptom == y" node in turn (one token copy each), now
+it goes straight to the nodes whose literal it carries. The matcher also
+resets each node once (the stock reset walks shared nodes once per
+parent) and keeps its conflict-set nodes in a list instead of a per-matcher
+cache that pooled engines evict from each other.
+
+Usage:
+    python rete_network.py [--sample 10]   # network size, agenda size and match time, stock vs shared
+"""
+import argparse
+import sys
+import time
+
+from experta import Fact
+from experta.matchers import ReteMatcher
+from experta.strategies import DepthStrategy
+from experta.fieldconstraint import L
+from experta.matchers.rete.abstract import Node
+from experta.matchers.rete.check import FeatureCheck, SameContextCheck
+from experta.matchers.rete.mixins import AnyChild, ChildNode, NoMemory
+from experta.matchers.rete.nodes import ConflictSetNode, FeatureTesterNode, OrdinaryMatchNode
+
+# Index the literal tests below an alpha node once it has this many
+MIN_INDEXED_CHILDREN = 4
+
+
+def _join_order(pattern):
+    """Sort key for the patterns of a rule: appliance, symptoms, observations."""
+    values = pattern.as_dict()
+    rank = 0 if 'appliance' in values else 1 if 'symptom' in values else 2
+    return rank, sorted((key, repr(value)) for key, value in values.items() if key != 'case')
+
+
+def _is_plain(rule):
+    """A rule of two or more plain patterns (no NOT/TEST/OR), which can share join nodes."""
+    return len(rule) > 1 and all(type(element) is Fact for element in rule)
+
+
+def network_nodes(root):
+    """Every node reachable from `root`, each once, parents before children."""
+    nodes, seen, pending = [], set(), [root]
+    while pending:
+        node = pending.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        nodes.append(node)
+        pending.extend(child.node for child in reversed(node.children))
+    return nodes
+
+
+def _literal_test(node):
+    """(key, value) if `node` tests a fact field for equality with a literal, else None."""
+    check = getattr(node, 'matcher', None)
+    if (isinstance(node, FeatureTesterNode) and isinstance(check, FeatureCheck)
+            and isinstance(check.how, L) and check.how.__bind__ is None
+            and isinstance(check.what, str) and '__' not in check.what):
+        return check.what, check.how.value
+    return None
+
+
+class AlphaIndexNode(AnyChild, NoMemory, Node):
+    """
+    Sends a fact only to the literal-test children whose (key, value) it has,
+    instead of letting each of them copy the token and test it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.index = {}
+
+    def add_child(self, node, callback):
+        super().add_child(node, callback)
+        self.index.setdefault(_literal_test(node), []).append(self.children[-1])
+
+    def activate(self, token):
+        fact = next(iter(token.data))
+        try:
+            matched = [child for key, value in fact.items() for child in self.index.get((key, value), ())]
+        except TypeError:  # Unhashable value: let every child test it
+            matched = self.children
+        for child in matched:
+            child.callback(token)
+
+
+def index_alpha_network(root):
+    """Put an AlphaIndexNode in front of every large group of literal-test siblings."""
+    for node in network_nodes(root):
+        if not isinstance(node, FeatureTesterNode) and node is not root:
+            continue
+        literal = [child for child in node.children if _literal_test(child.node) is not None]
+        if len(literal) < MIN_INDEXED_CHILDREN:
+            continue
+        index_node = AlphaIndexNode()
+        for child in literal:
+            index_node.add_child(child.node, child.callback)
+        node.children = [child for child in node.children if child not in literal]
+        node.children.append(ChildNode(index_node, index_node.activate))
+
+
+class SharedPrefixMatcher(ReteMatcher):
+    """ReteMatcher whose rules share the join nodes of their common pattern prefixes."""
+
+    def build_network(self):
+        super().build_network()
+        index_alpha_network(self.root_node)
+        self._nodes = network_nodes(self.root_node)
+        self._conflict_set_nodes = tuple(node for node in self._nodes if isinstance(node, ConflictSetNode))
+
+    @staticmethod
+    def build_beta_part(ruleset, alpha_terminals):
+        joins = {}
+        for rule in ruleset:
+            if not _is_plain(rule):
+                ReteMatcher.build_beta_part([rule], alpha_terminals)
+                continue
+            patterns = sorted(rule, key=_join_order)
+            node = alpha_terminals[patterns[0]]
+            for pattern in patterns[1:]:
+                right = alpha_terminals[pattern]
+                key = (id(node), id(right))
+                if key not in joins:
+                    join = OrdinaryMatchNode(SameContextCheck())
+                    node.add_child(join, join.activate_left)
+                    right.add_child(join, join.activate_right)
+                    joins[key] = join
+                node = joins[key]
+            conflict_set_node = ConflictSetNode(rule)
+            node.add_child(conflict_set_node, conflict_set_node.activate)
+
+    def _get_conflict_set_nodes(self):
+        return self._conflict_set_nodes
+
+    def reset(self):
+        for node in self._nodes:
+            node._reset()
+
+
+class DepthAgenda(DepthStrategy):
+    """DepthStrategy with an uncached key; same order, cheaper per activation."""
+
+    def get_key(self, activation):
+        return (activation.rule.salience,
+                sorted((fact['__factid__'] for fact in activation.facts), reverse=True))
+
+
+def network_stats(engine):
+    """Node counts by type of an engine's compiled network."""
+    counts = {}
+    for node in network_nodes(engine.matcher.root_node):
+        counts[type(node).__name__] = counts.get(type(node).__name__, 0) + 1
+    return counts
+
+
+# =====================================================================
+# BENCHMARK
+# =====================================================================
+
+def _instrumented_run(engine, cases):
+    """Run cases once, returning (reports, peak agenda size per case, seconds spent in the matcher)."""
+    matcher_time = [0.0]
+    peak_agenda = [0]
+    changes, update_agenda = engine.matcher.changes, engine.strategy.update_agenda
+
+    def timed_changes(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return changes(*args, **kwargs)
+        finally:
+            matcher_time[0] += time.perf_counter() - started
+
+    def measured_update_agenda(agenda, added, removed):
+        update_agenda(agenda, added, removed)
+        peak_agenda[0] = max(peak_agenda[0], len(agenda.activations))
+
+    engine.matcher.changes = timed_changes
+    engine.strategy.update_agenda = measured_update_agenda
+    reports, agenda_sizes = [], []
+    try:
+        for case in cases:
+            peak_agenda[0] = 0
+            reports.append(engine.run_cases([case])[0])
+            agenda_sizes.append(peak_agenda[0])
+    finally:
+        del engine.matcher.changes, engine.strategy.update_agenda
+    return reports, agenda_sizes, matcher_time[0]
+
+
+def benchmark(sample=10, repeats=3):
+    """Compare the stock and shared-prefix networks on every `sample`-th manual-mode case."""
+    from engine import knowledge_base_engine_class
+    from rule_export import _manual_cases
+    from symbols import CaseFacts
+
+    # Every appliance in one network, so the table shows the whole knowledge base
+    KnowledgeBaseEngine = knowledge_base_engine_class()
+
+    class StockEngine(KnowledgeBaseEngine):
+        __matcher__ = ReteMatcher
+        __strategy__ = DepthStrategy
+
+    engines = {'stock': StockEngine(), 'shared': KnowledgeBaseEngine()}
+    cases = [CaseFacts(appliance, symptoms, observations)
+             for i, (appliance, symptoms, observations) in enumerate(_manual_cases(engines['shared']))
+             if i % sample == 0]
+
+    results = {label: dict(zip(('reports', 'agenda', 'matcher'), _instrumented_run(engine, cases)))
+               for label, engine in engines.items()}
+
+    # Uninstrumented run time, best of `repeats`, alternating so both see the same machine load
+    for label in engines:
+        results[label]['run'] = float('inf')
+    for _ in range(repeats):
+        for label, engine in engines.items():
+            started = time.perf_counter()
+            for case in cases:
+                engine.run_cases([case])
+            results[label]['run'] = min(results[label]['run'], time.perf_counter() - started)
+
+    print(f"📊 {len(cases)} manual-mode cases (every {sample}th), best of {repeats}")
+    print(f"{'Network':<8} {'Join nodes':>10} {'All nodes':>10} {'Agenda/case':>12} "
+          f"{'Match/case':>11} {'Run/case':>9}")
+    for label, engine in engines.items():
+        result, nodes = results[label], network_stats(engine)
+        print(f"{label:<8} {nodes.get('OrdinaryMatchNode', 0):10d} {sum(nodes.values()):10d} "
+              f"{sum(result['agenda']) / len(cases):12.1f} {result['matcher'] / len(cases) * 1000:9.2f}ms "
+              f"{result['run'] / len(cases) * 1000:7.2f}ms")
+
+    identical = results['stock']['reports'] == results['shared']['reports']
+    print("✅ Reports identical" if identical else "❌ Reports differ")
+    return identical
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the shared-prefix Rete network")
+    parser.add_argument('--sample', type=int, default=10, help="Use every n-th manual-mode case")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(args.sample, args.repeats) else 1)
@@ -0,0 +1,440 @@
+"""
+MessagePack RPC interface for high-volume integrations.
+
+A plain TCP server speaking length-prefixed MessagePack frames over
+persistent connections, for callers (e.g. the ticketing system) that send
+thousands of diagnoses a minute and do not need HTTP and JSON. It runs the
+same code as the Flask app: the same engine pool, lookup table, sessions-free
+diagnosis path and admission control (the per-client RATE_LIMIT_RPS bucket,
+keyed on the peer address, and the LLM concurrency limit).
+
+Frames: a 4-byte big-endian length, then a MessagePack map.
+
+    request   {"id": 1, "method": "Diagnose", "params": {...}}
+    response  {"id": 1, "result": {...}}
+              {"id": 1, "error": {"code": "invalid_argument", "message": "...", "retry_after": 1}}
+
+Methods (params as for the matching HTTP route):
+
+    Diagnose       one case, manual or natural mode, as the /diagnose JSON body;
+                   optional "fields": [...] as ?fields=
+    DiagnoseBatch  {"cases": [...], "fields": [...]} as /diagnose/batch
+    ExtractFacts   {"text": "...", "appliance_hint": "..."} -> {appliance, symptoms, observations}
+    Schema         field names and types of every method's result, derived
+                   from the engine's report structure at startup
+
+Requests on one connection are answered in order; open several connections
+for concurrency (one thread each). Needs `pip install msgpack`.
+
+Usage:
+    python rpc_server.py serve [--host 127.0.0.1] [--port 9100]
+    python rpc_server.py benchmark [--calls 2000]    # per-call overhead vs the JSON route
+"""
+import argparse
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+import metrics
+
+FRAME = struct.Struct('>I')
+MAX_FRAME = 16 * 1024 * 1024
+
+# HTTP status of a handler result -> RPC error code
+ERROR_CODES = {400: 'invalid_argument', 404: 'not_found', 429: 'unavailable', 500: 'internal'}
+
+
+class RpcError(Exception):
+    """Error returned by the server."""
+
+    def __init__(self, code, message, retry_after=None):
+        super().__init__(message)
+        self.code = code
+        self.retry_after = retry_after
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _read_body(sock):
+    header = _recv_exactly(sock, FRAME.size)
+    if header is None:
+        return None
+    (length,) = FRAME.unpack(header)
+    if length > MAX_FRAME:
+        raise RpcError('invalid_argument', f"Frame of {length} bytes exceeds {MAX_FRAME}")
+    return _recv_exactly(sock, length)
+
+
+def read_frame(sock):
+    """Read one frame; None when the peer closed the connection."""
+    body = _read_body(sock)
+    return None if body is None else msgpack.unpackb(body, raw=False)
+
+
+def write_frame(sock, message):
+    """Send one frame; returns its size in bytes."""
+    body = msgpack.packb(message, use_bin_type=True)
+    sock.sendall(FRAME.pack(len(body)) + body)
+    return FRAME.size + len(body)
+
+
+# =====================================================================
+# METHODS
+# =====================================================================
+
+def _fields(params):
+    fields = params.get('fields')
+    if isinstance(fields, str):
+        from response_shaping import parse_fields
+        return parse_fields(fields)
+    return fields or None
+
+
+def _checked(response, status):
+    if status != 200:
+        raise RpcError(ERROR_CODES.get(status, 'internal'), response.get('error', 'Request failed'))
+    return response
+
+
+def diagnose(params):
+    import app_flask
+    from response_shaping import select_fields
+    from admission import Overloaded
+    from explanation_generator import explanation_uses_llm
+
+    _, llm_limiter = app_flask.get_limiters()
+    uses_llm = params.get('input_mode', 'manual') == 'natural' or explanation_uses_llm()
+    granted = False
+    try:
+        if uses_llm:
+            granted = llm_limiter.acquire()
+    except Overloaded as e:
+        raise RpcError('unavailable', str(e), retry_after=e.retry_after)
+    try:
+        response, status, _ = app_flask.handle_diagnosis(params, use_llm=granted or not uses_llm)
+    finally:
+        if granted:
+            llm_limiter.release()
+    return select_fields(_checked(response, status), _fields(params))
+
+
+def diagnose_batch(params):
+    import app_flask
+    return _checked(*app_flask.handle_batch(params, _fields(params)))
+
+
+def extract_facts(params):
+    import app_flask
+    from admission import Overloaded
+    from llm_extractor import extract_facts_from_text, extract_facts_by_keywords
+    from symbols import CaseFacts, resolve_value, SYMPTOMS
+
+    text = params.get('text', '')
+    if not text.strip():
+        raise RpcError('invalid_argument', 'Please describe your problem')
+    hint = params.get('appliance_hint')
+    hint = None if hint in (None, 'auto') else hint
+
+    # Same LLM slot as diagnose(): keywords only when no slot frees up in time
+    _, llm_limiter = app_flask.get_limiters()
+    try:
+        granted = llm_limiter.acquire()
+    except Overloaded as e:
+        raise RpcError('unavailable', str(e), retry_after=e.retry_after)
+    try:
+        if granted:
+            facts = extract_facts_from_text(text, hint)
+        else:
+            metrics.record('extraction', 'degraded')
+            facts = extract_facts_by_keywords(text, hint)
+    finally:
+        if granted:
+            llm_limiter.release()
+    case = CaseFacts.from_facts(facts or [])
+    return {
+        'appliance': resolve_value('appliance', case.appliance) if case.appliance is not None else None,
+        'symptoms': [SYMPTOMS.name(symptom) for symptom in case.symptoms],
+        'observations': {key: resolve_value(key, value) for key, value in case.observations.items()}
+    }
+
+
+def _describe(value):
+    """Type outline of a value: {field: outline}, [outline] or a type name."""
+    if isinstance(value, dict):
+        return {key: _describe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_describe(value[0])] if value else []
+    return {bool: 'bool', int: 'number', float: 'number', str: 'string', type(None): 'null'}.get(type(value), 'any')
+
+
+_schema = None
+_schema_lock = threading.Lock()
+
+
+def schema(params=None):
+    """Result outline of every method, taken from real results so it follows the engine's reports."""
+    global _schema
+    with _schema_lock:
+        if _schema is None:
+            sample = {'appliance': 'Washing Machine', 'symptoms': ['Wont Drain', 'Loud Noise'],
+                      'observations': {'noise_type': 'Grinding'}}
+            diagnosis = diagnose({'input_mode': 'manual', **sample})
+            diagnosis['friendly_explanation'] = 'string'  # None when there is nothing to explain
+            diagnosis['extracted_facts'] = ['string']      # None in manual mode
+            _schema = {
+                'Diagnose': _describe(diagnosis),
+                'DiagnoseBatch': _describe(diagnose_batch({'cases': [sample]})),
+                'ExtractFacts': {'appliance': 'string', 'symptoms': ['string'], 'observations': {'key': 'string'}}
+            }
+    return _schema
+
+
+METHODS = {
+    'Diagnose': diagnose,
+    'DiagnoseBatch': diagnose_batch,
+    'ExtractFacts': extract_facts,
+    'Schema': schema,
+}
+
+
+def _check_rate(client):
+    import app_flask
+    from admission import Overloaded
+
+    rate_limiter, _ = app_flask.get_limiters()
+    try:
+        rate_limiter.check(client)
+    except Overloaded as e:
+        raise RpcError('unavailable', str(e), retry_after=e.retry_after)
+
+
+def dispatch(message, client=None):
+    """
+    Run one request message and return the response message. With a
+    `client` (its address) the call counts against that client's
+    RATE_LIMIT_RPS bucket, shared with the HTTP routes of this process.
+    """
+    request_id = message.get('id') if isinstance(message, dict) else None
+    try:
+        if not isinstance(message, dict) or message.get('method') not in METHODS:
+            raise RpcError('not_found', f"Unknown method; available: {', '.join(METHODS)}")
+        if client is not None:
+            _check_rate(client)
+        params = message.get('params') or {}
+        if not isinstance(params, dict):
+            raise RpcError('invalid_argument', "'params' must be a map")
+        metrics.start_trace()
+        result = METHODS[message['method']](params)
+        metrics.increment(f"rpc.{message['method']}")
+        return {'id': request_id, 'result': result}
+    except RpcError as e:
+        error = {'code': e.code, 'message': str(e)}
+        if e.retry_after is not None:
+            error['retry_after'] = e.retry_after
+        return {'id': request_id, 'error': error}
+    except Exception as e:
+        from response_shaping import FieldError
+        code = 'invalid_argument' if isinstance(e, FieldError) else 'internal'
+        return {'id': request_id, 'error': {'code': code, 'message': str(e)}}
+
+
+# =====================================================================
+# SERVER AND CLIENT
+# =====================================================================
+
+class RpcHandler(socketserver.BaseRequestHandler):
+    """One persistent connection: answer frames until the client disconnects."""
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        metrics.increment('rpc.connections')
+        while True:
+            try:
+                message = read_frame(self.request)
+            except RpcError as e:
+                write_frame(self.request, {'id': None, 'error': {'code': e.code, 'message': str(e)}})
+                return
+            except (ConnectionError, ValueError, msgpack.ExtraData):
+                return
+            if message is None:
+                return
+            write_frame(self.request, dispatch(message, client=self.client_address[0]))
+
+
+class RpcServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def create_server(host='127.0.0.1', port=9100):
+    """Warm up the shared app state and bind the RPC server (call serve_forever() to run it)."""
+    if msgpack is None:
+        raise RuntimeError("The RPC server needs MessagePack: pip install msgpack")
+    import app_flask
+    app_flask.warm_up()
+    return RpcServer((host, port), RpcHandler)
+
+
+class RpcClient:
+    """Minimal blocking client over one persistent connection."""
+
+    def __init__(self, host='127.0.0.1', port=9100, timeout=30):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._next_id = 0
+        self.last_call_bytes = 0
+
+    def call(self, method, **params):
+        self._next_id += 1
+        sent = write_frame(self.sock, {'id': self._next_id, 'method': method, 'params': params})
+        body = _read_body(self.sock)
+        if body is None:
+            raise ConnectionError("RPC server closed the connection")
+        self.last_call_bytes = sent + FRAME.size + len(body)
+        response = msgpack.unpackb(body, raw=False)
+        if 'error' in response:
+            error = response['error']
+            raise RpcError(error['code'], error['message'], error.get('retry_after'))
+        return response['result']
+
+    def close(self):
+        self.sock.close()
+
+
+# =====================================================================
+# BENCHMARK
+# =====================================================================
+
+def benchmark(calls=2000, rounds=5):
+    """
+    Per-call latency and bytes of Diagnose/DiagnoseBatch over RPC vs the JSON
+    routes. The calls are split into rounds that take turns across the
+    transports, and each row reports its best round, so a noisy stretch on
+    the machine does not land on one transport only.
+    """
+    import http.client
+    import json
+    import logging
+    import statistics
+
+    from werkzeug.serving import make_server, WSGIRequestHandler
+
+    from load_test import MANUAL_CASES
+
+    os.environ.setdefault('RATE_LIMIT_RPS', '0')
+    rpc = create_server(port=0)
+    threading.Thread(target=rpc.serve_forever, daemon=True).start()
+
+    import app_flask
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'  # keep-alive, like gunicorn
+    http_server = make_server('127.0.0.1', 0, app_flask.app, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    client = RpcClient(port=rpc.server_address[1])
+    connection = http.client.HTTPConnection('127.0.0.1', http_server.server_port)
+    headers = {'Content-Type': 'application/json'}
+    batch = {'cases': MANUAL_CASES * 5}
+
+    def over_http(path, body):
+        payload = json.dumps(body).encode()
+        connection.request('POST', path, body=payload, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        json.loads(data)
+        return len(payload) + len(data)
+
+    def over_rpc(method, body):
+        client.call(method, **body)
+        return client.last_call_bytes
+
+    def in_process(method, body):
+        METHODS[method](dict(body))
+        return 0
+
+    def case_body(i):
+        return {'input_mode': 'manual', **MANUAL_CASES[i % len(MANUAL_CASES)]}
+
+    def batch_body(i):
+        return batch
+
+    runs = [
+        ('Diagnose in-process', in_process, 'Diagnose', case_body, calls),
+        ('Diagnose JSON/HTTP', lambda m, b: over_http('/diagnose', b), 'Diagnose', case_body, calls),
+        ('Diagnose MessagePack RPC', over_rpc, 'Diagnose', case_body, calls),
+        ('Batch x20 in-process', in_process, 'DiagnoseBatch', batch_body, max(1, calls // 20)),
+        ('Batch x20 JSON/HTTP', lambda m, b: over_http('/diagnose/batch', b), 'DiagnoseBatch', batch_body,
+         max(1, calls // 20)),
+        ('Batch x20 MessagePack RPC', over_rpc, 'DiagnoseBatch', batch_body, max(1, calls // 20)),
+    ]
+    for label, fn, method, make_body, count in runs:
+        for i in range(min(50, count)):  # warm-up
+            fn(method, make_body(i))
+
+    # label -> (mean, sorted timings, sizes) of its fastest round
+    best = {}
+    for _ in range(rounds):
+        for label, fn, method, make_body, count in runs:
+            timings, sizes = [], []
+            for i in range(max(1, count // rounds)):
+                start = time.perf_counter()
+                sizes.append(fn(method, make_body(i)))
+                timings.append(time.perf_counter() - start)
+            mean = statistics.mean(timings)
+            if label not in best or mean < best[label][0]:
+                best[label] = (mean, sorted(timings), sizes)
+
+    print(f"Best of {rounds} interleaved rounds")
+    print(f"{'Call':<28} {'mean':>9} {'p50':>9} {'p99':>9} {'bytes':>7} {'overhead':>9}")
+    baseline = None
+    for label, fn, method, make_body, count in runs:
+        mean, timings, sizes = best[label]
+        if fn is in_process:
+            baseline = mean
+        size = f"{statistics.mean(sizes):7.0f}" if any(sizes) else f"{'-':>7}"
+        print(f"{label:<28} {mean * 1000:7.3f}ms {timings[len(timings) // 2] * 1000:7.3f}ms "
+              f"{timings[int(len(timings) * 0.99)] * 1000:7.3f}ms {size} {(mean - baseline) * 1e6:7.0f}µs")
+
+    client.close()
+    connection.close()
+    rpc.shutdown()
+    http_server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MessagePack RPC server for the diagnostic engine")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Run the RPC server")
+    serve_parser.add_argument('--host', default=os.getenv('RPC_HOST', '127.0.0.1'))
+    serve_parser.add_argument('--port', type=int, default=int(os.getenv('RPC_PORT', '9100')))
+    bench_parser = subparsers.add_parser('benchmark', help="Compare per-call overhead with the JSON route")
+    bench_parser.add_argument('--calls', type=int, default=2000)
+    bench_parser.add_argument('--rounds', type=int, default=5, help="Interleaved rounds; the best one is reported")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = create_server(args.host, args.port)
+        print(f"🚀 MessagePack RPC listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        benchmark(args.calls, args.rounds)
@@ -0,0 +1,248 @@
+"""
+Rule table export for client-side manual-mode diagnosis.
+
+Manual-mode diagnosis only adds up fixed scores, so the compiled rules can
+be flattened into a small JSON artifact and evaluated in the browser by
+static/js/diagnose.js, with no server round trip. The artifact is built
+from the live DiagnosticEngine at startup (each rule's patterns from the
+compiled network, its scores and explanations by calling the rule action
+against a recorder), so it always matches the server's rules; the page
+references it by content hash (/rules?v=<hash>).
+
+Python and JS must stay in step on the decision logic (confidence bands,
+rounding, firing order); `check` runs the JS evaluator under Node over
+the whole manual-mode input space and compares it with the engine.
+
+Usage:
+    python rule_export.py [--output rules.json]   # write the artifact
+    python rule_export.py check                   # JS vs engine parity (needs node)
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from experta import Fact
+
+from engine import DiagnosticEngine, knowledge_base_vocabulary
+from explanation_templates import OPENINGS, NO_OPENING, plain_sentence
+from symbols import APPLIANCES, SYMPTOMS, OBSERVATIONS, OBSERVATION_KEYS, SYMPTOM_NAMES, CaseFacts
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EVALUATOR_PATH = os.path.join(BASE_DIR, 'static', 'js', 'diagnose.js')
+
+# Diagnoses outside the recommendation tables: probe scores on either side of the cut-off
+UNKNOWN_DIAGNOSIS = '__unknown__'
+
+
+class _Recorder:
+    """Stands in for the engine when calling a rule action; records its effects."""
+
+    def __init__(self):
+        self.scores = []
+        self.explanations = []
+
+    def add_score(self, case, diagnosis, points):
+        self.scores.append([diagnosis, points])
+
+    def explain(self, case, message):
+        self.explanations.append(message)
+
+
+def _rule_patterns(rule):
+    """Return (appliance, symptoms, observations) names for a rule, or None if it is not a plain match."""
+    appliance, symptoms, observations = None, [], {}
+    for pattern in rule:
+        if not isinstance(pattern, Fact):
+            return None  # NOT(...) and other conditional elements
+        for key, value in pattern.as_dict().items():
+            if key == 'case' or not isinstance(value, int):
+                continue
+            if key == 'appliance':
+                appliance = APPLIANCES.name(value)
+            elif key == 'symptom':
+                symptoms.append(SYMPTOMS.name(value))
+            elif key in OBSERVATION_KEYS:
+                observations[key] = OBSERVATIONS.name(value)
+    if appliance is None:
+        return None
+    return appliance, symptoms, observations
+
+
+def export_rules(engine=None, explanation_mode='template'):
+    """
+    Flatten the engine's rules into a JSON-serializable artifact:
+
+        rules            per appliance: [symptoms, observations, scores, message ids, salience]
+        messages         every explanation message, with its template sentence
+        recommendations  {diagnosis: [text, action]}, plus the score-dependent default
+        unmatched        report when no rule fires
+        *_order          canonical declaration order of symptoms and observation keys
+        openings         confidence bands for the explanation's opening line
+
+    Rules with negated patterns (only "no symptoms reported") are left out;
+    manual mode always has at least one symptom.
+    """
+    engine = engine or DiagnosticEngine()
+    messages = []
+    message_ids = {}
+    rules = {}
+    diagnoses = set()
+
+    for rule in engine.get_rules():
+        patterns = _rule_patterns(rule)
+        if patterns is None:
+            continue
+        appliance, symptoms, observations = patterns
+        recorder = _Recorder()
+        rule._wrapped(recorder, 0)
+        ids = []
+        for message in recorder.explanations:
+            if message not in message_ids:
+                message_ids[message] = len(messages)
+                messages.append([message, plain_sentence(message)])
+            ids.append(message_ids[message])
+        diagnoses.update(diagnosis for diagnosis, _ in recorder.scores)
+        rules.setdefault(appliance, []).append([symptoms, observations, recorder.scores, ids, rule.salience])
+
+    recommendations = {}
+    for diagnosis in sorted(diagnoses):
+        high = engine.get_recommendation(diagnosis, 100)
+        if high == engine.get_recommendation(diagnosis, 0):
+            recommendations[diagnosis] = [high['text'], high['action']]
+    default_high = engine.get_recommendation(UNKNOWN_DIAGNOSIS, 100)
+    default_low = engine.get_recommendation(UNKNOWN_DIAGNOSIS, 0)
+
+    # Report for a case no rule matches: a symptom none of the appliance's rules use
+    vocabulary = knowledge_base_vocabulary(engine)
+    appliance = next(iter(vocabulary))
+    unused = next(name for name in SYMPTOM_NAMES if name not in vocabulary[appliance]['symptoms'])
+    unmatched = engine.run_cases([CaseFacts(appliance, [unused])])[0]
+    for message in unmatched['explanations']:
+        if message not in message_ids:
+            message_ids[message] = len(messages)
+            messages.append([message, plain_sentence(message)])
+
+    return {
+        'format': 1,
+        'explanation_mode': explanation_mode,
+        'rules': {appliance: rules[appliance] for appliance in sorted(rules)},
+        'messages': messages,
+        'recommendations': recommendations,
+        'default_recommendation': {
+            'high': [default_high['text'], default_high['action']],
+            'low': [default_low['text'], default_low['action']]
+        },
+        'unmatched': {'best_fit': unmatched['best_fit'], 'explanations': unmatched['explanations']},
+        'symptom_order': list(SYMPTOM_NAMES),
+        'observation_order': list(OBSERVATION_KEYS),
+        'openings': OPENINGS,
+        'no_opening': list(NO_OPENING)
+    }
+
+
+def artifact_bytes(artifact):
+    return json.dumps(artifact, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+# =====================================================================
+# PARITY CHECK
+# =====================================================================
+
+NODE_RUNNER = """
+const fs = require('fs');
+const LocalDiagnosis = require(process.argv[2]);
+const artifact = JSON.parse(fs.readFileSync(process.argv[3], 'utf8'));
+const cases = JSON.parse(fs.readFileSync(process.argv[4], 'utf8'));
+const results = cases.map(([appliance, symptoms, observations]) => {
+    const report = LocalDiagnosis.evaluate(artifact, appliance, symptoms, observations);
+    return [report, LocalDiagnosis.explain(artifact, report)];
+});
+fs.writeFileSync(process.argv[5], JSON.stringify(results));
+"""
+
+
+def _manual_cases(engine):
+    """
+    Every manual-mode case: each symptom subset x observation values, with the
+    symptoms in vocabulary order and reversed (both sides must put them in
+    canonical order, since declaration order decides score ties).
+    """
+    from lookup_table import _layout, _enumerate
+    layout, _ = _layout(knowledge_base_vocabulary(engine))
+    for appliance, table in layout.items():
+        for _, case in _enumerate(appliance, table):
+            symptoms = [SYMPTOMS.name(s) for s in case.symptoms]
+            observations = {key: OBSERVATIONS.name(value) for key, value in case.observations.items()}
+            if symptoms:
+                yield [appliance, symptoms, observations]
+            if len(symptoms) > 1:
+                yield [appliance, symptoms[::-1], observations]
+
+
+def check(node='node'):
+    """Compare the JS evaluator with DiagnosticEngine on every manual-mode case; return mismatches."""
+    from explanation_templates import render_explanation
+
+    if shutil.which(node) is None:
+        print(f"⚠️ '{node}' not found; install Node.js to run the parity check")
+        return None
+
+    engine = DiagnosticEngine()
+    artifact = export_rules(engine)
+    cases = list(_manual_cases(engine))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, name) for name in ('runner.js', 'rules.json', 'cases.json', 'out.json')}
+        with open(paths['runner.js'], 'w') as f:
+            f.write(NODE_RUNNER)
+        with open(paths['rules.json'], 'wb') as f:
+            f.write(artifact_bytes(artifact))
+        with open(paths['cases.json'], 'w') as f:
+            json.dump(cases, f)
+        started = time.time()
+        subprocess.run([node, paths['runner.js'], EVALUATOR_PATH, paths['rules.json'],
+                        paths['cases.json'], paths['out.json']], check=True)
+        js_seconds = time.time() - started
+        with open(paths['out.json']) as f:
+            results = json.load(f)
+
+    mismatches = []
+    for (appliance, symptoms, observations), (js_report, js_friendly) in zip(cases, results):
+        report = engine.run_cases([CaseFacts(appliance, symptoms, observations)])[0]
+        expected = {key: report[key] for key in ('best_fit', 'alternatives', 'explanations')}
+        friendly = render_explanation(report['best_fit']['diagnosis'], report['best_fit']['score'],
+                                      report['explanations']) if report['explanations'] else None
+        actual = {key: js_report[key] for key in expected}
+        if actual != expected or js_friendly != friendly:
+            mismatches.append({'case': [appliance, symptoms, observations],
+                               'engine': expected, 'js': actual,
+                               'friendly': [friendly, js_friendly]})
+
+    print(f"📊 {len(cases)} cases, JS evaluator {js_seconds * 1000:.0f} ms total (including Node start-up)")
+    if mismatches:
+        print(f"❌ {len(mismatches)} cases differ, e.g.:")
+        print(json.dumps(mismatches[0], indent=2, ensure_ascii=False))
+    else:
+        print("✅ JS evaluator matches DiagnosticEngine on every case")
+    return mismatches
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the rule tables for client-side diagnosis")
+    parser.add_argument('command', nargs='?', choices=['export', 'check'], default='export')
+    parser.add_argument('--output', default='rules.json')
+    parser.add_argument('--node', default='node', help="Node.js binary for the parity check")
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        sys.exit(0 if check(args.node) == [] else 1)
+
+    body = artifact_bytes(export_rules())
+    with open(args.output, 'wb') as f:
+        f.write(body)
+    print(f"✅ Wrote {args.output}: {len(body)} bytes")
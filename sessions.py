@@ -0,0 +1,121 @@
+"""
+Server-side sessions for the Flask frontend.
+
+Each browser gets a random session id in a cookie. The session keeps the
+last natural-language request (text, appliance hint, extracted facts and
+the response), so a re-submitted or lightly edited description is answered
+without re-running the LLM extraction.
+
+Stores:
+    MemorySessionStore  in-process dict with TTL eviction (default; per worker)
+    RedisSessionStore   any Redis-compatible client (redis-py, fakeredis, ...),
+                        shared by all workers: SESSION_STORE=redis, REDIS_URL=...
+"""
+import difflib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+COOKIE_NAME = 'afd_session'
+
+# Words whose addition or removal does not change what was reported
+FILLER_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'so', 'it', 'its', 'is', 'was', 'are', 'be',
+    'my', 'our', 'this', 'that', 'of', 'to', 'in', 'on', 'at', 'for', 'with',
+    'very', 'really', 'quite', 'just', 'also', 'too', 'lot', 'bit', 'little',
+    'please', 'help', 'hi', 'hello', 'thanks', 'thank', 'you', 'i', 'me', 'we',
+    'now', 'again', 'still', 'some', 'kind', 'sort', 'seems', 'think',
+}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def text_changed(previous, current):
+    """
+    True if `current` says something different from `previous`: words were
+    added, removed or replaced beyond case, punctuation and filler words.
+    """
+    before, after = _words(previous), _words(current)
+    if before == after:
+        return False
+    matcher = difflib.SequenceMatcher(a=before, b=after, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        changed = set(before[i1:i2]) ^ set(after[j1:j2])
+        if changed - FILLER_WORDS:
+            return True
+    return False
+
+
+def new_session_id():
+    return secrets.token_urlsafe(24)
+
+
+class MemorySessionStore:
+    """Sessions in a dict, expired `ttl` seconds after their last use."""
+
+    def __init__(self, ttl=1800, max_sessions=10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # id -> (expires, data), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None or entry[0] < now:
+                return None
+            self._sessions[session_id] = (now + self.ttl, entry[1])
+            return entry[1]
+
+    def set(self, session_id, data):
+        now = time.monotonic()
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._sessions[session_id] = (now + self.ttl, data)
+            # Evict expired sessions from the old end, then enforce the size cap
+            while self._sessions:
+                oldest_id, (expires, _) = next(iter(self._sessions.items()))
+                if expires >= now and len(self._sessions) <= self.max_sessions:
+                    break
+                del self._sessions[oldest_id]
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class RedisSessionStore:
+    """Sessions as JSON strings in Redis, expired by Redis after `ttl` seconds."""
+
+    def __init__(self, client, ttl=1800, prefix='afd:session:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, session_id):
+        value = self.client.get(self.prefix + session_id)
+        if value is None:
+            return None
+        self.client.expire(self.prefix + session_id, self.ttl)
+        return json.loads(value)
+
+    def set(self, session_id, data):
+        self.client.set(self.prefix + session_id, json.dumps(data), ex=self.ttl)
+
+
+def create_store():
+    """Build the store selected by SESSION_STORE (memory or redis) and SESSION_TTL."""
+    ttl = int(os.getenv('SESSION_TTL', '1800'))
+    if os.getenv('SESSION_STORE', 'memory') == 'redis':
+        import redis  # Optional dependency, only needed for shared sessions
+        client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        return RedisSessionStore(client, ttl)
+    return MemorySessionStore(ttl)
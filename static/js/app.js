@@ -0,0 +1,282 @@
+let currentMode = 'natural';
+
+// Symptoms offered per appliance (served by /catalogue, cached by the browser)
+const catalogue = fetch(document.body.dataset.catalogue).then(response => response.json());
+
+// Rule tables for instant manual-mode diagnosis (static/js/diagnose.js); the server answers without them
+const rules = document.body.dataset.rules
+    ? fetch(document.body.dataset.rules).then(response => response.json()).catch(() => null)
+    : Promise.resolve(null);
+
+// Answers to follow-up questions in manual mode; reset when the appliance changes
+let followUp = { symptoms: [], observations: {}, ruledOut: [] };
+
+function switchMode(mode) {
+    currentMode = mode;
+    
+    // Update button states
+    document.querySelectorAll('.mode-btn').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+
+    // Toggle input sections
+    if (mode === 'natural') {
+        document.getElementById('natural-input').classList.remove('hidden');
+        document.getElementById('manual-input').classList.add('hidden');
+    } else {
+        document.getElementById('natural-input').classList.add('hidden');
+        document.getElementById('manual-input').classList.remove('hidden');
+    }
+
+    // Clear results
+    document.getElementById('results').innerHTML = '';
+    document.getElementById('results').classList.add('hidden');
+}
+
+async function updateSymptoms() {
+    const appliance = document.getElementById('appliance-select').value;
+    const symptomsSection = document.getElementById('symptoms-section');
+    const symptomsList = document.getElementById('symptoms-list');
+
+    if (!appliance) {
+        symptomsSection.classList.add('hidden');
+        return;
+    }
+
+    followUp = { symptoms: [], observations: {}, ruledOut: [] };
+    const symptoms = await catalogue;
+    symptomsSection.classList.remove('hidden');
+    symptomsList.innerHTML = '';
+
+    symptoms[appliance].forEach(symptom => {
+        const div = document.createElement('div');
+        div.className = 'checkbox-item';
+        div.innerHTML = `
+            <input type="checkbox" id="symptom-${symptom}" value="${symptom}">
+            <label for="symptom-${symptom}">${symptom}</label>
+        `;
+        symptomsList.appendChild(div);
+    });
+}
+
+async function diagnose() {
+    const resultsDiv = document.getElementById('results');
+    resultsDiv.innerHTML = '<div class="loading">🔄 Analyzing...</div>';
+    resultsDiv.classList.remove('hidden');
+
+    let requestData = { input_mode: currentMode };
+
+    if (currentMode === 'natural') {
+        const text = document.getElementById('problem-text').value;
+        const hint = document.getElementById('appliance-hint').value;
+        
+        if (!text.trim()) {
+            showError('Please describe your problem');
+            return;
+        }
+
+        requestData.text = text;
+        requestData.appliance_hint = hint;
+    } else {
+        const appliance = document.getElementById('appliance-select').value;
+        const selectedSymptoms = Array.from(document.querySelectorAll('#symptoms-list input:checked'))
+            .map(cb => cb.value);
+        followUp.symptoms.forEach(symptom => {
+            if (!selectedSymptoms.includes(symptom)) selectedSymptoms.push(symptom);
+        });
+
+        if (!appliance) {
+            showError('Please select an appliance');
+            return;
+        }
+        if (selectedSymptoms.length === 0) {
+            showError('Please select at least one symptom');
+            return;
+        }
+
+        requestData.appliance = appliance;
+        requestData.symptoms = selectedSymptoms;
+        requestData.observations = { ...followUp.observations };
+    }
+
+    if (currentMode === 'manual') {
+        const data = await localDiagnosis(requestData);
+        if (data) {
+            displayResults(data);
+            suggestQuestion(requestData, data);
+            return;
+        }
+    }
+
+    try {
+        // Only the fields displayResults() shows; manual cases use the cacheable GET form
+        const fields = 'fields=diagnosis,confidence,recommendation,alternatives,friendly_explanation,extracted_facts';
+        let response;
+        if (currentMode === 'natural') {
+            response = await fetch('/diagnose?' + fields, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(requestData)
+            });
+        } else {
+            const params = new URLSearchParams({ appliance: requestData.appliance });
+            requestData.symptoms.forEach(symptom => params.append('symptoms', symptom));
+            Object.entries(requestData.observations).forEach(([key, value]) => params.append(key, value));
+            response = await fetch('/diagnose?' + params + '&' + fields);
+        }
+
+        const data = await response.json();
+
+        if (!response.ok) {
+            showError(data.error || 'An error occurred');
+            return;
+        }
+
+        displayResults(data);
+        if (currentMode === 'manual') suggestQuestion(requestData, data);
+    } catch (error) {
+        showError('Network error: ' + error.message);
+    }
+}
+
+// Diagnose a manual case in the browser; null means the server has to answer
+// (rule tables unavailable, or the explanation needs the LLM)
+async function localDiagnosis(requestData) {
+    const artifact = await rules;
+    if (!artifact || !window.LocalDiagnosis) return null;
+    const report = LocalDiagnosis.evaluate(artifact, requestData.appliance, requestData.symptoms, requestData.observations);
+    const friendly = LocalDiagnosis.explain(artifact, report);
+    if (friendly === null && report.explanations.length) return null;
+    return {
+        diagnosis: report.best_fit.diagnosis,
+        confidence: report.best_fit.score,
+        recommendation: report.best_fit.recommendation,
+        alternatives: report.alternatives,
+        friendly_explanation: friendly,
+        extracted_facts: null
+    };
+}
+
+function displayResults(data) {
+    const resultsDiv = document.getElementById('results');
+    
+    let progressClass = 'low';
+    if (data.confidence >= 70) progressClass = 'high';
+    else if (data.confidence >= 40) progressClass = 'medium';
+
+    let html = '<div class="result-card">';
+    
+    // Show extracted facts for natural language mode
+    if (data.extracted_facts) {
+        html += '<div class="extracted-facts">';
+        html += '<div class="extracted-facts-title">✅ AI Understood:</div>';
+        data.extracted_facts.forEach(fact => {
+            html += `<div class="fact-item">• ${fact}</div>`;
+        });
+        html += '</div>';
+    }
+
+    // Diagnosis
+    html += '<div class="section-title">Diagnosis</div>';
+    html += '<div class="diagnosis-box">';
+    html += `This is caused by ${data.diagnosis}`;
+    html += '</div>';
+
+    // Confidence Level with Progress Bar
+    html += '<div class="section-title">Confidence Level</div>';
+    html += '<div class="confidence-container">';
+    html += `<div class="confidence-text">${data.confidence}%</div>`;
+    html += '<div class="progress-bar-container">';
+    html += `<div class="progress-bar-fill ${progressClass}" style="width: ${data.confidence}%"></div>`;
+    html += '</div>';
+    html += '</div>';
+
+    // Recommendation
+    html += '<div class="section-title">📋 Recommended Action</div>';
+    html += '<div class="recommendation-box">';
+    html += data.recommendation;
+    html += '</div>';
+
+    // LLM Explanation
+    if (data.friendly_explanation) {
+        html += '<div class="section-title">💡 Why This Recommendation?</div>';
+        html += `<div class="explanation-box">${data.friendly_explanation}</div>`;
+    }
+
+    // Alternatives
+    if (data.alternatives && data.alternatives.length > 0 && data.confidence < 80) {
+        html += '<div class="alternatives">';
+        html += '<div class="section-title">🔄 Alternative Possibilities</div>';
+        data.alternatives.forEach((alt, index) => {
+            html += '<div class="alternative-item">';
+            html += `<div class="alternative-header">${index + 1}. ${alt.diagnosis} (${alt.score}%)</div>`;
+            html += `<div>${alt.recommendation}</div>`;
+            html += '</div>';
+        });
+        html += '</div>';
+    }
+
+    html += '</div>';
+    resultsDiv.innerHTML = html;
+}
+
+// When the diagnosis is uncertain, offer the question that would narrow it down most
+async function suggestQuestion(requestData, data) {
+    if (data.confidence >= 80) return;
+    let suggestion;
+    try {
+        const response = await fetch('/diagnose/next-question', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                appliance: requestData.appliance,
+                symptoms: requestData.symptoms,
+                observations: requestData.observations,
+                ruled_out: followUp.ruledOut.filter(symptom => !requestData.symptoms.includes(symptom)),
+                limit: 1
+            })
+        });
+        if (!response.ok) return;
+        suggestion = (await response.json()).questions[0];
+    } catch (error) {
+        return;  // Optional: the diagnosis is already shown
+    }
+    const card = document.querySelector('#results .result-card');
+    if (!suggestion || !card) return;
+
+    const box = document.createElement('div');
+    box.className = 'next-question';
+    box.innerHTML = '<div class="section-title">❓ Help Narrow It Down</div>';
+    const text = document.createElement('div');
+    text.textContent = suggestion.question;
+    box.appendChild(text);
+    suggestion.answers.forEach(answer => {
+        const button = document.createElement('button');
+        button.className = 'answer-btn';
+        button.textContent = suggestion.type === 'symptom' ? (answer.answer === 'yes' ? 'Yes' : 'No') : answer.answer;
+        button.onclick = () => answerQuestion(suggestion, answer.answer);
+        box.appendChild(button);
+    });
+    card.appendChild(box);
+}
+
+function answerQuestion(question, answer) {
+    if (question.type === 'observation') {
+        followUp.observations[question.name] = answer;
+    } else if (answer === 'yes') {
+        const checkbox = document.getElementById(`symptom-${question.name}`);
+        if (checkbox) {
+            checkbox.checked = true;
+        } else {
+            followUp.symptoms.push(question.name);  // Not among the checkboxes
+        }
+    } else {
+        followUp.ruledOut.push(question.name);
+    }
+    diagnose();
+}
+
+function showError(message) {
+    const resultsDiv = document.getElementById('results');
+    resultsDiv.innerHTML = `<div class="error-message">❌ ${message}</div>`;
+    resultsDiv.classList.remove('hidden');
+}
@@ -0,0 +1,153 @@
+// Client-side manual-mode diagnosis from the rule tables exported by rule_export.py.
+// Mirrors DiagnosticEngine: rules fire in the engine's agenda order, scores are
+// turned into confidences by symptom count, and the best fit and alternatives
+// are picked the same way. `python rule_export.py check` verifies parity.
+(function (root) {
+    // Python's round(x, 1). Both round the exact binary value, but an exact tie
+    // (e.g. 68.25) goes to the even digit in Python and up in toFixed()
+    function pyRound1(x) {
+        const exact = x.toFixed(60);
+        if (/\.\d50*$/.test(exact)) {
+            const lower = Math.floor(x * 10);
+            return (lower % 2 === 0 ? lower : lower + 1) / 10;
+        }
+        return Number(x.toFixed(1));
+    }
+
+    // How Python prints a float in an f-string (86.0, not 86)
+    function pyNumber(x) {
+        return Number.isInteger(x) ? x.toFixed(1) : String(x);
+    }
+
+    function confidence(rawScore, symptomCount) {
+        if (rawScore <= 0) return 0;
+        let value;
+        if (symptomCount === 1) value = 80 + (rawScore / 50) * 12;
+        else if (symptomCount === 2) value = 65 + (rawScore / 100) * 13;
+        else if (symptomCount === 3) value = 50 + (rawScore / 120) * 15;
+        else if (symptomCount === 4) value = 40 + (rawScore / 130) * 15;
+        else value = 30 + (rawScore / 150) * 15;
+        return pyRound1(Math.min(value, 100));
+    }
+
+    function recommendation(artifact, diagnosis, score) {
+        const known = artifact.recommendations[diagnosis];
+        const [text, action] = known || (score > 30 ? artifact.default_recommendation.high
+                                                    : artifact.default_recommendation.low);
+        return { text, action };
+    }
+
+    // Agenda order: higher salience first, then the most recently declared facts
+    function compareKeys(a, b) {
+        if (a.salience !== b.salience) return b.salience - a.salience;
+        for (let i = 0; i < Math.min(a.facts.length, b.facts.length); i++) {
+            if (a.facts[i] !== b.facts[i]) return b.facts[i] - a.facts[i];
+        }
+        return b.facts.length - a.facts.length;
+    }
+
+    function evaluate(artifact, appliance, symptoms, observations) {
+        // Fact ids in declaration order: appliance, symptoms, observations, each in
+        // the canonical order CaseFacts declares them in (unknown names last)
+        const rank = (order, name) => (order.indexOf(name) + 1 || Infinity);
+        const factIds = new Map();
+        let nextId = 1;
+        factIds.set('appliance', nextId++);
+        const uniqueSymptoms = [...new Set(symptoms)]
+            .sort((a, b) => rank(artifact.symptom_order, a) - rank(artifact.symptom_order, b) || 0);
+        uniqueSymptoms.forEach(symptom => factIds.set('symptom:' + symptom, nextId++));
+        const given = Object.entries(observations || {}).filter(([, value]) => value)
+            .sort(([a], [b]) => rank(artifact.observation_order, a) - rank(artifact.observation_order, b) || 0);
+        given.forEach(([key, value]) => factIds.set(key + ':' + value, nextId++));
+
+        const activations = [];
+        (artifact.rules[appliance] || []).forEach(([ruleSymptoms, ruleObservations, scores, messages, salience]) => {
+            const facts = [factIds.get('appliance')];
+            for (const symptom of ruleSymptoms) {
+                if (!factIds.has('symptom:' + symptom)) return;
+                facts.push(factIds.get('symptom:' + symptom));
+            }
+            for (const [key, value] of Object.entries(ruleObservations)) {
+                if (!factIds.has(key + ':' + value)) return;
+                facts.push(factIds.get(key + ':' + value));
+            }
+            facts.sort((a, b) => b - a);
+            activations.push({ salience, facts, scores, messages });
+        });
+        activations.sort(compareKeys);
+
+        const rawScores = new Map();
+        const explanations = [];
+        activations.forEach(activation => {
+            activation.scores.forEach(([diagnosis, points]) => {
+                rawScores.set(diagnosis, (rawScores.get(diagnosis) || 0) + points);
+            });
+            activation.messages.forEach(id => explanations.push(artifact.messages[id][0]));
+        });
+
+        if (rawScores.size === 0) {
+            return {
+                best_fit: { ...artifact.unmatched.best_fit },
+                alternatives: [],
+                explanations: explanations.concat(artifact.unmatched.explanations),
+                scores: {}
+            };
+        }
+
+        const scores = {};
+        const ranked = [];
+        rawScores.forEach((raw, diagnosis) => {
+            scores[diagnosis] = confidence(raw, uniqueSymptoms.length);
+            ranked.push([diagnosis, scores[diagnosis]]);
+        });
+        ranked.sort((a, b) => b[1] - a[1]);  // Stable, like Python's sorted()
+
+        const [bestDiagnosis, bestScore] = ranked[0];
+        const best = recommendation(artifact, bestDiagnosis, bestScore);
+        const alternatives = ranked.slice(1, 4)
+            .filter(([, score]) => score > 5)
+            .map(([diagnosis, score]) => {
+                const rec = recommendation(artifact, diagnosis, score);
+                return { diagnosis, score, recommendation: rec.text, action: rec.action };
+            });
+
+        return {
+            best_fit: { diagnosis: bestDiagnosis, score: bestScore, recommendation: best.text, action: best.action },
+            alternatives,
+            explanations,
+            scores
+        };
+    }
+
+    // "Why this recommendation?" from the rule templates (explanation_templates.render_explanation);
+    // null when the server would have to ask the LLM
+    function explain(artifact, report) {
+        if (!report.explanations.length) return null;
+        if (artifact.explanation_mode !== 'template') return null;
+        const sentenceFor = new Map(artifact.messages);
+        const sentences = [];
+        for (const message of report.explanations) {
+            const sentence = sentenceFor.get(message);
+            if (sentence == null) return null;
+            if (!sentences.includes(sentence)) sentences.push(sentence);
+        }
+
+        const { diagnosis, score } = report.best_fit;
+        let opening = null;
+        if (score && !artifact.no_opening.includes(diagnosis)) {
+            const [, template] = artifact.openings.find(([minimum]) => score >= minimum);
+            opening = template.replace('{diagnosis}', diagnosis).replace('{confidence}', pyNumber(score));
+        }
+
+        const isStep = sentence => /^[0-9]/.test(sentence);
+        const paragraph = sentences.filter(sentence => !isStep(sentence));
+        const steps = sentences.filter(isStep);
+        let text = (opening ? [opening] : []).concat(paragraph).join(' ');
+        if (steps.length) text += '\n' + steps.join('\n');
+        return text;
+    }
+
+    const LocalDiagnosis = { evaluate, explain, confidence, pyRound1 };
+    root.LocalDiagnosis = LocalDiagnosis;
+    if (typeof module !== 'undefined' && module.exports) module.exports = LocalDiagnosis;
+})(typeof window !== 'undefined' ? window : globalThis);
@@ -0,0 +1,123 @@
+"""
+Static asset pipeline for the Flask frontend.
+
+Everything under static/ is read once at startup, fingerprinted with a hash
+of its content (css/app.css -> css/app.3f9c2a1b.css) and kept in memory
+together with its gzip/brotli encodings. Fingerprinted URLs never change
+content, so they are served with a one-year immutable Cache-Control; a new
+deploy changes the hash and therefore the URL.
+
+The symptom catalogue (catalogue.json) is served the same way at
+/catalogue?v=<hash>, and the page itself is rendered once with the current
+asset URLs and revalidated with an ETag, so a repeat visit costs a single
+304 for the page and nothing for its assets.
+
+Usage:
+    python static_assets.py          # list assets, sizes and fingerprinted URLs
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from response_shaping import MIN_COMPRESS_SIZE, choose_encoding, compress
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+CATALOGUE_PATH = os.path.join(BASE_DIR, 'catalogue.json')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def fingerprint(body):
+    return hashlib.blake2b(body, digest_size=4).hexdigest()
+
+
+def fingerprinted_name(name, digest):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+class Asset:
+    """One in-memory asset with its precomputed encodings."""
+
+    def __init__(self, name, body, mimetype):
+        self.name = name
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = fingerprint(body)
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self._encoded = {}
+
+    def encoded(self, accept_encoding):
+        """Return (body, encoding) for the client's Accept-Encoding (encoding None = identity)."""
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding], encoding
+
+
+class AssetManifest:
+    """Fingerprinted static files plus the symptom catalogue, loaded once."""
+
+    def __init__(self, static_dir=STATIC_DIR, catalogue_path=CATALOGUE_PATH):
+        self.assets = {}    # plain name -> Asset
+        self.by_url = {}    # fingerprinted name -> Asset
+        for root, _, files in os.walk(static_dir):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, static_dir).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    body = f.read()
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                asset = Asset(name, body, mimetype)
+                self.assets[name] = asset
+                self.by_url[fingerprinted_name(name, asset.digest)] = asset
+
+        with open(catalogue_path, encoding='utf-8') as f:
+            catalogue = json.load(f)
+        body = json.dumps(catalogue, separators=(',', ':')).encode()
+        self.catalogue = Asset('catalogue.json', body, 'application/json')
+
+    def url(self, name):
+        """Fingerprinted URL of a static file, for templates."""
+        asset = self.assets[name]
+        return f"/static/{fingerprinted_name(name, asset.digest)}"
+
+    def catalogue_url(self):
+        return f"/catalogue?v={self.catalogue.digest}"
+
+    def lookup(self, filename):
+        """Return (asset, immutable) for a /static/ path, or (None, False)."""
+        if filename in self.by_url:
+            return self.by_url[filename], True
+        # Plain names still work (e.g. during development), but must be revalidated
+        return self.assets.get(filename), False
+
+
+def asset_response(response_class, asset, request, immutable):
+    """Build the response for an asset: 304 on a matching ETag, else the best encoding."""
+    response = response_class(mimetype=asset.mimetype)
+    response.headers['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+    response.set_etag(asset.etag)
+    response.vary.add('Accept-Encoding')
+    if asset.etag in request.if_none_match:
+        response.status_code = 304
+        return response
+    body, encoding = asset.encoded(request.headers.get('Accept-Encoding'))
+    response.set_data(body)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+if __name__ == '__main__':
+    manifest = AssetManifest()
+    print(f"{'Asset':<22} {'Bytes':>7} {'gzip':>7}  URL")
+    for name, asset in sorted(manifest.assets.items()) + [('catalogue', manifest.catalogue)]:
+        url = manifest.catalogue_url() if name == 'catalogue' else manifest.url(name)
+        print(f"{name:<22} {len(asset.body):7d} {len(gzip.compress(asset.body)):7d}  {url}")
@@ -0,0 +1,230 @@
+"""
+Symbol interning for the diagnostic vocabulary.
+Maps appliance, symptom and observation names to small integer ids so the
+engine matches and hashes ints instead of free-form strings.
+"""
+from experta import Fact
+
+
+APPLIANCE_NAMES = [
+    "Washing Machine",
+    "Fan",
+    "Power Generator",
+    "Kitchen Grinder",
+]
+
+SYMPTOM_NAMES = [
+    "Wont Start",
+    "Wont Drain",
+    "Not Spinning",
+    "Leaking Water",
+    "Loud Noise",
+    "Excessive Vibration",
+    "Burning Smell",
+    "Water Not Filling",
+    "Door Wont Lock",
+    "Wobbles",
+    "Slow Speed",
+    "Noisy Operation",
+    "Overheating",
+    "Not Oscillating",
+    "Sparks",
+    "Intermittent Operation",
+    "Wont Turn On",
+    "No Power Output",
+    "Runs But No Electricity",
+    "Low Power Output",
+    "Excessive Smoke",
+    "Backfiring",
+    "Oil Leaking",
+    "Engine Surging",
+    "High Fuel Consumption",
+    "Battery Not Charging",
+    "Weak Grinding",
+    "Vibration",
+    "Jamming",
+    "Leaking",
+    "Overheating Quickly",
+    "Lid Not Secure",
+    "Uneven Grinding",
+    "Sparks Inside",
+]
+
+# Case id used when facts are declared without one (single-case runs)
+DEFAULT_CASE = 0
+
+OBSERVATION_KEYS = ("noise_type", "power", "fuel")
+
+OBSERVATION_VALUES = [
+    "Gurgling",
+    "Grinding",
+    "Banging",
+    "Squealing",
+    "Checked",
+    "Not Checked",
+    "Empty",
+    "Full",
+]
+
+
+class SymbolTable:
+    """
+    Bidirectional name <-> id mapping for a fixed vocabulary.
+    Ids follow list order, so they are stable across processes.
+    """
+    __slots__ = ('_ids', '_names')
+
+    def __init__(self, names):
+        self._names = tuple(names)
+        self._ids = {name: i for i, name in enumerate(self._names)}
+
+    def id(self, name):
+        """Return the id for a known name (raises KeyError otherwise)."""
+        return self._ids[name]
+
+    def lookup(self, name, default=None):
+        """Return the id for a name, or `default` if it is not in the vocabulary."""
+        return self._ids.get(name, default)
+
+    def name(self, symbol):
+        """Return the name for an id. Non-int values are returned unchanged."""
+        if isinstance(symbol, int):
+            return self._names[symbol]
+        return symbol
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+APPLIANCES = SymbolTable(APPLIANCE_NAMES)
+SYMPTOMS = SymbolTable(SYMPTOM_NAMES)
+OBSERVATIONS = SymbolTable(OBSERVATION_VALUES)
+
+
+def intern_value(key, value):
+    """
+    Intern a single fact value by its key.
+    Values outside the vocabulary are kept as strings; they match no rule
+    but still count (e.g. as a reported symptom).
+    """
+    if key == 'appliance':
+        return APPLIANCES.lookup(value, value)
+    if key == 'symptom':
+        return SYMPTOMS.lookup(value, value)
+    if key in OBSERVATION_KEYS:
+        return OBSERVATIONS.lookup(value, value)
+    return value
+
+
+def resolve_value(key, value):
+    """Inverse of intern_value: turn an interned id back into its name."""
+    if key == 'appliance':
+        return APPLIANCES.name(value)
+    if key == 'symptom':
+        return SYMPTOMS.name(value)
+    if key in OBSERVATION_KEYS:
+        return OBSERVATIONS.name(value)
+    return value
+
+
+def _vocabulary_order(symbol):
+    """Sort key: known symbols by id, then names outside the vocabulary (stable among themselves)."""
+    return (0, symbol) if isinstance(symbol, int) else (1, 0)
+
+
+def _observation_order(item):
+    key = item[0]
+    return OBSERVATION_KEYS.index(key) if key in OBSERVATION_KEYS else len(OBSERVATION_KEYS)
+
+
+class CaseFacts:
+    """
+    Compact, interned description of one diagnostic case.
+    Shared by the extractor (which builds it) and the engine (which declares it).
+    """
+    __slots__ = ('case_id', 'appliance', 'symptoms', 'observations')
+
+    def __init__(self, appliance=None, symptoms=(), observations=None, case_id=DEFAULT_CASE):
+        self.case_id = case_id
+        self.appliance = None
+        self.symptoms = []
+        self.observations = {}
+        if appliance:
+            self.set_appliance(appliance)
+        for symptom in symptoms:
+            self.add_symptom(symptom)
+        for key, value in (observations or {}).items():
+            self.add_observation(key, value)
+
+    def set_appliance(self, name):
+        self.appliance = intern_value('appliance', name)
+
+    def add_symptom(self, name):
+        """Add a symptom once; duplicates are ignored."""
+        symbol = intern_value('symptom', name)
+        if symbol not in self.symptoms:
+            self.symptoms.append(symbol)
+
+    def add_observation(self, key, value):
+        if value:
+            self.observations[key] = intern_value(key, value)
+
+    @property
+    def symptom_count(self):
+        return len(self.symptoms)
+
+    def to_facts(self, interned=False, case_id=None):
+        """
+        Return experta Facts for this case.
+        With interned=True the values are symbol ids and every fact is tagged
+        with the case id (what the engine matches on); otherwise they are the
+        readable names without a case tag.
+        """
+        if not interned:
+            facts = []
+            if self.appliance is not None:
+                facts.append(Fact(appliance=resolve_value('appliance', self.appliance)))
+            for symptom in self.symptoms:
+                facts.append(Fact(symptom=SYMPTOMS.name(symptom)))
+            for key, value in self.observations.items():
+                facts.append(Fact(**{key: resolve_value(key, value)}))
+            return facts
+
+        # The engine breaks score ties by declaration order, so declare in a
+        # canonical order: reports then do not depend on the order of the input
+        case = self.case_id if case_id is None else case_id
+        facts = []
+        if self.appliance is not None:
+            facts.append(Fact(case=case, appliance=self.appliance))
+        for symptom in sorted(self.symptoms, key=_vocabulary_order):
+            facts.append(Fact(case=case, symptom=symptom))
+        for key, value in sorted(self.observations.items(), key=_observation_order):
+            facts.append(Fact(**{'case': case, key: value}))
+        return facts
+
+    @classmethod
+    def from_facts(cls, facts, case_id=DEFAULT_CASE):
+        """Build a case from a list of experta Facts (interned or not)."""
+        case = cls(case_id=case_id)
+        for fact in facts:
+            for key, value in fact.as_dict().items():
+                if key == 'case':
+                    continue
+                elif key == 'appliance':
+                    case.appliance = intern_value(key, value)
+                elif key == 'symptom':
+                    case.add_symptom(value)
+                else:
+                    case.add_observation(key, value)
+        return case
+
+    def __repr__(self):
+        return (f"CaseFacts(case_id={self.case_id!r}, appliance={resolve_value('appliance', self.appliance)!r}, "
+                f"symptoms={[SYMPTOMS.name(s) for s in self.symptoms]!r}, "
+                f"observations={ {k: OBSERVATIONS.name(v) for k, v in self.observations.items()}!r})")